@@ -0,0 +1,344 @@
+"""
+LLM Inference Benchmark
+Measures how fast each discovered model actually is, so the preference
+tooling can put the fastest local backend first.
+
+For every model on every endpoint (from a detected-llms.json written by
+scan_llm_ports.py / llm_watch.py, or from a fresh scan), a fixed prompt set
+is sent as streaming requests and the benchmark records:
+- time to first token (TTFT),
+- decode tokens/sec after the first token,
+- aggregate tokens/sec and mean TTFT with 1, 2, 4... requests in flight.
+
+Token counts come from the server when it reports them (Ollama eval_count,
+OpenAI-style usage) and from the number of streamed chunks otherwise.
+Results are ranked by decode tokens/sec (TTFT breaks ties) and written as a
+report whose "models" list is in detected-llms.json format, fastest first;
+--update-detected reorders detected-llms.json the same way so
+apply-llm-preference.js picks the fastest model.
+
+Usage:
+    python llm_bench.py --detected sellersco-worker/scripts/detected-llms.json
+    python llm_bench.py --host localhost --max-tokens 64 --concurrency 1,2,4,8
+    python llm_bench.py --detected sellersco-worker/scripts/detected-llms.json --update-detected
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from llm_fingerprint import detected_llms, model_entries, new_session
+from llm_watch import DETECTED_PATH, write_atomic
+from scan_llm_ports import DEFAULT_HOST, expand_targets, parse_ports, scan
+
+REPORT_PATH = os.path.join(os.path.dirname(DETECTED_PATH), 'llm-bench.json')
+MAX_TOKENS = 128
+REQUEST_TIMEOUT = 120.0
+CONCURRENCY_LEVELS = (1, 2, 4)
+REPEAT = 1
+
+# Fixed prompt set so runs are comparable across backends and over time
+PROMPTS = (
+    "Explain what an HTTP ETag is and how a client uses it, in one paragraph.",
+    "Write a Python function that returns the n-th Fibonacci number iteratively.",
+    "List five checks an SEO audit should run on a product page, one line each.",
+    "Summarize the trade-offs between BM25 and dense vector search for code search.",
+)
+
+
+def _now() -> float:
+    return time.perf_counter()
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def _request(endpoint: Dict[str, Any], model: str, prompt: str, max_tokens: int):
+    """(url, JSON body) of a streaming completion request for the endpoint's API"""
+    if endpoint["server"] == "ollama":
+        return (f"{endpoint['apiBase']}/api/generate",
+                {"model": model, "prompt": prompt, "stream": True,
+                 "options": {"num_predict": max_tokens, "temperature": 0}})
+    return (f"{endpoint['apiBase']}/chat/completions",
+            {"model": model, "messages": [{"role": "user", "content": prompt}],
+             "max_tokens": max_tokens, "temperature": 0, "stream": True})
+
+
+def _stream_chunks(endpoint: Dict[str, Any], resp: requests.Response):
+    """Yield (has_text, server_token_count or None) per streamed chunk"""
+    ollama = endpoint["server"] == "ollama"
+    for line in resp.iter_lines():
+        if not line:
+            continue
+        if not ollama:
+            if not line.startswith(b"data:"):
+                continue
+            line = line[5:].strip()
+            if line == b"[DONE]":
+                return
+        try:
+            chunk = json.loads(line)
+        except ValueError:
+            continue
+        if ollama:
+            yield bool(chunk.get("response")), chunk.get("eval_count") if chunk.get("done") else None
+            continue
+        choices = chunk.get("choices") or [{}]
+        delta = choices[0].get("delta") or {}
+        usage = chunk.get("usage") or {}
+        yield bool(delta.get("content") or choices[0].get("text")), usage.get("completion_tokens")
+
+
+def stream_completion(session: requests.Session, endpoint: Dict[str, Any], model: str,
+                      prompt: str, max_tokens: int = MAX_TOKENS,
+                      timeout: float = REQUEST_TIMEOUT) -> Dict[str, Any]:
+    """
+    Time one streaming completion
+
+    Returns {"ttft_ms", "total_ms", "tokens", "tokens_per_s"}, or {"error"}
+    when the request fails or no text comes back.
+    """
+    url, body = _request(endpoint, model, prompt, max_tokens)
+    started = _now()
+    first = None
+    chunks = 0
+    server_tokens = None
+    try:
+        with session.post(url, json=body, stream=True, timeout=timeout) as resp:
+            if resp.status_code != 200:
+                return {"error": f"HTTP {resp.status_code}"}
+            for has_text, count in _stream_chunks(endpoint, resp):
+                if has_text:
+                    chunks += 1
+                    if first is None:
+                        first = _now()
+                if count:
+                    server_tokens = count
+    except requests.RequestException as e:
+        return {"error": type(e).__name__}
+    ended = _now()
+    if first is None:
+        return {"error": "no tokens"}
+    tokens = server_tokens or chunks
+    decode_s = ended - first
+    return {
+        "ttft_ms": _ms(first - started),
+        "total_ms": _ms(ended - started),
+        "tokens": tokens,
+        "tokens_per_s": round((tokens - 1) / decode_s, 2) if tokens > 1 and decode_s > 0 else None,
+    }
+
+
+def _median(values: List[Optional[float]]) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return round(statistics.median(values), 2) if values else None
+
+
+def run_level(session: requests.Session, endpoint: Dict[str, Any], model: str, level: int,
+              prompts=PROMPTS, max_tokens: int = MAX_TOKENS,
+              timeout: float = REQUEST_TIMEOUT) -> Dict[str, Any]:
+    """level requests at once; aggregate tokens/sec over the wall time of the batch"""
+    started = _now()
+    with ThreadPoolExecutor(max_workers=level) as pool:
+        runs = list(pool.map(
+            lambda i: stream_completion(session, endpoint, model, prompts[i % len(prompts)],
+                                        max_tokens, timeout),
+            range(level)))
+    wall = _now() - started
+    ok = [r for r in runs if "error" not in r]
+    return {
+        "concurrency": level,
+        "ok": len(ok),
+        "mean_ttft_ms": round(statistics.mean(r["ttft_ms"] for r in ok), 2) if ok else None,
+        "aggregate_tokens_per_s": round(sum(r["tokens"] for r in ok) / wall, 2) if ok else None,
+    }
+
+
+def bench_model(session: requests.Session, endpoint: Dict[str, Any], model: str,
+                prompts=PROMPTS, max_tokens: int = MAX_TOKENS, levels=CONCURRENCY_LEVELS,
+                repeat: int = REPEAT, timeout: float = REQUEST_TIMEOUT) -> Dict[str, Any]:
+    """
+    Benchmark one model: a warm-up request (reported as load_ms, since it
+    includes loading the model), single-stream runs over the prompt set,
+    then each concurrency level
+    """
+    result = {"host": endpoint["host"], "port": endpoint["port"], "server": endpoint["server"],
+              "apiBase": endpoint["apiBase"], "model": model}
+    warm = stream_completion(session, endpoint, model, prompts[0], min(8, max_tokens), timeout)
+    if "error" in warm:
+        result["error"] = warm["error"]
+        return result
+    result["load_ms"] = warm["total_ms"]
+
+    runs = [stream_completion(session, endpoint, model, prompt, max_tokens, timeout)
+            for _ in range(repeat) for prompt in prompts]
+    ok = [r for r in runs if "error" not in r]
+    if not ok:
+        result["error"] = runs[0]["error"]
+        return result
+    result.update({
+        "requests": len(runs),
+        "errors": len(runs) - len(ok),
+        "ttft_ms": _median([r["ttft_ms"] for r in ok]),
+        "tokens_per_s": _median([r["tokens_per_s"] for r in ok]),
+        "mean_tokens": round(statistics.mean(r["tokens"] for r in ok), 1),
+    })
+
+    scaling = [run_level(session, endpoint, model, level, prompts, max_tokens, timeout)
+               for level in levels]
+    base = next((s["aggregate_tokens_per_s"] for s in scaling if s["concurrency"] == 1), None)
+    for s in scaling:
+        if base and s["aggregate_tokens_per_s"] is not None:
+            # 1.0 means throughput grew linearly with the number of requests in flight
+            s["efficiency"] = round(s["aggregate_tokens_per_s"] / (base * s["concurrency"]), 2)
+    result["scaling"] = scaling
+    return result
+
+
+def rank(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fastest decode first, lower TTFT breaking ties; failed models last"""
+    def key(r):
+        if "error" in r or r.get("tokens_per_s") is None:
+            return (1, 0.0, 0.0)
+        return (0, -r["tokens_per_s"], r["ttft_ms"] or 0.0)
+    ranked = sorted(results, key=key)
+    for position, r in enumerate(ranked, 1):
+        r["rank"] = position
+    return ranked
+
+
+def ranked_models(ranked: List[Dict[str, Any]],
+                  endpoints: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """detected-llms.json "models" entries in benchmark order; unbenchmarked models keep their place after"""
+    entries = [entry for endpoint in endpoints for entry in model_entries(endpoint)]
+    order = {(r["apiBase"], r["model"]): r["rank"] for r in ranked if "error" not in r}
+    return sorted(entries, key=lambda e: order.get((e["apiBase"], e["model"]), len(order) + 1))
+
+
+def run_benchmark(endpoints: List[Dict[str, Any]], models: Optional[List[str]] = None,
+                  prompts=PROMPTS, max_tokens: int = MAX_TOKENS, levels=CONCURRENCY_LEVELS,
+                  repeat: int = REPEAT, timeout: float = REQUEST_TIMEOUT,
+                  progress=None) -> Dict[str, Any]:
+    """Benchmark every model (optionally filtered by substring) and build the ranked report"""
+    session = new_session(max(levels))
+    results = []
+    try:
+        for endpoint in endpoints:
+            for entry in endpoint["models"]:
+                name = entry["model"]
+                if models and not any(m in name for m in models):
+                    continue
+                result = bench_model(session, endpoint, name, prompts, max_tokens, levels,
+                                     repeat, timeout)
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+    finally:
+        session.close()
+    ranked = rank(results)
+    return {
+        "benchmarked_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "settings": {"prompts": len(prompts), "max_tokens": max_tokens,
+                     "concurrency": list(levels), "repeat": repeat},
+        "results": ranked,
+        "models": ranked_models(ranked, endpoints),
+    }
+
+
+def describe(result: Dict[str, Any]) -> str:
+    where = f"{result['model']} @ {result['host']}:{result['port']} ({result['server']})"
+    if "error" in result:
+        return f"{where}: failed ({result['error']})"
+    scaling = ', '.join(f"x{s['concurrency']}={s['aggregate_tokens_per_s']}"
+                        for s in result["scaling"])
+    return (f"{where}: ttft {result['ttft_ms']}ms, {result['tokens_per_s']} tok/s, "
+            f"load {result['load_ms']}ms, aggregate tok/s {scaling}")
+
+
+def print_report(report: Dict[str, Any], out=sys.stdout):
+    print(f"\n{'#':>3}  {'model':<32} {'server':<10} {'ttft ms':>9} {'tok/s':>8}  scaling",
+          file=out)
+    for r in report["results"]:
+        if "error" in r:
+            print(f"{r['rank']:>3}  {r['model']:<32} {r['server']:<10} failed: {r['error']}",
+                  file=out)
+            continue
+        scaling = ' '.join(f"x{s['concurrency']}:{s.get('efficiency', '-')}" for s in r["scaling"])
+        print(f"{r['rank']:>3}  {r['model']:<32} {r['server']:<10} {r['ttft_ms']:>9} "
+              f"{r['tokens_per_s'] if r['tokens_per_s'] is not None else '-':>8}  {scaling}",
+              file=out)
+
+
+def load_endpoints(path: str) -> List[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        endpoints = json.load(f).get("endpoints")
+    if not endpoints:
+        raise ValueError(f"{path} has no \"endpoints\"; regenerate it with scan_llm_ports.py --json")
+    return endpoints
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark TTFT, tokens/sec and concurrency "
+                                                 "scaling of discovered LLM endpoints")
+    parser.add_argument("--detected", help="detected-llms.json with \"endpoints\" "
+                                           "(default: scan --host for known ports)")
+    parser.add_argument("--host", action="append", dest="hosts", metavar="TARGET",
+                        help="Hosts to scan when --detected is not given (default: localhost)")
+    parser.add_argument("--ports", default="known", help="Ports to scan (default: known)")
+    parser.add_argument("--model", action="append", dest="models",
+                        help="Only models whose name contains this (repeatable)")
+    parser.add_argument("--max-tokens", type=int, default=MAX_TOKENS)
+    parser.add_argument("--concurrency", default=','.join(map(str, CONCURRENCY_LEVELS)),
+                        help="Comma-separated in-flight request counts to measure")
+    parser.add_argument("--repeat", type=int, default=REPEAT,
+                        help="Passes over the prompt set for the single-stream numbers")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT)
+    parser.add_argument("--report", default=REPORT_PATH, help="Where to write the ranked report")
+    parser.add_argument("--update-detected", action="store_true",
+                        help="Reorder the detected-llms.json models fastest first")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    levels = sorted({max(1, int(n)) for n in args.concurrency.split(',') if n.strip()}) or [1]
+    if args.detected:
+        endpoints = load_endpoints(args.detected)
+    else:
+        hosts = expand_targets(args.hosts or [DEFAULT_HOST])
+        endpoints = asyncio.run(scan(hosts, parse_ports(args.ports)))["endpoints"]
+    if not endpoints:
+        print("No LLM endpoints found")
+        return 1
+
+    progress = None if args.json else (lambda r: print(describe(r), flush=True))
+    report = run_benchmark(endpoints, args.models, PROMPTS, max(1, args.max_tokens), levels,
+                           max(1, args.repeat), args.timeout, progress)
+    write_atomic(args.report, report)
+
+    if args.update_detected:
+        detected_path = args.detected or DETECTED_PATH
+        payload = detected_llms(endpoints)
+        payload["models"] = report["models"]
+        write_atomic(detected_path, payload)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+        print(f"\nReport saved to: {args.report}")
+        if args.update_detected:
+            print(f"Models reordered in: {args.detected or DETECTED_PATH}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+LLM Endpoint Fingerprinting
+Identifies which inference server answers on an open port and lists its
+models, for scan_llm_ports.py.
+
+Every known probe (Ollama, LM Studio, llama.cpp, vLLM and plain
+OpenAI-compatible servers) is sent to each port at once through one pooled
+keep-alive requests.Session, and the answers decide the server type. The
+result serializes to the scripts/detected-llms.json format that
+detect-llms.ps1 writes and apply-llm-preference.js reads.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_TIMEOUT = 2.0
+DEFAULT_WORKERS = 32
+# Ollama's default when a model doesn't say; detect-llms.ps1 uses the same rule
+OLLAMA_CONTEXT_LENGTH = 32768
+OLLAMA_LONG_CONTEXT = {"llama3.1": 128000}
+
+# name -> path; all are GETs that return JSON on the server they identify
+PROBES = {
+    "ollama_tags": "/api/tags",
+    "lmstudio_models": "/api/v0/models",
+    "llamacpp_props": "/props",
+    "vllm_version": "/version",
+    "openai_models": "/v1/models",
+}
+
+# Server types double as Continue provider names
+TITLE_PREFIX = {"lmstudio": "LM Studio", "llama.cpp": "llama.cpp", "vllm": "vLLM",
+                "openai": "OpenAI-compatible"}
+
+
+def new_session(pool_size: int = DEFAULT_WORKERS) -> requests.Session:
+    """Keep-alive session whose connection pool can serve pool_size concurrent probes"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def _get_json(session: requests.Session, url: str,
+              timeout: float) -> Tuple[Optional[Any], float]:
+    """(parsed JSON or None, elapsed ms) for one GET"""
+    started = time.perf_counter()
+    try:
+        resp = session.get(url, timeout=timeout)
+        payload = resp.json() if resp.status_code == 200 else None
+    except (requests.RequestException, ValueError):
+        payload = None
+    return payload, round((time.perf_counter() - started) * 1000, 2)
+
+
+def _ollama_context_length(name: str) -> int:
+    for prefix, length in OLLAMA_LONG_CONTEXT.items():
+        if name.startswith(prefix):
+            return length
+    return OLLAMA_CONTEXT_LENGTH
+
+
+def classify(answers: Dict[str, Tuple[Optional[Any], float]]) -> Optional[Dict[str, Any]]:
+    """
+    Decide the server type from probe answers
+
+    Most specific first: Ollama and LM Studio also serve /v1/models, and
+    llama.cpp/vLLM are told apart from generic OpenAI servers by their extra
+    endpoints. Returns {"server", "models", "latency_ms"} or None.
+    """
+    def ok(name, key=None):
+        payload = answers.get(name, (None, 0.0))[0]
+        if not isinstance(payload, dict):
+            return None
+        return payload if key is None or isinstance(payload.get(key), list) else None
+
+    tags = ok("ollama_tags", "models")
+    if tags is not None:
+        models = [{"model": m.get("name"),
+                   "parameterSize": (m.get("details") or {}).get("parameter_size"),
+                   "contextLength": _ollama_context_length(m.get("name", ""))}
+                  for m in tags["models"] if m.get("name")]
+        return {"server": "ollama", "models": models, "latency_ms": answers["ollama_tags"][1]}
+
+    lmstudio = ok("lmstudio_models", "data")
+    if lmstudio is not None:
+        models = [{"model": m.get("id"), "contextLength": m.get("max_context_length")}
+                  for m in lmstudio["data"] if m.get("id")]
+        return {"server": "lmstudio", "models": models,
+                "latency_ms": answers["lmstudio_models"][1]}
+
+    openai = ok("openai_models", "data")
+    props = ok("llamacpp_props")
+    if props is not None and "default_generation_settings" in props:
+        n_ctx = (props.get("default_generation_settings") or {}).get("n_ctx")
+        models = [{"model": m.get("id"), "contextLength": n_ctx}
+                  for m in (openai or {}).get("data", []) if m.get("id")]
+        return {"server": "llama.cpp", "models": models,
+                "latency_ms": answers["llamacpp_props"][1]}
+
+    if openai is None:
+        return None
+    data = [m for m in openai["data"] if isinstance(m, dict) and m.get("id")]
+    version = ok("vllm_version")
+    is_vllm = (version is not None and "version" in version) or any(
+        m.get("owned_by") == "vllm" or "max_model_len" in m for m in data)
+    models = [{"model": m["id"], "contextLength": m.get("max_model_len")} for m in data]
+    return {"server": "vllm" if is_vllm else "openai", "models": models,
+            "latency_ms": answers["openai_models"][1]}
+
+
+def fingerprint(host: str, ports: List[int], session: Optional[requests.Session] = None,
+                timeout: float = HTTP_TIMEOUT,
+                max_workers: int = DEFAULT_WORKERS) -> List[Dict[str, Any]]:
+    """
+    Identify the LLM server (if any) on each port; probes for all ports run concurrently
+
+    Returns one endpoint record per recognized port, in port order.
+    """
+    if not ports:
+        return []
+    own_session = session is None
+    session = session or new_session(max_workers)
+    jobs = [(port, name, f"http://{host}:{port}{path}")
+            for port in ports for name, path in PROBES.items()]
+    answers: Dict[int, Dict[str, Tuple[Optional[Any], float]]] = {port: {} for port in ports}
+    try:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+            futures = [(port, name, pool.submit(_get_json, session, url, timeout))
+                       for port, name, url in jobs]
+            for port, name, future in futures:
+                answers[port][name] = future.result()
+    finally:
+        if own_session:
+            session.close()
+
+    endpoints = []
+    for port in ports:
+        found = classify(answers[port])
+        if found is None:
+            continue
+        base = f"http://{host}:{port}"
+        endpoints.append({
+            "host": host,
+            "port": port,
+            "apiBase": base if found["server"] == "ollama" else f"{base}/v1",
+            **found,
+        })
+    return endpoints
+
+
+def model_entries(endpoint: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """detected-llms.json "models" entries for one endpoint"""
+    server = endpoint["server"]
+    entries = []
+    for model in endpoint["models"]:
+        name = model["model"]
+        if server == "ollama":
+            title = f"{name} ({model['parameterSize']})" if model.get("parameterSize") else name
+        else:
+            title = f"{TITLE_PREFIX[server]}: {name}"
+        entry = {"provider": server, "apiBase": endpoint["apiBase"],
+                 "model": name, "title": title}
+        if model.get("contextLength"):
+            entry["contextLength"] = model["contextLength"]
+        entries.append(entry)
+    return entries
+
+
+def detected_llms(endpoints: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Drop-in content for sellersco-worker/scripts/detected-llms.json
+
+    "models" and "detected_at" match detect-llms.ps1; "endpoints" adds the
+    per-endpoint server type and latency, which existing readers ignore.
+    """
+    return {
+        "models": [entry for endpoint in endpoints for entry in model_entries(endpoint)],
+        "detected_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "endpoints": endpoints,
+    }
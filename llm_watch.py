@@ -0,0 +1,314 @@
+"""
+LLM Endpoint Watcher
+Keeps a live table of LLM endpoints instead of re-running the full port
+scan, and rewrites detected-llms.json only when something changed.
+
+After one full scan_llm_ports scan:
+- known endpoints are re-fingerprinted every --interval seconds and marked
+  down after --down-after consecutive misses;
+- local hosts are re-read from /proc/net/tcp on the same interval and only
+  newly listening ports are probed (a closed listener marks its endpoint
+  down at once). Listening ports that don't identify as an LLM yet (a
+  server still loading its model, or an endpoint that went down while its
+  socket stayed open) are re-probed with exponential backoff up to
+  --retry-max seconds;
+- other hosts get a low-rate connect sweep every --sweep-interval seconds.
+
+Every change is reported as an event (up / down / changed), as text or as
+JSON lines with --events-jsonl.
+
+Usage:
+    python llm_watch.py [--host localhost] [--interval 5] [--json path/to/detected-llms.json]
+    python llm_watch.py --host 192.168.1.0/24 --sweep-interval 300 --events-jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from llm_fingerprint import HTTP_TIMEOUT, detected_llms, fingerprint, new_session
+from scan_llm_ports import (CONNECT_TIMEOUT, DEFAULT_CONCURRENCY, DEFAULT_HOST, DEFAULT_PORTS,
+                            DEFAULT_PER_HOST, PROBE_WORKERS, ROOT, choose_discovery,
+                            expand_targets, max_concurrency, parse_ports, procfs_ports,
+                            resolve_host, scan)
+
+DETECTED_PATH = os.path.join(ROOT, 'sellersco-worker', 'scripts', 'detected-llms.json')
+CHECK_INTERVAL = 5.0
+SWEEP_INTERVAL = 300.0
+SWEEP_RATE = 200.0
+DOWN_AFTER = 2
+RETRY_MAX = 300.0
+
+Key = Tuple[str, int]
+
+
+def signature(endpoint: Dict[str, Any]) -> Tuple:
+    """What counts as a change: server type and model list, not latency"""
+    return (endpoint["server"], endpoint["apiBase"],
+            tuple(sorted((m.get("model"), m.get("contextLength")) for m in endpoint["models"])))
+
+
+class EndpointTable:
+    """Live endpoints keyed by (host, port), turning observations into change events"""
+
+    def __init__(self, down_after: int = DOWN_AFTER):
+        self.down_after = down_after
+        self.endpoints: Dict[Key, Dict[str, Any]] = {}
+        self.misses: Dict[Key, int] = {}
+
+    def seen(self, endpoint: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Record a successful fingerprint; returns an up/changed event or None"""
+        key = (endpoint["host"], endpoint["port"])
+        previous = self.endpoints.get(key)
+        self.endpoints[key] = endpoint
+        self.misses.pop(key, None)
+        if previous is None:
+            return self._event("up", endpoint)
+        if signature(previous) != signature(endpoint):
+            return self._event("changed", endpoint)
+        return None
+
+    def missed(self, key: Key, force: bool = False) -> Optional[Dict[str, Any]]:
+        """Record a failed re-check; returns a down event once the endpoint is declared gone"""
+        if key not in self.endpoints:
+            return None
+        self.misses[key] = self.misses.get(key, 0) + 1
+        if not force and self.misses[key] < self.down_after:
+            return None
+        self.misses.pop(key, None)
+        return self._event("down", self.endpoints.pop(key))
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [self.endpoints[key] for key in sorted(self.endpoints)]
+
+    def state(self) -> List[Tuple]:
+        return [(key, signature(self.endpoints[key])) for key in sorted(self.endpoints)]
+
+    @staticmethod
+    def _event(kind: str, endpoint: Dict[str, Any]) -> Dict[str, Any]:
+        return {"event": kind, "at": datetime.now().isoformat(timespec='seconds'),
+                "host": endpoint["host"], "port": endpoint["port"],
+                "server": endpoint["server"], "models": [m["model"] for m in endpoint["models"]]}
+
+
+def load_state(path: Optional[str]) -> Optional[List[Tuple]]:
+    """Table state recorded in an existing detected-llms.json, if it has endpoints"""
+    if not path:
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            endpoints = json.load(f).get("endpoints")
+    except (OSError, ValueError):
+        return None
+    if not isinstance(endpoints, list):
+        return None
+    table = EndpointTable()
+    for endpoint in endpoints:
+        table.seen(endpoint)
+    return table.state()
+
+
+def write_atomic(path: str, payload: Dict[str, Any]):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def print_table(endpoints: List[Dict[str, Any]], out=sys.stderr):
+    print(f"{'endpoint':<28} {'server':<10} {'ms':>7}  models", file=out)
+    for e in endpoints:
+        names = ', '.join(m["model"] for m in e["models"]) or '-'
+        print(f"{e['host'] + ':' + str(e['port']):<28} {e['server']:<10} {e['latency_ms']:>7}  "
+              f"{names}", file=out)
+    out.flush()
+
+
+async def watch(hosts: List[str], ports: List[int], json_path: Optional[str] = DETECTED_PATH,
+                interval: float = CHECK_INTERVAL, sweep_interval: float = SWEEP_INTERVAL,
+                sweep_rate: float = SWEEP_RATE, down_after: int = DOWN_AFTER,
+                concurrency: int = DEFAULT_CONCURRENCY, per_host: int = DEFAULT_PER_HOST,
+                connect_timeout: float = CONNECT_TIMEOUT, http_timeout: float = HTTP_TIMEOUT,
+                retry_max: float = RETRY_MAX, emit=None, iterations: Optional[int] = None):
+    """
+    Run the watch loop; emit(events, table) is called after every round with changes
+
+    iterations bounds the number of check rounds (None runs forever).
+    """
+    loop = asyncio.get_running_loop()
+    table = EndpointTable(down_after)
+    written = load_state(json_path)
+    session = new_session()
+    pool = ThreadPoolExecutor(max_workers=PROBE_WORKERS)
+
+    addresses: Dict[str, str] = {}
+    for host in hosts:
+        try:
+            addresses[host] = (await loop.run_in_executor(None, resolve_host, host))[1]
+        except (socket.gaierror, UnicodeError):
+            pass  # scan() reports it
+    local_hosts = [h for h in addresses if choose_discovery("auto", addresses[h]) == "procfs"]
+    remote_hosts = [h for h in hosts if h not in local_hosts]
+    listeners: Dict[str, Set[int]] = {}
+    # Listening local ports with no endpoint: (failed probes, next probe due)
+    retry: Dict[Key, Tuple[int, float]] = {}
+    sweep: Optional[asyncio.Task] = None
+    last_sweep = time.monotonic()
+
+    def backoff(key: Key):
+        attempts = retry[key][0] + 1 if key in retry else 1
+        retry[key] = (attempts, time.monotonic() + min(interval * 2 ** attempts, retry_max))
+
+    def publish(events: List[Dict[str, Any]]):
+        nonlocal written
+        events = [e for e in events if e is not None]
+        if events and emit is not None:
+            emit(events, table.snapshot())
+        # Compared even without events, so a stale file is replaced after the first scan
+        state = table.state()
+        if json_path and state != written:
+            write_atomic(json_path, detected_llms(table.snapshot()))
+            written = state
+
+    async def probe(host: str, port: int) -> List[Dict[str, Any]]:
+        return await loop.run_in_executor(
+            pool, partial(fingerprint, host, [port], session=session, timeout=http_timeout))
+
+    def snapshot_listeners(host: str) -> Set[int]:
+        try:
+            return set(procfs_ports(addresses[host], ports))
+        except OSError:
+            return set()
+
+    try:
+        first = await scan(hosts, ports, concurrency, connect_timeout, http_timeout,
+                           per_host=per_host, rate=sweep_rate if remote_hosts else None)
+        publish([table.seen(e) for e in first["endpoints"]])
+        for host in local_hosts:
+            listeners[host] = snapshot_listeners(host)
+            for port in listeners[host]:
+                if (host, port) not in table.endpoints:
+                    backoff((host, port))
+
+        rounds = 0
+        while iterations is None or rounds < iterations:
+            await asyncio.sleep(interval)
+            rounds += 1
+            events: List[Optional[Dict[str, Any]]] = []
+
+            # Local hosts: diff the kernel's listener table
+            now = time.monotonic()
+            for host in local_hosts:
+                current = snapshot_listeners(host)
+                for port in sorted(listeners[host] - current):
+                    events.append(table.missed((host, port), force=True))
+                    retry.pop((host, port), None)
+                for port in current - listeners[host]:
+                    retry[(host, port)] = (0, now)
+                listeners[host] = current
+
+            # Re-check everything known, plus listeners whose retry is due
+            known = [key for key in table.endpoints]
+            targets = known + sorted(key for key, (_, due) in retry.items()
+                                     if due <= now and key not in table.endpoints)
+            results = await asyncio.gather(*(probe(host, port) for host, port in targets))
+            for key, found in zip(targets, results):
+                if found:
+                    events.extend(table.seen(e) for e in found)
+                    retry.pop(key, None)
+                    continue
+                if key in table.endpoints:
+                    event = table.missed(key)
+                    events.append(event)
+                    if event is None:
+                        continue
+                if key[1] in listeners.get(key[0], ()):
+                    # Still listening, just not answering as an LLM (yet)
+                    backoff(key)
+
+            # Remote hosts: an occasional low-rate sweep in the background
+            if sweep is not None and sweep.done():
+                try:
+                    events.extend(table.seen(e) for e in sweep.result()["endpoints"])
+                except Exception as e:
+                    # Logged and retried on schedule; one failed sweep must not end the watch
+                    print(f"Sweep of {', '.join(remote_hosts)} failed: {e!r}", file=sys.stderr,
+                          flush=True)
+                sweep = None
+            if (remote_hosts and sweep is None
+                    and time.monotonic() - last_sweep >= sweep_interval):
+                last_sweep = time.monotonic()
+                sweep = asyncio.ensure_future(scan(
+                    remote_hosts, ports, concurrency, connect_timeout, http_timeout,
+                    discovery="connect", per_host=per_host, rate=sweep_rate))
+
+            publish(events)
+    finally:
+        if sweep is not None:
+            sweep.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+        session.close()
+    return table.snapshot()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch for LLM endpoints coming up or going down")
+    parser.add_argument("--host", action="append", dest="hosts", metavar="TARGET",
+                        help="Host, address or CIDR range; repeat or comma-separate "
+                             "(default: localhost)")
+    parser.add_argument("--ports", help="Ports to watch (default: 1-65535 for one host, "
+                                        "known for several)")
+    parser.add_argument("--interval", type=float, default=CHECK_INTERVAL,
+                        help="Seconds between re-checks of known endpoints and procfs diffs")
+    parser.add_argument("--sweep-interval", type=float, default=SWEEP_INTERVAL,
+                        help="Seconds between connect sweeps of non-local hosts")
+    parser.add_argument("--sweep-rate", type=float, default=SWEEP_RATE,
+                        help="Connects per second during a sweep")
+    parser.add_argument("--down-after", type=int, default=DOWN_AFTER,
+                        help="Consecutive failed re-checks before an endpoint is reported down")
+    parser.add_argument("--retry-max", type=float, default=RETRY_MAX,
+                        help="Longest wait between probes of a listening but unidentified "
+                             "local port")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST)
+    parser.add_argument("--http-timeout", type=float, default=HTTP_TIMEOUT)
+    parser.add_argument("--json", dest="json_path", default=DETECTED_PATH,
+                        help="detected-llms.json to keep up to date ('' to disable)")
+    parser.add_argument("--events-jsonl", action="store_true",
+                        help="Print events as JSON lines instead of text and a table")
+    args = parser.parse_args(argv)
+
+    hosts = expand_targets(args.hosts or [DEFAULT_HOST])
+    ports = parse_ports(args.ports or (DEFAULT_PORTS if len(hosts) == 1 else 'known'))
+
+    def emit(events, endpoints):
+        for event in events:
+            if args.events_jsonl:
+                print(json.dumps(event), flush=True)
+            else:
+                print(f"[{event['at']}] {event['event']:<7} {event['host']}:{event['port']} "
+                      f"{event['server']} {', '.join(event['models']) or '-'}", flush=True)
+        if not args.events_jsonl:
+            print_table(endpoints)
+
+    try:
+        asyncio.run(watch(hosts, ports, json_path=args.json_path or None,
+                          interval=args.interval, sweep_interval=args.sweep_interval,
+                          sweep_rate=args.sweep_rate, down_after=max(1, args.down_after),
+                          concurrency=max_concurrency(max(1, args.concurrency)),
+                          per_host=max(1, args.per_host), http_timeout=args.http_timeout,
+                          retry_max=args.retry_max, emit=emit))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
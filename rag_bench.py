@@ -0,0 +1,191 @@
+"""
+RAG Retrieval Benchmark
+Runs a golden set of query -> expected-document pairs against the index and
+reports retrieval quality and per-query latency, so index, encoder and
+cache changes can be compared on numbers.
+
+Quality: recall@k (share of a query's expected documents that appear among
+the top-k hits' sources) and MRR (1 / rank of the first hit from an
+expected document, 0 if none). Latency: p50/p95/p99 per query, split into
+encode time and search time (index search, re-ranking, BM25 fusion and
+snippet lookup).
+
+Golden set: JSONL, one {"id", "query", "expected": [source paths]} per
+line, with paths relative to the indexed root (see rag_golden_queries.jsonl).
+
+Usage:
+    python rag_bench.py [--golden rag_golden_queries.jsonl] [-k 5] [--repeat 5] [--json out.json]
+    python rag_bench.py --onnx model.onnx --cache --modes vector hybrid
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from rag_build_index import percentile_ms
+from rag_query import DEFAULT_K, INDEX_PATH, MODEL_NAME, ROOT, RagSearcher
+
+GOLDEN_PATH = os.path.join(ROOT, 'rag_golden_queries.jsonl')
+MODES = ("vector", "hybrid")
+PERCENTILES = (50, 95, 99)
+
+
+def load_golden(path: str) -> List[Dict[str, Any]]:
+    """Read the golden set, skipping blank lines"""
+    golden = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if not record.get("query") or not record.get("expected"):
+                raise ValueError(f"{path}:{line_no}: needs 'query' and 'expected'")
+            record.setdefault("id", line_no)
+            golden.append(record)
+    return golden
+
+
+def score_hits(hits: List[Dict[str, Any]], expected: List[str], k: int) -> Dict[str, Any]:
+    """recall@k and reciprocal rank of one query's hits against its expected sources"""
+    sources = [hit.get("source") for hit in hits[:k]]
+    wanted = set(expected)
+    found = wanted.intersection(sources)
+    rank = next((pos for pos, source in enumerate(sources, start=1) if source in wanted), None)
+    return {
+        "recall": len(found) / len(wanted),
+        "rr": 1.0 / rank if rank else 0.0,
+        "first_rank": rank,
+        "sources": sources,
+    }
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    return {f"p{pct}_ms": percentile_ms(samples, pct) for pct in PERCENTILES}
+
+
+def run_mode(searcher: RagSearcher, golden: List[Dict[str, Any]], k: int, hybrid: bool,
+             repeat: int) -> Dict[str, Any]:
+    """
+    Time and score every golden query, one query at a time
+
+    Each query runs `repeat` times; quality comes from the first run, latency
+    percentiles from all of them.
+    """
+    encode_s: List[float] = []
+    search_s: List[float] = []
+    total_s: List[float] = []
+    per_query = []
+    for record in golden:
+        query = [record["query"]]
+        hits = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            vectors = searcher.encode(query)
+            encoded = time.perf_counter()
+            results = searcher.search_encoded(query, vectors, k=k, hybrid=hybrid)
+            done = time.perf_counter()
+            encode_s.append(encoded - started)
+            search_s.append(done - encoded)
+            total_s.append(done - started)
+            if hits is None:
+                hits = results[0]
+        scored = score_hits(hits, record["expected"], k)
+        scored["id"] = record["id"]
+        per_query.append(scored)
+
+    count = len(per_query)
+    return {
+        f"recall@{k}": round(sum(q["recall"] for q in per_query) / count, 4),
+        "mrr": round(sum(q["rr"] for q in per_query) / count, 4),
+        "encode": latency_summary(encode_s),
+        "search": latency_summary(search_s),
+        "total": latency_summary(total_s),
+        "queries": per_query,
+    }
+
+
+def run_benchmark(golden: List[Dict[str, Any]], index_path: str = INDEX_PATH,
+                  model_name: str = MODEL_NAME, k: int = DEFAULT_K, repeat: int = 5,
+                  modes=MODES, use_cache: bool = False, onnx_path: Optional[str] = None,
+                  mmap: bool = True) -> Dict[str, Any]:
+    """Benchmark each retrieval mode against the golden set; modes needing BM25 are skipped without it"""
+    searcher = RagSearcher(model_name=model_name, index_path=index_path, use_cache=use_cache,
+                           onnx_path=onnx_path, mmap=mmap)
+    if searcher.docstore is None:
+        raise FileNotFoundError(f"No document store next to {index_path}; golden queries are "
+                                "matched by source path, rebuild it with rag_build_index.py")
+
+    # Warm-up so one-off lazy initialization is not counted against the first query
+    searcher.search([golden[0]["query"]], k=k)
+
+    report: Dict[str, Any] = {
+        "index": index_path,
+        "index_type": searcher.index_meta.get("index_type"),
+        "encoder": searcher.encoder_name,
+        "ntotal": int(searcher.index.ntotal),
+        "k": k,
+        "repeat": repeat,
+        "cache": use_cache,
+        "golden_queries": len(golden),
+        "modes": {},
+    }
+    for mode in modes:
+        if mode == "hybrid" and searcher.bm25 is None:
+            report["modes"][mode] = {"error": "no BM25 index"}
+            continue
+        report["modes"][mode] = run_mode(searcher, golden, k, mode == "hybrid", repeat)
+    report["cache_stats"] = searcher.cache_stats()
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    k = report["k"]
+    print(f"{report['golden_queries']} golden queries, k={k}, {report['index_type']} index "
+          f"({report['ntotal']} vectors), encoder {report['encoder']}, "
+          f"cache {'on' if report['cache'] else 'off'}")
+    print(f"{'mode':<8} {'recall@' + str(k):>9} {'MRR':>6} "
+          f"{'enc p50':>8} {'enc p95':>8} {'enc p99':>8} "
+          f"{'srch p50':>9} {'srch p95':>9} {'srch p99':>9}")
+    for mode, result in report["modes"].items():
+        if "error" in result:
+            print(f"{mode:<8} skipped: {result['error']}")
+            continue
+        enc, srch = result["encode"], result["search"]
+        print(f"{mode:<8} {result[f'recall@{k}']:>9.3f} {result['mrr']:>6.3f} "
+              f"{enc['p50_ms']:>8.2f} {enc['p95_ms']:>8.2f} {enc['p99_ms']:>8.2f} "
+              f"{srch['p50_ms']:>9.3f} {srch['p95_ms']:>9.3f} {srch['p99_ms']:>9.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark RAG retrieval against golden queries")
+    parser.add_argument("--golden", default=GOLDEN_PATH, help="Golden set JSONL")
+    parser.add_argument("--index", default=INDEX_PATH)
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("-k", type=int, default=DEFAULT_K)
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Timed runs per query for the latency percentiles")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--cache", action="store_true",
+                        help="Go through the embedding cache (off by default so encode time is real)")
+    parser.add_argument("--onnx", metavar="MODEL_ONNX", help="Encode with this ONNX model")
+    parser.add_argument("--no-mmap", action="store_true")
+    parser.add_argument("--json", dest="json_path", help="Write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    golden = load_golden(args.golden)
+    report = run_benchmark(golden, index_path=args.index, model_name=args.model, k=args.k,
+                           repeat=max(1, args.repeat), modes=args.modes, use_cache=args.cache,
+                           onnx_path=args.onnx, mmap=not args.no_mmap)
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to: {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
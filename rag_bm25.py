@@ -0,0 +1,167 @@
+"""
+RAG Keyword Index
+BM25 over the same chunks (and FAISS ids) as doc_index.faiss, for exact
+terms such as "HIPAA", "NIS2" or "CMMC" that MiniLM similarity ranks poorly.
+
+Everything that does not depend on the query is computed at build time:
+each posting stores its final BM25 weight, so a lookup is a binary search
+in the term table plus a sum over memory-mapped postings.
+
+File layout (little endian):
+    header   magic b'RAGBM25\\x01' | uint64 slot_count | uint64 term_count
+             | uint64 terms_offset | uint64 strings_offset | float32 k1 | float32 b
+    terms    term_count x (uint32 str_offset, uint16 str_len, uint32 df,
+             uint64 postings_offset), sorted by term
+    strings  utf-8 term text
+    postings per term: df x (uint32 doc_id, float32 weight)
+"""
+
+import math
+import mmap
+import os
+import re
+import struct
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+MAGIC = b'RAGBM25\x01'
+HEADER = struct.Struct('<8sQQQQff')
+TERM = struct.Struct('<IHIQ')
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+
+
+def bm25_path(index_path: str) -> str:
+    """doc_index.faiss -> doc_index.bm25"""
+    return os.path.splitext(index_path)[0] + '.bm25'
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def build_bm25(store, out_path: str, k1: float = BM25_K1, b: float = BM25_B) -> int:
+    """
+    Write a BM25 index for every record in a DocStore
+
+    Returns the number of distinct terms.
+    """
+    postings: Dict[str, List[Tuple[int, int]]] = {}
+    lengths: Dict[int, int] = {}
+    for doc_id in range(len(store)):
+        record = store.get(doc_id)
+        if record is None:
+            continue
+        counts = Counter(tokenize(record["text"]))
+        lengths[doc_id] = sum(counts.values())
+        for term, tf in counts.items():
+            postings.setdefault(term, []).append((doc_id, tf))
+
+    docs = len(lengths)
+    avgdl = sum(lengths.values()) / docs if docs else 1.0
+    terms = sorted(postings)
+    strings = b''.join(t.encode('utf-8') for t in terms)
+    terms_offset = HEADER.size
+    strings_offset = terms_offset + TERM.size * len(terms)
+    postings_offset = strings_offset + len(strings)
+
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(store), len(terms), terms_offset, strings_offset, k1, b))
+        str_offset = 0
+        post_offset = postings_offset
+        for term in terms:
+            encoded = term.encode('utf-8')
+            f.write(TERM.pack(str_offset, len(encoded), len(postings[term]), post_offset))
+            str_offset += len(encoded)
+            post_offset += len(postings[term]) * 8
+        f.write(strings)
+        for term in terms:
+            plist = postings[term]
+            idf = math.log(1 + (docs - len(plist) + 0.5) / (len(plist) + 0.5))
+            for doc_id, tf in plist:
+                norm = tf + k1 * (1 - b + b * lengths[doc_id] / avgdl)
+                f.write(struct.pack('<If', doc_id, idf * tf * (k1 + 1) / norm))
+    os.replace(tmp_path, out_path)
+    return len(terms)
+
+
+class BM25Index:
+    """Read-only, memory-mapped BM25 index written by build_bm25"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.slot_count, self.term_count, self._terms_offset,
+         self._strings_offset, self.k1, self.b) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a RAG BM25 index")
+
+    def _term(self, pos: int) -> Tuple[bytes, int, int]:
+        str_offset, str_len, df, post_offset = TERM.unpack_from(
+            self._map, self._terms_offset + pos * TERM.size)
+        start = self._strings_offset + str_offset
+        return self._map[start:start + str_len], df, post_offset
+
+    def postings(self, term: str):
+        """(doc_ids, weights) arrays for a term, viewed straight from the mapping"""
+        import numpy as np
+
+        key = term.encode('utf-8')
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.term_count:
+            found, df, post_offset = self._term(lo)
+            if found == key:
+                entries = np.frombuffer(self._map, dtype=[('id', '<u4'), ('w', '<f4')],
+                                        count=df, offset=post_offset)
+                return entries['id'], entries['w']
+        return np.empty(0, dtype='<u4'), np.empty(0, dtype='<f4')
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Top-k (doc_id, bm25 score) pairs for a query"""
+        import numpy as np
+
+        hits = [self.postings(term) for term in sorted(set(tokenize(query)))]
+        hits = [(ids, weights) for ids, weights in hits if len(ids)]
+        if not hits:
+            return []
+        ids, inverse = np.unique(np.concatenate([h[0] for h in hits]), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate([h[1] for h in hits]))
+        top = np.argsort(-scores, kind='stable')[:k]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def open_bm25(index_path: str) -> Optional[BM25Index]:
+    """Open the keyword index for index_path if one has been built"""
+    path = bm25_path(index_path)
+    if not os.path.exists(path):
+        return None
+    return BM25Index(path)
+
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int,
+                           rrf_k: int = RRF_K) -> List[Tuple[int, float]]:
+    """
+    Merge ranked id lists: score(d) = sum over lists of 1 / (rrf_k + rank)
+
+    Returns the top k (doc_id, fused score) pairs.
+    """
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(fused.items(), key=lambda item: (-item[1], item[0]))[:k]
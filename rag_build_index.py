@@ -0,0 +1,562 @@
+"""
+RAG Index Builder
+Chunks the repo's markdown docs, embeds them, and writes doc_index.faiss
+together with its doc_index.docs sidecar so every FAISS id maps back to
+its source chunk.
+
+A BM25 keyword index over the same chunks is written to doc_index.bm25
+for rag_query.py --hybrid.
+
+Supports flat (exact), IVF and HNSW indexes, plus SQ8 and PQ compressed
+indexes that keep 4-16x less in RAM. With --rerank the full-precision
+vectors are also saved to doc_index.vectors.npy, which rag_query
+memory-maps to exactly re-rank the compressed index's top candidates.
+--compare builds every type from the same embeddings and reports recall@k
+against the flat baseline, p50/p99 single-query latency and memory
+footprint.
+
+A normal build streams: documents are read and chunked lazily, batches are
+embedded across --workers processes (each loading the model once) with a
+bounded number in flight, and finished batches are appended to the index in
+corpus order. IVF/SQ8/PQ indexes are trained on the first --train-size
+vectors before the rest are added, so memory stays flat as the corpus grows.
+
+Usage:
+    python rag_build_index.py [--root .] [--index doc_index.faiss] [--index-type hnsw]
+    python rag_build_index.py --workers 0          # one embedding process per core
+    python rag_build_index.py --index-type pq --rerank
+    python rag_build_index.py --compare [--report report.json]
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from rag_bm25 import bm25_path, build_bm25
+from rag_docstore import (CHUNK_OVERLAP, CHUNK_SIZE, DOC_PATTERNS, DocStore, DocStoreWriter,
+                          docstore_path, iter_chunks)
+from rag_query import (DEFAULT_BATCH_SIZE, DEFAULT_K, INDEX_PATH, MODEL_NAME, ROOT,
+                       index_meta_path, manifest_path, rerank_exact, vectors_path)
+
+INDEX_TYPES = ("flat", "ivf", "hnsw", "sq8", "pq")
+COMPRESSED_TYPES = ("sq8", "pq")
+PQ_M = 96
+RERANK_FACTOR = 4
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = 64
+EVAL_QUERIES = 200
+TRAIN_SAMPLE = 65536
+TRAINED_TYPES = ("ivf", "sq8", "pq")
+
+
+def default_nlist(ntotal: int) -> int:
+    """IVF list count: ~4*sqrt(n), capped so each centroid gets ~39 training points"""
+    return max(1, min(int(4 * math.sqrt(ntotal)), ntotal // 39))
+
+
+# Per-process encoder for the embedding pool (or the main process when workers <= 1)
+_EMBED_MODEL = None
+
+
+def _init_embed_worker(model_name: str, threads: Optional[int] = None):
+    """Load the encoder once per process; cap torch threads so workers don't oversubscribe"""
+    global _EMBED_MODEL
+    if threads:
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+    from sentence_transformers import SentenceTransformer
+    _EMBED_MODEL = SentenceTransformer(model_name)
+
+
+def _embed_batch(texts: List[str], batch_size: int):
+    import numpy as np
+
+    return np.asarray(_EMBED_MODEL.encode(texts, batch_size=batch_size), dtype='float32')
+
+
+def resolve_workers(workers: int) -> int:
+    """0 means one embedding process per core"""
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def iter_chunk_batches(chunks: Iterable[Dict[str, Any]],
+                       batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group chunk records into lists of batch_size without reading ahead"""
+    batch = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def embed_batches(batches: Iterable[List[Dict[str, Any]]], model_name: str = MODEL_NAME,
+                  batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1,
+                  max_in_flight: Optional[int] = None) -> Iterator[Tuple[List[Dict[str, Any]], Any]]:
+    """
+    Yield (batch, vectors) for each chunk batch, in input order
+
+    With workers > 1 the batches are encoded in a process pool. At most
+    max_in_flight batches (default 2 per worker) are queued at once, so the
+    upstream generator is only pulled as fast as the pool drains it.
+    """
+    workers = resolve_workers(workers)
+    if workers <= 1:
+        if _EMBED_MODEL is None:
+            _init_embed_worker(model_name)
+        for batch in batches:
+            yield batch, _embed_batch([c["text"] for c in batch], batch_size)
+        return
+
+    max_in_flight = max_in_flight or 2 * workers
+    threads = max(1, (os.cpu_count() or workers) // workers)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_embed_worker,
+                             initargs=(model_name, threads)) as pool:
+        for batch in batches:
+            pending.append((batch, pool.submit(_embed_batch, [c["text"] for c in batch],
+                                               batch_size)))
+            if len(pending) >= max_in_flight:
+                done, future = pending.popleft()
+                yield done, future.result()
+        while pending:
+            done, future = pending.popleft()
+            yield done, future.result()
+
+
+def _stored_chunks(chunks: Iterable[Dict[str, Any]], store: DocStoreWriter,
+                   documents: set) -> Iterator[Dict[str, Any]]:
+    """Pass chunks through, recording each in the document store under its FAISS id"""
+    for doc_id, chunk in enumerate(chunks):
+        store.add(doc_id, chunk["source"], chunk["start"], chunk["end"], chunk["text"])
+        documents.add(chunk["source"])
+        yield chunk
+
+
+def _write_bm25(index_path: str):
+    store = DocStore(docstore_path(index_path))
+    try:
+        build_bm25(store, bm25_path(index_path))
+    finally:
+        store.close()
+
+
+def embed_corpus(root: str = ROOT, index_path: str = INDEX_PATH, model_name: str = MODEL_NAME,
+                 patterns=DOC_PATTERNS, chunk_size: int = CHUNK_SIZE,
+                 overlap: int = CHUNK_OVERLAP, batch_size: int = DEFAULT_BATCH_SIZE,
+                 workers: int = 1):
+    """
+    Embed every chunk under root and write the document store and BM25 sidecars
+
+    Row i of the returned matrix is FAISS id i in the sidecar. Used by
+    --compare, which needs every vector in memory; plain builds stream
+    through build_streaming instead.
+    Returns (model, vectors, document count); model is None when the
+    embedding ran in worker processes.
+    """
+    import numpy as np
+
+    parts = []
+    documents: set = set()
+    with DocStoreWriter(docstore_path(index_path)) as store:
+        chunks = _stored_chunks(iter_chunks(root, patterns, chunk_size, overlap), store, documents)
+        for _, vectors in embed_batches(iter_chunk_batches(chunks, batch_size), model_name,
+                                        batch_size, workers):
+            parts.append(vectors)
+    _write_bm25(index_path)
+
+    model = _EMBED_MODEL if resolve_workers(workers) <= 1 else None
+    if not parts:
+        raise ValueError(f"No documents matching {list(patterns)} under {root}")
+    return model, np.vstack(parts), len(documents)
+
+
+def pq_nbits(ntotal: int) -> int:
+    """Bits per PQ code: 8 normally, fewer when there are too few vectors to train 256 centroids"""
+    return max(1, min(8, int(math.log2(max(ntotal, 2)))))
+
+
+def new_faiss_index(train_vectors, index_type: str = "flat", nlist: Optional[int] = None,
+                    nprobe: Optional[int] = None, hnsw_m: int = HNSW_M,
+                    ef_search: int = HNSW_EF_SEARCH, pq_m: int = PQ_M):
+    """
+    Create an empty FAISS index, trained on train_vectors where the type needs it
+
+    Flat and HNSW only take the dimension from train_vectors. Defaults that
+    depend on corpus size (nlist, PQ bits) are sized from the training set.
+    Returns (index, meta) where meta holds the search-time parameters that
+    rag_query.load_index re-applies after reading the file back.
+    """
+    import faiss
+
+    ntrain, dim = train_vectors.shape
+    meta: Dict[str, Any] = {"index_type": index_type, "dimension": int(dim)}
+
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == "ivf":
+        nlist = nlist or default_nlist(ntrain)
+        nprobe = nprobe or max(min(nlist, 4), nlist // 8)
+        index = faiss.IndexIVFFlat(faiss.IndexFlatL2(dim), dim, nlist)
+        index.train(train_vectors)
+        index.nprobe = nprobe
+        meta.update({"nlist": nlist, "nprobe": nprobe})
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = ef_search
+        meta.update({"hnsw_m": hnsw_m, "ef_search": ef_search})
+    elif index_type == "sq8":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit)
+        index.train(train_vectors)
+    elif index_type == "pq":
+        if dim % pq_m:
+            raise ValueError(f"pq_m={pq_m} must divide the embedding dimension {dim}")
+        nbits = pq_nbits(ntrain)
+        index = faiss.IndexPQ(dim, pq_m, nbits)
+        # Small corpora are below faiss's 39-points-per-centroid guideline; train anyway, quietly
+        index.pq.cp.min_points_per_centroid = 1
+        index.train(train_vectors)
+        meta.update({"pq_m": pq_m, "pq_nbits": nbits})
+    else:
+        raise ValueError(f"Unknown index type: {index_type} (expected one of {INDEX_TYPES})")
+
+    return index, meta
+
+
+def build_faiss_index(vectors, index_type: str = "flat", **params):
+    """
+    Build and populate one FAISS index over vectors
+
+    Returns (index, meta); see new_faiss_index for params.
+    """
+    index, meta = new_faiss_index(vectors, index_type, **params)
+    index.add(vectors)
+    meta["ntotal"] = int(index.ntotal)
+    return index, meta
+
+
+def build_streaming(root: str = ROOT, index_path: str = INDEX_PATH, model_name: str = MODEL_NAME,
+                    patterns=DOC_PATTERNS, chunk_size: int = CHUNK_SIZE,
+                    overlap: int = CHUNK_OVERLAP, batch_size: int = DEFAULT_BATCH_SIZE,
+                    workers: int = 1, index_type: str = "flat", train_size: int = TRAIN_SAMPLE,
+                    rerank_factor: int = 0, **params) -> Dict[str, Any]:
+    """
+    Embed the corpus batch by batch and append to the index as batches finish
+
+    Only the in-flight batches (plus, for trained index types, the first
+    train_size vectors) are ever held in memory. With rerank_factor the
+    full-precision vectors are spooled to disk and saved as the .vectors.npy
+    sidecar. Writes the index, meta, document store and BM25 sidecars and
+    returns build stats.
+    """
+    import numpy as np
+
+    started = time.perf_counter()
+    index = meta = None
+    training: List[Any] = []
+    buffered = 0
+    documents: set = set()
+    spool_path = vectors_path(index_path) + '.spool'
+    spool = open(spool_path, 'wb') if rerank_factor else None
+
+    def start_index(train_vectors):
+        new_index, new_meta = new_faiss_index(train_vectors, index_type, **params)
+        if index_type in TRAINED_TYPES:
+            new_meta["train_size"] = int(len(train_vectors))
+        return new_index, new_meta
+
+    try:
+        with DocStoreWriter(docstore_path(index_path)) as store:
+            chunks = _stored_chunks(iter_chunks(root, patterns, chunk_size, overlap), store,
+                                    documents)
+            for _, vectors in embed_batches(iter_chunk_batches(chunks, batch_size), model_name,
+                                            batch_size, workers):
+                if spool is not None:
+                    spool.write(vectors.tobytes())
+                if index is None and index_type in TRAINED_TYPES:
+                    training.append(vectors)
+                    buffered += len(vectors)
+                    if buffered < train_size:
+                        continue
+                    sample = np.vstack(training)
+                    training, buffered = [], 0
+                    index, meta = start_index(sample)
+                    index.add(sample)
+                    continue
+                if index is None:
+                    index, meta = start_index(vectors)
+                index.add(vectors)
+
+            if index is None and training:
+                # Corpus smaller than the training sample: train on all of it
+                sample = np.vstack(training)
+                index, meta = start_index(sample)
+                index.add(sample)
+            if index is None:
+                raise ValueError(f"No documents matching {list(patterns)} under {root}")
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            os.remove(spool_path)
+        raise
+
+    _write_bm25(index_path)
+
+    meta.update({"ntotal": int(index.ntotal), "model": model_name,
+                 "bytes": index_bytes(index), "bytes_per_vector": code_bytes(index)})
+    rerank_vectors = None
+    if spool is not None:
+        spool.close()
+        meta["rerank_factor"] = rerank_factor
+        rerank_vectors = np.memmap(spool_path, dtype='float32', mode='r',
+                                   shape=(int(index.ntotal), int(index.d)))
+    try:
+        write_index(index, meta, index_path, rerank_vectors=rerank_vectors)
+    finally:
+        if spool is not None:
+            del rerank_vectors
+            os.remove(spool_path)
+
+    return {"chunks": int(index.ntotal), "documents": len(documents), "meta": meta,
+            "workers": resolve_workers(workers), "seconds": round(time.perf_counter() - started, 2)}
+
+
+def percentile_ms(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = min(len(ordered) - 1, max(0, int(math.ceil(pct / 100 * len(ordered))) - 1))
+    return round(ordered[rank] * 1000, 4)
+
+
+def index_bytes(index) -> int:
+    """Serialized size of an index, a close proxy for its resident memory"""
+    import faiss
+
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def code_bytes(index) -> int:
+    """
+    Bytes stored per vector, excluding fixed costs such as PQ codebooks
+
+    This is what the footprint converges to as the corpus grows. IVF adds an
+    8-byte id per entry and HNSW its level-0 neighbour links.
+    """
+    import faiss
+
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        links = index.hnsw.nb_neighbors(0) * 4
+        return code_bytes(index.storage) + links
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return int(ivf.code_size) + 8
+    return int(index.sa_code_size())
+
+
+def evaluate_index(index, queries, truth, k: int = DEFAULT_K, rerank_vectors=None,
+                   rerank_factor: int = RERANK_FACTOR) -> Dict[str, Any]:
+    """
+    Measure recall@k against exact neighbours and single-query latency
+
+    Args:
+        index: FAISS index to evaluate
+        queries: float32 query matrix
+        truth: ids from the flat baseline, shape (len(queries), k)
+        k: neighbours per query
+        rerank_vectors: full-precision vectors to re-rank k * rerank_factor candidates with
+    """
+    hits = 0
+    latencies = []
+    for row in range(len(queries)):
+        query = queries[row:row + 1]
+        started = time.perf_counter()
+        if rerank_vectors is None:
+            _, I = index.search(query, k)
+        else:
+            _, candidates = index.search(query, k * rerank_factor)
+            _, I = rerank_exact(query, candidates, rerank_vectors, k)
+        latencies.append(time.perf_counter() - started)
+        hits += len(set(I[0].tolist()) & set(truth[row].tolist()))
+
+    total = len(queries) * k
+    return {
+        f"recall@{k}": round(hits / total, 4) if total else 0.0,
+        "p50_ms": percentile_ms(latencies, 50),
+        "p99_ms": percentile_ms(latencies, 99),
+    }
+
+
+def write_index(index, meta: Dict[str, Any], index_path: str, rerank_vectors=None):
+    """
+    Write index and its meta JSON atomically
+
+    rerank_vectors, when given, are saved as the .vectors.npy sidecar; any
+    stale sidecar from an earlier build is removed otherwise. The incremental
+    manifest only describes the index it was written with, so it is removed
+    too; rag_incremental.py writes a fresh one after calling this.
+    """
+    import faiss
+    import numpy as np
+
+    tmp_path = index_path + '.tmp'
+    faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, index_path)
+
+    npy_path = vectors_path(index_path)
+    if rerank_vectors is not None:
+        with open(npy_path + '.tmp', 'wb') as f:
+            np.save(f, np.ascontiguousarray(rerank_vectors, dtype='float32'))
+        os.replace(npy_path + '.tmp', npy_path)
+    elif os.path.exists(npy_path):
+        os.remove(npy_path)
+    with open(index_meta_path(index_path), 'w') as f:
+        json.dump(meta, f, indent=2)
+    if os.path.exists(manifest_path(index_path)):
+        os.remove(manifest_path(index_path))
+
+
+def sample_queries(model, vectors, query_file: Optional[str], n: int = EVAL_QUERIES):
+    """Evaluation queries: encoded lines from query_file, or a sample of corpus vectors"""
+    import numpy as np
+
+    if query_file:
+        with open(query_file, 'r', encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+        return np.asarray(model.encode(texts), dtype='float32')
+    rng = np.random.default_rng(0)
+    picks = rng.choice(len(vectors), size=min(n, len(vectors)), replace=False)
+    return vectors[np.sort(picks)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the RAG FAISS index and document store")
+    parser.add_argument("--root", default=ROOT, help="Directory to index")
+    parser.add_argument("--index", default=INDEX_PATH, help="Output index path")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--pattern", action="append", dest="patterns",
+                        help="Filename glob to include (default: *.md)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--overlap", type=int, default=CHUNK_OVERLAP)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Embedding processes, each with its own model (0 = one per core)")
+    parser.add_argument("--train-size", type=int, default=TRAIN_SAMPLE,
+                        help="Vectors buffered to train ivf/sq8/pq before streaming the rest in")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat",
+                        help="Index type to write")
+    parser.add_argument("--nlist", type=int, help="IVF lists (default ~4*sqrt(n))")
+    parser.add_argument("--nprobe", type=int, help="IVF lists probed per query (default max(4, nlist/8))")
+    parser.add_argument("--hnsw-m", type=int, default=HNSW_M)
+    parser.add_argument("--ef-search", type=int, default=HNSW_EF_SEARCH)
+    parser.add_argument("--pq-m", type=int, default=PQ_M,
+                        help="PQ sub-quantizers; must divide the dimension (96 -> 16x smaller)")
+    parser.add_argument("--rerank", action="store_true",
+                        help="Save full vectors so queries exactly re-rank sq8/pq candidates")
+    parser.add_argument("--rerank-factor", type=int, default=RERANK_FACTOR,
+                        help="Candidates fetched per requested result when re-ranking")
+    parser.add_argument("--compare", action="store_true",
+                        help="Build every index type and report recall@k and latency")
+    parser.add_argument("-k", type=int, default=DEFAULT_K, help="k for recall@k")
+    parser.add_argument("--queries", help="Text file of evaluation queries, one per line "
+                                          "(default: sample of corpus chunks)")
+    parser.add_argument("--report", help="Write the comparison report as JSON")
+    args = parser.parse_args(argv)
+
+    params = dict(nlist=args.nlist, nprobe=args.nprobe, hnsw_m=args.hnsw_m,
+                  ef_search=args.ef_search, pq_m=args.pq_m)
+    if args.rerank and args.index_type not in COMPRESSED_TYPES:
+        parser.error(f"--rerank needs a compressed --index-type ({', '.join(COMPRESSED_TYPES)}); "
+                     f"{args.index_type} already stores full vectors")
+    rerank = args.rerank
+
+    if not args.compare:
+        stats = build_streaming(
+            root=args.root, index_path=args.index, model_name=args.model,
+            patterns=args.patterns or DOC_PATTERNS, chunk_size=args.chunk_size,
+            overlap=args.overlap, batch_size=args.batch_size, workers=args.workers,
+            index_type=args.index_type, train_size=args.train_size,
+            rerank_factor=args.rerank_factor if rerank else 0, **params)
+        meta = stats["meta"]
+        print(f"Embedded {stats['chunks']} chunks from {stats['documents']} documents "
+              f"with {stats['workers']} worker(s) in {stats['seconds']:.2f}s")
+        print(f"Wrote {args.index_type} index ({meta['bytes'] / 1024:.1f} KiB): {args.index}")
+        print(f"  docs: {docstore_path(args.index)}")
+        print(f"  bm25: {bm25_path(args.index)}")
+        if rerank:
+            print(f"  rerank vectors: {vectors_path(args.index)}")
+        return
+
+    started = time.perf_counter()
+    model, vectors, documents = embed_corpus(
+        root=args.root, index_path=args.index, model_name=args.model,
+        patterns=args.patterns or DOC_PATTERNS, chunk_size=args.chunk_size,
+        overlap=args.overlap, batch_size=args.batch_size, workers=args.workers)
+    print(f"Embedded {len(vectors)} chunks from {documents} documents "
+          f"in {time.perf_counter() - started:.2f}s")
+
+    index, meta = build_faiss_index(vectors, args.index_type, **params)
+    meta["model"] = args.model
+    meta["bytes"] = index_bytes(index)
+    meta["bytes_per_vector"] = code_bytes(index)
+    if rerank:
+        meta["rerank_factor"] = args.rerank_factor
+    write_index(index, meta, args.index, rerank_vectors=vectors if rerank else None)
+    print(f"Wrote {args.index_type} index ({meta['bytes'] / 1024:.1f} KiB): {args.index}")
+
+    if model is None and args.queries:
+        _init_embed_worker(args.model)
+        model = _EMBED_MODEL
+    queries = sample_queries(model, vectors, args.queries)
+    k = min(args.k, len(vectors))
+    baseline, _ = build_faiss_index(vectors, "flat")
+    _, truth = baseline.search(queries, k)
+
+    report = {"chunks": len(vectors), "queries": len(queries), "k": k, "indexes": {}}
+    flat_code_bytes = code_bytes(baseline)
+    print(f"\n{'type':<11} {'build_s':>8} {f'recall@{k}':>10} {'p50_ms':>8} {'p99_ms':>8} "
+          f"{'KiB':>9} {'B/vec':>6} {'ratio':>6}")
+
+    def report_row(name, row):
+        report["indexes"][name] = row
+        print(f"{name:<11} {row['build_seconds']:>8} {row[f'recall@{k}']:>10} "
+              f"{row['p50_ms']:>8} {row['p99_ms']:>8} {row['bytes'] / 1024:>9.1f} "
+              f"{row['bytes_per_vector']:>6} {row['compression']:>5}x")
+
+    for index_type in INDEX_TYPES:
+        build_started = time.perf_counter()
+        candidate, candidate_meta = build_faiss_index(vectors, index_type, **params)
+        per_vector = code_bytes(candidate)
+        row = {"build_seconds": round(time.perf_counter() - build_started, 3), **candidate_meta,
+               "bytes": index_bytes(candidate), "bytes_per_vector": per_vector,
+               "compression": round(flat_code_bytes / per_vector, 1)}
+        report_row(index_type, {**row, **evaluate_index(candidate, queries, truth, k)})
+        if index_type in COMPRESSED_TYPES:
+            # --compare holds every embedding in memory anyway, so re-rank from that
+            # array; rag_query memory-maps doc_index.vectors.npy instead
+            reranked = evaluate_index(candidate, queries, truth, k, rerank_vectors=vectors,
+                                      rerank_factor=args.rerank_factor)
+            report_row(f"{index_type}+rerank",
+                       {**row, "rerank_factor": args.rerank_factor, **reranked})
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport saved to: {args.report}")
+
+
+if __name__ == '__main__':
+    main()
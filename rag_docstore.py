@@ -0,0 +1,208 @@
+"""
+RAG Document Store
+Maps FAISS ids back to (source path, chunk offsets, text) through a compact
+memory-mapped sidecar written next to the index, so a hit resolves to its
+snippet with one offset-table lookup and no corpus load.
+
+File layout (little endian):
+    header   magic b'RAGDOCS1' | uint32 version | uint32 reserved
+             | uint64 slot_count | uint64 table_offset
+    records  per chunk: uint32 start | uint32 end | uint16 path_len
+             | path (utf-8) | text (utf-8)
+    table    slot_count x (uint64 offset, uint32 length); slot == FAISS id,
+             length 0 marks an id with no record
+"""
+
+import fnmatch
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+MAGIC = b'RAGDOCS1'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQQ')
+RECORD = struct.Struct('<IIH')
+SLOT = struct.Struct('<QI')
+
+DOC_PATTERNS = ("*.md",)
+EXCLUDE_DIRS = {".git", "node_modules", ".venv", "venv", "__pycache__", ".wrangler", ".next"}
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+SNIPPET_CHARS = 240
+
+
+def docstore_path(index_path: str) -> str:
+    """Sidecar path for an index file, e.g. doc_index.faiss -> doc_index.docs"""
+    return os.path.splitext(index_path)[0] + '.docs'
+
+
+def iter_documents(root: str, patterns: Iterable[str] = DOC_PATTERNS) -> Iterator[Tuple[str, str]]:
+    """Yield (relative path, text) for every matching document under root, one at a time"""
+    patterns = tuple(patterns)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in EXCLUDE_DIRS)
+        for name in sorted(filenames):
+            if not any(fnmatch.fnmatch(name, p) for p in patterns):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    text = f.read()
+            except OSError:
+                continue
+            yield os.path.relpath(path, root).replace(os.sep, '/'), text
+
+
+def chunk_text(text: str, chunk_size: int = CHUNK_SIZE,
+               overlap: int = CHUNK_OVERLAP) -> Iterator[Tuple[int, int, str]]:
+    """
+    Split text into overlapping windows of about chunk_size characters
+
+    Window ends are pulled back to the last paragraph break, or failing that
+    the last whitespace, so words are not cut and an edit to one paragraph
+    leaves the boundaries of later chunks where they were.
+    Yields (start, end, chunk) with character offsets into text.
+    """
+    length = len(text)
+    start = 0
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            floor = start + chunk_size // 2
+            cut = text.rfind('\n\n', floor, end)
+            if cut <= start:
+                cut = max(text.rfind(' ', floor, end), text.rfind('\n', floor, end))
+            if cut > start:
+                end = cut
+        chunk = text[start:end].strip()
+        if chunk:
+            yield start, end, chunk
+        if end >= length:
+            break
+        start = max(end - overlap, start + 1)
+
+
+def iter_chunks(root: str, patterns: Iterable[str] = DOC_PATTERNS, chunk_size: int = CHUNK_SIZE,
+                overlap: int = CHUNK_OVERLAP) -> Iterator[Dict[str, Any]]:
+    """Yield chunk records for every document under root"""
+    for source, text in iter_documents(root, patterns):
+        for start, end, chunk in chunk_text(text, chunk_size, overlap):
+            yield {"source": source, "start": start, "end": end, "text": chunk}
+
+
+class DocStoreWriter:
+    """
+    Streams chunk records to a sidecar file
+
+    Records go straight to disk; only the 12-byte offset entries are kept in
+    memory until close() writes the table. The file is written to a temp path
+    and renamed on close, so readers never see a half-written store.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tmp_path = path + '.tmp'
+        self._file = open(self._tmp_path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        self._slots: Dict[int, Tuple[int, int]] = {}
+
+    def add(self, doc_id: int, source: str, start: int, end: int, text: str):
+        """Append one record for FAISS id doc_id"""
+        path_bytes = source.encode('utf-8')
+        payload = RECORD.pack(start, end, len(path_bytes)) + path_bytes + text.encode('utf-8')
+        offset = self._file.tell()
+        self._file.write(payload)
+        self._slots[int(doc_id)] = (offset, len(payload))
+
+    def close(self):
+        slot_count = max(self._slots) + 1 if self._slots else 0
+        table_offset = self._file.tell()
+        empty = SLOT.pack(0, 0)
+        for doc_id in range(slot_count):
+            entry = self._slots.get(doc_id)
+            self._file.write(SLOT.pack(*entry) if entry else empty)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, slot_count, table_offset))
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Discard everything written so far and leave any existing store untouched"""
+        self._file.close()
+        os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class DocStore:
+    """Read-only, memory-mapped view of a sidecar written by DocStoreWriter"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.slot_count, self._table_offset = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} RAG document store")
+
+    def __len__(self) -> int:
+        return self.slot_count
+
+    def get(self, doc_id: int) -> Optional[Dict[str, Any]]:
+        """Return the record for a FAISS id, or None if the id has no record"""
+        if doc_id < 0 or doc_id >= self.slot_count:
+            return None
+        offset, length = SLOT.unpack_from(self._map, self._table_offset + doc_id * SLOT.size)
+        if length == 0:
+            return None
+        start, end, path_len = RECORD.unpack_from(self._map, offset)
+        body = offset + RECORD.size
+        return {
+            "id": int(doc_id),
+            "source": self._map[body:body + path_len].decode('utf-8'),
+            "start": start,
+            "end": end,
+            "text": self._map[body + path_len:offset + length].decode('utf-8'),
+        }
+
+    def snippet(self, doc_id: int, max_chars: int = SNIPPET_CHARS) -> Optional[Dict[str, Any]]:
+        """Like get() but with the text trimmed to a one-line snippet"""
+        record = self.get(doc_id)
+        if record is None:
+            return None
+        text = ' '.join(record.pop("text").split())
+        record["snippet"] = text if len(text) <= max_chars else text[:max_chars - 3] + '...'
+        return record
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def open_docstore(index_path: str) -> Optional[DocStore]:
+    """Open the sidecar for index_path if one has been built"""
+    path = docstore_path(index_path)
+    if not os.path.exists(path):
+        return None
+    return DocStore(path)
+
+
+def attach_snippets(hits: List[Dict[str, Any]], store: Optional[DocStore]) -> List[Dict[str, Any]]:
+    """Add source/offset/snippet fields to search hits in place"""
+    if store is None:
+        return hits
+    for hit in hits:
+        record = store.snippet(hit["id"])
+        if record is not None:
+            record.pop("id")
+            hit.update(record)
+    return hits
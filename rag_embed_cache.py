@@ -0,0 +1,181 @@
+"""
+RAG Query Embedding Cache
+Remembers query embeddings so repeated questions skip the transformer.
+
+Two tiers: an in-process LRU in front of a SQLite file on disk. Entries are
+keyed on the model name plus normalized query text; the disk tier evicts
+least-recently-used rows once it grows past a byte budget.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+DEFAULT_CACHE_PATH = os.getenv(
+    'RAG_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.rag_cache', 'embeddings.sqlite'))
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def normalize_query(text: str) -> str:
+    """
+    Collapse whitespace and case
+
+    all-MiniLM-L6-v2 uses an uncased tokenizer that also splits on
+    whitespace, so these variants already produce identical embeddings.
+    """
+    return ' '.join(text.split()).lower()
+
+
+def cache_key(model_name: str, text: str) -> str:
+    return hashlib.sha1(f"{model_name}\0{normalize_query(text)}".encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier (memory LRU + SQLite) store of float32 query embeddings
+
+    Thread-safe; one instance can be shared by every handler in rag_server.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH,
+                 memory_entries: int = DEFAULT_MEMORY_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db = None
+        self._disk_bytes = 0
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, "
+                "nbytes INTEGER NOT NULL, last_used REAL NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings(last_used)")
+            row = self._db.execute("SELECT COALESCE(SUM(nbytes), 0) FROM embeddings").fetchone()
+            self._disk_bytes = int(row[0])
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the raw float32 bytes for key, or None on a miss"""
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                return vector
+
+            if self._db is not None:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?",
+                                       (key,)).fetchone()
+                if row is not None:
+                    vector = bytes(row[0])
+                    self._db.execute("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                     (time.time(), key))
+                    self._remember(key, vector)
+                    self.hits_disk += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, vector: bytes):
+        with self._lock:
+            self._remember(key, vector)
+            if self._db is None:
+                return
+            row = self._db.execute("SELECT nbytes FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._disk_bytes -= int(row[0])
+            self._db.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector, nbytes, last_used) "
+                "VALUES (?, ?, ?, ?)", (key, vector, len(vector), time.time()))
+            self._disk_bytes += len(vector)
+            if self._disk_bytes > self.max_bytes:
+                self._evict()
+
+    def _remember(self, key: str, vector: bytes):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        """Drop least-recently-used disk rows until usage is back under 90% of the budget"""
+        target = int(self.max_bytes * 0.9)
+        rows = self._db.execute("SELECT key, nbytes FROM embeddings ORDER BY last_used").fetchall()
+        doomed = []
+        for key, nbytes in rows:
+            if self._disk_bytes <= target:
+                break
+            doomed.append((key,))
+            self._disk_bytes -= int(nbytes)
+        self._db.executemany("DELETE FROM embeddings WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits_memory + self.hits_disk + self.misses
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "hit_rate": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+                "evictions": self.evictions,
+            }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class CachedEncoder:
+    """Wraps a SentenceTransformer-like model; only cache misses reach model.encode"""
+
+    def __init__(self, model, model_name: str, cache: EmbeddingCache):
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache
+
+    def encode(self, queries: List[str], batch_size: int = 32, **kwargs):
+        import numpy as np
+
+        keys = [cache_key(self.model_name, q) for q in queries]
+        vectors: List[Any] = [None] * len(queries)
+        missing: Dict[str, List[int]] = {}
+        for pos, key in enumerate(keys):
+            if key in missing:
+                missing[key].append(pos)
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                vectors[pos] = np.frombuffer(cached, dtype='float32')
+            else:
+                missing.setdefault(key, []).append(pos)
+
+        if missing:
+            first = [positions[0] for positions in missing.values()]
+            fresh = np.asarray(self.model.encode([queries[p] for p in first], batch_size=batch_size,
+                                                 **kwargs), dtype='float32')
+            for (key, positions), vector in zip(missing.items(), fresh):
+                self.cache.put(key, vector.tobytes())
+                for pos in positions:
+                    vectors[pos] = vector
+
+        return np.vstack(vectors) if vectors else np.zeros((0, 0), dtype='float32')
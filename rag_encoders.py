@@ -0,0 +1,90 @@
+"""
+RAG Query Encoders
+Picks the query encoder for RagSearcher.
+
+The default is SentenceTransformer, which pulls in torch and dominates cold
+start. OnnxEncoder runs the same all-MiniLM-L6-v2 graph through onnxruntime
+and the `tokenizers` package instead, so a CPU-only box can start in well
+under a second. Any exported (optionally quantized) ONNX file works, e.g.
+onnx/model.onnx or onnx/model_qint8_avx512.onnx from the
+sentence-transformers/all-MiniLM-L6-v2 model repo, with tokenizer.json
+from the same repo next to it.
+"""
+
+import os
+from typing import List, Optional
+
+ONNX_MODEL_ENV = 'RAG_ONNX_MODEL'
+MAX_SEQ_LENGTH = 256
+
+
+class OnnxEncoder:
+    """
+    Mean-pooled, L2-normalized MiniLM embeddings from an ONNX graph
+
+    Matches SentenceTransformer('all-MiniLM-L6-v2').encode, whose pipeline is
+    transformer -> mean pooling -> normalize.
+    """
+
+    def __init__(self, model_path: str, tokenizer_path: Optional[str] = None,
+                 threads: Optional[int] = None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        if tokenizer_path is None:
+            model_dir = os.path.dirname(os.path.abspath(model_path))
+            candidates = [os.path.join(model_dir, 'tokenizer.json'),
+                          os.path.join(os.path.dirname(model_dir), 'tokenizer.json')]
+            tokenizer_path = next((p for p in candidates if os.path.exists(p)), candidates[0])
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, sess_options=options,
+                                            providers=['CPUExecutionProvider'])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return int(self.session.get_outputs()[0].shape[-1])
+
+    def encode(self, sentences: List[str], batch_size: int = 32, **kwargs):
+        import numpy as np
+
+        parts = []
+        for offset in range(0, len(sentences), batch_size):
+            encodings = self.tokenizer.encode_batch(sentences[offset:offset + batch_size])
+            input_ids = np.asarray([e.ids for e in encodings], dtype='int64')
+            attention = np.asarray([e.attention_mask for e in encodings], dtype='int64')
+            feeds = {"input_ids": input_ids, "attention_mask": attention}
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.asarray([e.type_ids for e in encodings], dtype='int64')
+
+            token_embeddings = self.session.run(None, feeds)[0]
+            mask = attention[..., None].astype('float32')
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            parts.append(pooled / np.clip(norms, 1e-12, None))
+
+        if not parts:
+            return np.zeros((0, 0), dtype='float32')
+        return np.vstack(parts).astype('float32')
+
+
+def load_encoder(model_name: str, onnx_path: Optional[str] = None):
+    """
+    Return an object with encode(list_of_str, batch_size=...)
+
+    Uses OnnxEncoder when onnx_path (or $RAG_ONNX_MODEL) is set, otherwise
+    SentenceTransformer(model_name).
+    """
+    onnx_path = onnx_path or os.getenv(ONNX_MODEL_ENV)
+    if onnx_path:
+        return OnnxEncoder(onnx_path)
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
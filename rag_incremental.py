@@ -0,0 +1,240 @@
+"""
+RAG Incremental Indexer
+Refreshes doc_index.faiss after doc edits by re-embedding only the chunks
+whose content changed.
+
+Every chunk gets a stable FAISS id and a content hash, recorded in
+doc_index.manifest.json. Unchanged files are skipped by file hash; inside
+changed files, chunks whose text hash is already known keep their id and
+vector. New chunks are embedded and added with fresh ids, and chunks that
+disappeared are removed from the ID-mapped index.
+
+Usage:
+    python rag_incremental.py [--root .] [--index doc_index.faiss] [--full]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from rag_bm25 import bm25_path, build_bm25
+from rag_build_index import write_index
+from rag_docstore import (CHUNK_OVERLAP, CHUNK_SIZE, DOC_PATTERNS, DocStore, DocStoreWriter,
+                          chunk_text, docstore_path, iter_documents, open_docstore)
+from rag_query import DEFAULT_BATCH_SIZE, INDEX_PATH, MODEL_NAME, ROOT, manifest_path
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def load_manifest(index_path: str, model_name: str, chunk_size: int,
+                  overlap: int) -> Optional[Dict[str, Any]]:
+    """Return the manifest if it matches the current model and chunking, else None"""
+    path = manifest_path(index_path)
+    if not os.path.exists(path) or not os.path.exists(index_path):
+        return None
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+    expected = (MANIFEST_VERSION, model_name, chunk_size, overlap)
+    actual = (manifest.get("version"), manifest.get("model"),
+              manifest.get("chunk_size"), manifest.get("overlap"))
+    return manifest if actual == expected else None
+
+
+def manifest_index(index_path: str, manifest: Dict[str, Any]):
+    """
+    The index the manifest was written with, or None if the file on disk is
+    something else (e.g. a rag_build_index.py build that renumbered every
+    chunk): it must be ID-mapped and hold exactly the manifest's chunks
+    """
+    import faiss
+
+    index = faiss.read_index(index_path)
+    expected = sum(len(entry["chunks"]) for entry in manifest["files"].values())
+    if not isinstance(index, faiss.IndexIDMap2) or index.ntotal != expected:
+        return None
+    return index
+
+
+def new_index(dim: int):
+    """Empty flat index that accepts explicit ids and supports remove_ids"""
+    import faiss
+
+    return faiss.IndexIDMap2(faiss.IndexFlatL2(dim))
+
+
+class _LazyModel:
+    """Loads the encoder on first use so no-op refreshes never pay for it"""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model = None
+
+    def get(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+
+def update_index(root: str = ROOT, index_path: str = INDEX_PATH, model_name: str = MODEL_NAME,
+                 patterns=DOC_PATTERNS, chunk_size: int = CHUNK_SIZE,
+                 overlap: int = CHUNK_OVERLAP, batch_size: int = DEFAULT_BATCH_SIZE,
+                 full: bool = False) -> Dict[str, Any]:
+    """
+    Bring the index, document store and manifest in line with the docs under root
+
+    Returns counts of files and chunks added, kept and removed.
+    """
+    import numpy as np
+
+    started = time.perf_counter()
+    model = _LazyModel(model_name)
+    manifest = None if full else load_manifest(index_path, model_name, chunk_size, overlap)
+    index = manifest_index(index_path, manifest) if manifest is not None else None
+    if index is None:
+        manifest = None
+
+    if manifest is None:
+        old_files: Dict[str, Any] = {}
+        next_id = 0
+    else:
+        old_files = manifest["files"]
+        next_id = manifest["next_id"]
+
+    old_store = open_docstore(index_path) if manifest is not None else None
+    writer = DocStoreWriter(docstore_path(index_path))
+    new_files: Dict[str, Any] = {}
+    pending: List[Dict[str, Any]] = []
+    stale: List[int] = []
+    stats = {"files_changed": 0, "files_unchanged": 0, "files_removed": 0,
+             "chunks_added": 0, "chunks_kept": 0, "chunks_removed": 0}
+
+    try:
+        for source, text in iter_documents(root, patterns):
+            file_hash = content_hash(text)
+            previous = old_files.pop(source, None)
+
+            if previous is not None and previous["hash"] == file_hash and old_store is not None:
+                # Whole file unchanged: carry its records over without re-chunking
+                for entry in previous["chunks"]:
+                    record = old_store.get(entry["id"])
+                    writer.add(entry["id"], source, record["start"], record["end"], record["text"])
+                new_files[source] = previous
+                stats["files_unchanged"] += 1
+                stats["chunks_kept"] += len(previous["chunks"])
+                continue
+
+            stats["files_changed"] += 1
+            reusable: Dict[str, List[int]] = {}
+            for entry in (previous or {}).get("chunks", []):
+                reusable.setdefault(entry["hash"], []).append(entry["id"])
+
+            entries = []
+            for start, end, chunk in chunk_text(text, chunk_size, overlap):
+                chunk_hash = content_hash(chunk)
+                ids = reusable.get(chunk_hash)
+                if ids:
+                    doc_id = ids.pop(0)
+                    stats["chunks_kept"] += 1
+                else:
+                    doc_id = next_id
+                    next_id += 1
+                    pending.append({"id": doc_id, "text": chunk})
+                    stats["chunks_added"] += 1
+                writer.add(doc_id, source, start, end, chunk)
+                entries.append({"id": doc_id, "hash": chunk_hash})
+
+            leftover = [doc_id for ids in reusable.values() for doc_id in ids]
+            stale.extend(leftover)
+            stats["chunks_removed"] += len(leftover)
+            new_files[source] = {"hash": file_hash, "chunks": entries}
+
+        # Files that vanished from disk
+        for source, previous in old_files.items():
+            stale.extend(entry["id"] for entry in previous["chunks"])
+            stats["files_removed"] += 1
+            stats["chunks_removed"] += len(previous["chunks"])
+
+        if stale and index is not None:
+            index.remove_ids(np.asarray(stale, dtype='int64'))
+
+        for offset in range(0, len(pending), batch_size):
+            batch = pending[offset:offset + batch_size]
+            vectors = np.asarray(model.get().encode([c["text"] for c in batch], batch_size=batch_size),
+                                 dtype='float32')
+            if index is None:
+                index = new_index(vectors.shape[1])
+            index.add_with_ids(vectors, np.asarray([c["id"] for c in batch], dtype='int64'))
+    except BaseException:
+        if old_store is not None:
+            old_store.close()
+        writer.abort()
+        raise
+
+    if old_store is not None:
+        old_store.close()
+    changed = any(stats[key] for key in ("chunks_added", "chunks_removed", "files_changed",
+                                          "files_removed"))
+    if changed or manifest is None:
+        writer.close()
+    else:
+        # Nothing to refresh: the store on disk already holds exactly these records
+        writer.abort()
+
+    if index is None:
+        index = new_index(model.get().get_sentence_embedding_dimension())
+
+    if changed or manifest is None:
+        meta = {"index_type": "flat", "dimension": int(index.d), "ntotal": int(index.ntotal),
+                "model": model_name, "id_map": True}
+        write_index(index, meta, index_path)
+        store = DocStore(docstore_path(index_path))
+        try:
+            build_bm25(store, bm25_path(index_path))
+        finally:
+            store.close()
+        manifest = {"version": MANIFEST_VERSION, "model": model_name, "chunk_size": chunk_size,
+                    "overlap": overlap, "next_id": next_id, "files": new_files}
+        tmp_path = manifest_path(index_path) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path(index_path))
+
+    stats["ntotal"] = int(index.ntotal)
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally refresh the RAG index")
+    parser.add_argument("--root", default=ROOT, help="Directory to index")
+    parser.add_argument("--index", default=INDEX_PATH, help="Index path")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--pattern", action="append", dest="patterns",
+                        help="Filename glob to include (default: *.md)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--overlap", type=int, default=CHUNK_OVERLAP)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore the manifest and re-embed everything")
+    args = parser.parse_args(argv)
+
+    stats = update_index(root=args.root, index_path=args.index, model_name=args.model,
+                         patterns=args.patterns or DOC_PATTERNS, chunk_size=args.chunk_size,
+                         overlap=args.overlap, batch_size=args.batch_size, full=args.full)
+    print(f"Files: {stats['files_changed']} changed, {stats['files_unchanged']} unchanged, "
+          f"{stats['files_removed']} removed")
+    print(f"Chunks: {stats['chunks_added']} embedded, {stats['chunks_kept']} kept, "
+          f"{stats['chunks_removed']} removed ({stats['ntotal']} in index)")
+    print(f"Done in {stats['seconds']}s")
+
+
+if __name__ == '__main__':
+    main()
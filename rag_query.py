@@ -1,12 +1,414 @@
+"""
+RAG Query
+Finds the documents in doc_index.faiss closest to a free-text query.
+
+Usage:
+    python rag_query.py <query...>     # asks the warm rag_server.py, falls back to a local load
+    python rag_query.py --local <query...>
+    python rag_query.py --batch queries.jsonl [--batch-size 64] > results.jsonl
+    cat queries.txt | python rag_query.py --batch -
+"""
+
+import argparse
+import json
+import os
 import sys
-from sentence_transformers import SentenceTransformer
-import faiss
-import numpy as np
-
-model = SentenceTransformer('all-MiniLM-L6-v2')
-index = faiss.read_index('doc_index.faiss')
-query = ' '.join(sys.argv[1:])
-query_emb = model.encode([query])
-D, I = index.search(np.array(query_emb), k=5)
-for i, d in zip(I[0], D[0]):
-    print(f"Result {i}: Distance {d}")
\ No newline at end of file
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+MODEL_NAME = 'all-MiniLM-L6-v2'
+INDEX_PATH = os.path.join(ROOT, 'doc_index.faiss')
+DEFAULT_HOST = os.getenv('RAG_HOST', '127.0.0.1')
+DEFAULT_PORT = int(os.getenv('RAG_PORT', '8765'))
+DEFAULT_K = 5
+DEFAULT_BATCH_SIZE = 64
+HYBRID_DEPTH = 4
+QUERY_FIELDS = ("query", "q", "text", "question")
+
+
+def index_meta_path(index_path: str) -> str:
+    """Meta JSON written by rag_build_index.py, e.g. doc_index.faiss -> doc_index.meta.json"""
+    return os.path.splitext(index_path)[0] + '.meta.json'
+
+
+def manifest_path(index_path: str) -> str:
+    """Chunk ids and hashes kept by rag_incremental.py, e.g. doc_index.manifest.json"""
+    return os.path.splitext(index_path)[0] + '.manifest.json'
+
+
+def vectors_path(index_path: str) -> str:
+    """Full-precision vectors kept for exact re-ranking, e.g. doc_index.vectors.npy"""
+    return os.path.splitext(index_path)[0] + '.vectors.npy'
+
+
+def rerank_exact(queries, candidate_ids, vectors, k: int):
+    """
+    Re-score candidate ids with exact L2 distance against full-precision vectors
+
+    vectors is usually a read-only np.load(..., mmap_mode='r') array, so only
+    the candidate rows are paged in. Returns (D, I) shaped like index.search.
+    """
+    import numpy as np
+
+    D = np.full((len(queries), k), np.inf, dtype='float32')
+    I = np.full((len(queries), k), -1, dtype='int64')
+    for row, ids in enumerate(candidate_ids):
+        ids = np.sort(ids[ids >= 0])
+        if not len(ids):
+            continue
+        diffs = np.asarray(vectors[ids], dtype='float32') - queries[row]
+        dists = np.einsum('ij,ij->i', diffs, diffs)
+        order = np.argsort(dists)[:k]
+        D[row, :len(order)] = dists[order]
+        I[row, :len(order)] = ids[order]
+    return D, I
+
+
+def _mmap_flags(faiss, index_type: Optional[str]) -> List[int]:
+    """read_index flag sets to try, most memory-friendly first"""
+    read_only = getattr(faiss, 'IO_FLAG_READ_ONLY', 0)
+    flat_codes = getattr(faiss, 'IO_FLAG_MMAP_IFC', None)
+    inverted_lists = getattr(faiss, 'IO_FLAG_MMAP', None)
+    candidates = [flat_codes, inverted_lists]
+    if index_type == "ivf":
+        candidates.reverse()
+    return [flags | read_only for flags in candidates if flags is not None]
+
+
+def load_index(index_path: str = INDEX_PATH, mmap: bool = True):
+    """
+    Read a FAISS index of any type and restore its search-time parameters
+
+    With mmap=True the vectors are mapped read-only from the file instead of
+    copied onto the heap, so worker processes share one set of page-cache
+    pages. Falls back to a normal read if this faiss build cannot map the
+    index. nprobe/efSearch are not fully captured by the index file, so they
+    come from the builder's meta JSON when present. Returns (index, meta).
+    """
+    import faiss
+
+    meta: Dict[str, Any] = {}
+    meta_path = index_meta_path(index_path)
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+
+    index = None
+    if mmap:
+        for flags in _mmap_flags(faiss, meta.get("index_type")):
+            try:
+                index = faiss.read_index(index_path, flags)
+                meta["mmap"] = True
+                break
+            except RuntimeError:
+                continue
+    if index is None:
+        index = faiss.read_index(index_path)
+        meta["mmap"] = False
+
+    params = faiss.ParameterSpace()
+    if meta.get("nprobe") and faiss.try_extract_index_ivf(index) is not None:
+        params.set_index_parameter(index, "nprobe", int(meta["nprobe"]))
+    if meta.get("ef_search") and isinstance(faiss.downcast_index(index), faiss.IndexHNSW):
+        params.set_index_parameter(index, "efSearch", int(meta["ef_search"]))
+
+    meta.setdefault("index_type", type(faiss.downcast_index(index)).__name__)
+    return index, meta
+
+
+class RagSearcher:
+    """
+    Holds the encoder and FAISS index in memory and answers k-NN queries
+
+    Heavy imports happen here rather than at module level so the thin client
+    path never pays for them.
+    """
+
+    def __init__(self, model_name: str = MODEL_NAME, index_path: str = INDEX_PATH,
+                 use_cache: bool = True, cache_path: Optional[str] = None,
+                 onnx_path: Optional[str] = None, mmap: bool = True, hybrid: bool = False):
+        from rag_bm25 import open_bm25
+        from rag_docstore import open_docstore
+        from rag_embed_cache import DEFAULT_CACHE_PATH, CachedEncoder, EmbeddingCache
+        from rag_encoders import ONNX_MODEL_ENV, load_encoder
+
+        self.model_name = model_name
+        self.index_path = index_path
+        self.index, self.index_meta = load_index(index_path, mmap=mmap)
+        self.docstore = open_docstore(index_path)
+        self.bm25 = open_bm25(index_path)
+        self.hybrid = hybrid
+        self.rerank_vectors = None
+        self.rerank_factor = int(self.index_meta.get("rerank_factor", 0))
+        if self.rerank_factor and os.path.exists(vectors_path(index_path)):
+            import numpy as np
+            self.rerank_vectors = np.load(vectors_path(index_path), mmap_mode='r')
+        self.model = load_encoder(model_name, onnx_path=onnx_path)
+
+        # ONNX/quantized vectors differ slightly, so they get their own cache keys
+        onnx_path = onnx_path or os.getenv(ONNX_MODEL_ENV)
+        self.encoder_name = f"{model_name}:onnx:{os.path.basename(onnx_path)}" if onnx_path \
+            else model_name
+
+        self.cache = None
+        self.encoder = self.model
+        if use_cache:
+            self.cache = EmbeddingCache(cache_path or DEFAULT_CACHE_PATH)
+            self.encoder = CachedEncoder(self.model, self.encoder_name, self.cache)
+
+    def encode(self, queries: List[str], batch_size: int = DEFAULT_BATCH_SIZE):
+        """Encode queries into a float32 matrix"""
+        import numpy as np
+
+        return np.asarray(self.encoder.encode(queries, batch_size=batch_size), dtype='float32')
+
+    def warm_up(self):
+        """
+        Run one query through the encoder and index to pay first-call costs
+
+        Goes around the embedding cache, so the warm-up query neither lands
+        in it nor shows up in its counters.
+        """
+        import numpy as np
+
+        vectors = np.asarray(self.model.encode(["warmup"], batch_size=1), dtype='float32')
+        self.search_encoded(["warmup"], vectors, k=1)
+
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Embedding cache hit/miss counters, or None when caching is off"""
+        return self.cache.stats() if self.cache is not None else None
+
+    def search_vectors(self, vectors, k: int = DEFAULT_K):
+        """
+        index.search, plus exact re-ranking for compressed indexes
+
+        When the index was built with --rerank, the compressed index supplies
+        k * rerank_factor candidates and the full-precision vectors pick the
+        final k.
+        """
+        if self.rerank_vectors is None:
+            return self.index.search(vectors, k)
+        _, candidates = self.index.search(vectors, k * self.rerank_factor)
+        return rerank_exact(vectors, candidates, self.rerank_vectors, k)
+
+    def search(self, queries: List[str], k: int = DEFAULT_K, batch_size: int = DEFAULT_BATCH_SIZE,
+               hybrid: Optional[bool] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Return the k nearest index entries for each query (one index.search call)
+
+        Hits carry source/start/end/snippet when the document store sidecar exists.
+        In hybrid mode the vector and BM25 top lists (k * HYBRID_DEPTH deep) are
+        merged with reciprocal-rank fusion; hits then also carry "score" (RRF)
+        and "bm25", and "distance" is None for keyword-only hits.
+        """
+        return self.search_encoded(queries, self.encode(queries, batch_size=batch_size), k=k,
+                                   hybrid=hybrid)
+
+    def search_encoded(self, queries: List[str], vectors, k: int = DEFAULT_K,
+                       hybrid: Optional[bool] = None) -> List[List[Dict[str, Any]]]:
+        """search() for queries whose vectors are already encoded (rows match queries)"""
+        from rag_docstore import attach_snippets
+
+        hybrid = self.hybrid if hybrid is None else hybrid
+        if hybrid and self.bm25 is None:
+            raise FileNotFoundError(f"No BM25 index next to {self.index_path}; "
+                                    "rebuild it with rag_build_index.py")
+
+        depth = k * HYBRID_DEPTH if hybrid else k
+        D, I = self.search_vectors(vectors, depth)
+        results = []
+        for query, ids, dists in zip(queries, I, D):
+            hits = [{"id": int(i), "distance": float(d)} for i, d in zip(ids, dists) if i != -1]
+            if hybrid:
+                hits = self._fuse(query, hits, k, depth)
+            results.append(attach_snippets(hits, self.docstore))
+        return results
+
+    def _fuse(self, query: str, vector_hits: List[Dict[str, Any]], k: int,
+              depth: int) -> List[Dict[str, Any]]:
+        from rag_bm25 import reciprocal_rank_fusion
+
+        keyword_hits = self.bm25.search(query, depth)
+        distances = {hit["id"]: hit["distance"] for hit in vector_hits}
+        bm25_scores = dict(keyword_hits)
+        fused = reciprocal_rank_fusion([[hit["id"] for hit in vector_hits],
+                                        [doc_id for doc_id, _ in keyword_hits]], k)
+        return [{"id": doc_id, "distance": distances.get(doc_id), "score": round(score, 6),
+                 "bm25": bm25_scores.get(doc_id)} for doc_id, score in fused]
+
+
+def query_server(query: str, k: int = DEFAULT_K, host: str = DEFAULT_HOST,
+                 port: int = DEFAULT_PORT, timeout: float = 5.0,
+                 hybrid: bool = False) -> List[Dict[str, Any]]:
+    """
+    Ask a running rag_server.py for the k nearest neighbours of one query
+
+    Raises:
+        OSError: the server is not reachable
+    """
+    fields = {"q": query, "k": k}
+    if hybrid:
+        fields["hybrid"] = 1
+    params = urllib.parse.urlencode(fields)
+    url = f"http://{host}:{port}/search?{params}"
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        payload = json.loads(resp.read().decode('utf-8'))
+    return payload["results"][0]
+
+
+def parse_query_line(line: str, line_no: int, fields: Optional[List[str]] = None,
+                     id_field: Optional[str] = None) -> Optional[Tuple[Any, str]]:
+    """
+    Turn one input line into (query_id, query_text)
+
+    JSON object lines take their text from `fields` (joined with a space) or
+    the first of QUERY_FIELDS present; anything else is used as plain text.
+    Blank lines are skipped.
+    """
+    line = line.strip()
+    if not line:
+        return None
+
+    record = None
+    if line.startswith('{'):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+
+    if not isinstance(record, dict):
+        return line_no, line
+
+    if fields:
+        text = ' '.join(str(record[f]) for f in fields if record.get(f))
+    else:
+        text = next((str(record[f]) for f in QUERY_FIELDS if record.get(f)), '')
+    query_id = record.get(id_field, line_no) if id_field else record.get("id", line_no)
+    return query_id, text
+
+
+def iter_batches(lines: Iterable[str], batch_size: int, fields: Optional[List[str]] = None,
+                 id_field: Optional[str] = None) -> Iterator[List[Tuple[Any, str]]]:
+    """Group parsed query lines into lists of at most batch_size without reading ahead"""
+    batch = []
+    for line_no, line in enumerate(lines, start=1):
+        parsed = parse_query_line(line, line_no, fields=fields, id_field=id_field)
+        if parsed is None:
+            continue
+        batch.append(parsed)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_batch(searcher: 'RagSearcher', lines: Iterable[str], out: TextIO, k: int = DEFAULT_K,
+              batch_size: int = DEFAULT_BATCH_SIZE, fields: Optional[List[str]] = None,
+              id_field: Optional[str] = None) -> int:
+    """
+    Answer a stream of queries, one encode and one index.search per batch
+
+    Writes one JSON object per query to `out` and returns the number of queries.
+    """
+    count = 0
+    for batch in iter_batches(lines, batch_size, fields=fields, id_field=id_field):
+        results = searcher.search([text for _, text in batch], k=k, batch_size=batch_size)
+        for (query_id, text), hits in zip(batch, results):
+            out.write(json.dumps({"id": query_id, "query": text, "results": hits}) + '\n')
+        out.flush()
+        count += len(batch)
+    return count
+
+
+def print_results(results: List[Dict[str, Any]]):
+    for hit in results:
+        line = f"Result {hit['id']}: Distance {hit['distance']}"
+        if "score" in hit:
+            line += f" RRF {hit['score']} BM25 {hit['bm25']}"
+        print(line)
+        if "source" in hit:
+            print(f"  {hit['source']} [{hit['start']}:{hit['end']}] {hit['snippet']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the RAG document index")
+    parser.add_argument("query", nargs="*", help="Query text")
+    parser.add_argument("-k", type=int, default=DEFAULT_K, help="Number of results")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="rag_server.py host")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="rag_server.py port")
+    parser.add_argument("--local", action="store_true",
+                        help="Skip the server and load the model and index in-process")
+    parser.add_argument("--timing", action="store_true",
+                        help="Print elapsed time and embedding cache counters to stderr")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always run the encoder instead of using the embedding cache")
+    parser.add_argument("--onnx", metavar="MODEL_ONNX",
+                        help="Encode with onnxruntime from this (optionally quantized) ONNX file "
+                             "instead of sentence-transformers (env: RAG_ONNX_MODEL)")
+    parser.add_argument("--no-mmap", action="store_true",
+                        help="Read the index onto the heap instead of memory-mapping it")
+    parser.add_argument("--hybrid", action="store_true",
+                        help="Fuse vector and BM25 keyword results (reciprocal-rank fusion)")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="Read queries (JSONL or plain lines) from FILE, '-' for stdin, "
+                             "and write JSONL results")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Queries per encode/search call in batch mode")
+    parser.add_argument("--field", action="append", dest="fields",
+                        help="JSON field(s) holding the query text, e.g. --field title --field body")
+    parser.add_argument("--id-field", help="JSON field used as the result id (default: id or line number)")
+    parser.add_argument("--output", "-o", help="Batch output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.batch:
+        started = time.perf_counter()
+        searcher = RagSearcher(use_cache=not args.no_cache, onnx_path=args.onnx,
+                               mmap=not args.no_mmap, hybrid=args.hybrid)
+        src = sys.stdin if args.batch == '-' else open(args.batch, 'r', encoding='utf-8')
+        out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+        try:
+            count = run_batch(searcher, src, out, k=args.k, batch_size=max(1, args.batch_size),
+                              fields=args.fields, id_field=args.id_field)
+        finally:
+            if src is not sys.stdin:
+                src.close()
+            if out is not sys.stdout:
+                out.close()
+        if args.timing:
+            elapsed = time.perf_counter() - started
+            print(f"{count} queries in {elapsed:.2f}s", file=sys.stderr)
+            print(f"embedding cache: {searcher.cache_stats()}", file=sys.stderr)
+        return
+
+    query = ' '.join(args.query)
+    started = time.perf_counter()
+
+    results = None
+    if not args.local:
+        try:
+            results = query_server(query, k=args.k, host=args.host, port=args.port,
+                                   hybrid=args.hybrid)
+        except (urllib.error.URLError, OSError):
+            print(f"rag_server not reachable on {args.host}:{args.port}, loading locally",
+                  file=sys.stderr)
+
+    searcher = None
+    if results is None:
+        searcher = RagSearcher(use_cache=not args.no_cache, onnx_path=args.onnx,
+                               mmap=not args.no_mmap, hybrid=args.hybrid)
+        results = searcher.search([query], k=args.k)[0]
+
+    print_results(results)
+    if args.timing:
+        print(f"took {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+        if searcher is not None:
+            print(f"embedding cache: {searcher.cache_stats()}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
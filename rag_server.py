@@ -0,0 +1,155 @@
+"""
+RAG Query Server
+Keeps the encoder and FAISS index loaded and answers k-NN queries over HTTP,
+so callers skip the multi-second model and index load on every query.
+
+Usage:
+    python rag_server.py [--host 127.0.0.1] [--port 8765]
+
+Endpoints:
+    GET  /health
+    GET  /search?q=<text>&k=5[&hybrid=1]
+    POST /search  {"queries": ["...", "..."], "k": 5, "hybrid": false}
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from rag_query import DEFAULT_HOST, DEFAULT_K, DEFAULT_PORT, INDEX_PATH, MODEL_NAME, RagSearcher
+
+MAX_K = 100
+
+
+class RagRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler that delegates to the server's shared RagSearcher"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == "/health":
+            searcher = self.server.searcher
+            self._send_json(200, {
+                "status": "ok",
+                "model": searcher.model_name,
+                "index": searcher.index_path,
+                "index_type": searcher.index_meta.get("index_type"),
+                "encoder": searcher.encoder_name,
+                "bm25": searcher.bm25 is not None,
+                "hybrid_default": searcher.hybrid,
+                "ntotal": int(searcher.index.ntotal),
+                "cache": searcher.cache_stats(),
+            })
+            return
+        if parsed.path != "/search":
+            self._send_json(404, {"error": f"Unknown path: {parsed.path}"})
+            return
+
+        params = parse_qs(parsed.query)
+        query = params.get("q", [""])[0]
+        hybrid = params.get("hybrid", [None])[0]
+        self._search([query], params.get("k", [DEFAULT_K])[0],
+                     None if hybrid is None else hybrid not in ("0", "false", ""))
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/search":
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            self._send_json(400, {"error": f"Invalid JSON body: {e}"})
+            return
+
+        queries = body.get("queries")
+        if queries is None and "q" in body:
+            queries = [body["q"]]
+        if not isinstance(queries, list) or not queries:
+            self._send_json(400, {"error": "Expected 'queries' to be a non-empty list"})
+            return
+        self._search([str(q) for q in queries], body.get("k", DEFAULT_K), body.get("hybrid"))
+
+    def _search(self, queries, k, hybrid=None):
+        try:
+            k = max(1, min(int(k), MAX_K))
+        except (TypeError, ValueError):
+            self._send_json(400, {"error": f"Invalid k: {k}"})
+            return
+
+        if hybrid and self.server.searcher.bm25 is None:
+            self._send_json(400, {"error": "No BM25 index was built for this index"})
+            return
+
+        started = time.perf_counter()
+        with self.server.lock:
+            results = self.server.searcher.search(queries, k=k, hybrid=hybrid)
+            cache = self.server.searcher.cache_stats()
+        took_ms = (time.perf_counter() - started) * 1000
+        self._send_json(200, {"results": results, "k": k, "took_ms": round(took_ms, 3),
+                              "cache": cache})
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class RagServer(ThreadingHTTPServer):
+    """Threaded HTTP server owning one warm RagSearcher"""
+
+    daemon_threads = True
+
+    def __init__(self, address, searcher: RagSearcher, verbose: bool = False):
+        super().__init__(address, RagRequestHandler)
+        self.searcher = searcher
+        self.lock = threading.Lock()
+        self.verbose = verbose
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve RAG k-NN queries from a warm index")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--index", default=INDEX_PATH)
+    parser.add_argument("--no-cache", action="store_true", help="Disable the query embedding cache")
+    parser.add_argument("--cache-path", help="Embedding cache SQLite file")
+    parser.add_argument("--onnx", metavar="MODEL_ONNX", help="Encode with this ONNX file via onnxruntime")
+    parser.add_argument("--no-mmap", action="store_true", help="Read the index onto the heap")
+    parser.add_argument("--hybrid", action="store_true",
+                        help="Fuse BM25 keyword results into every query unless it opts out")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    searcher = RagSearcher(model_name=args.model, index_path=args.index,
+                           use_cache=not args.no_cache, cache_path=args.cache_path,
+                           onnx_path=args.onnx, mmap=not args.no_mmap, hybrid=args.hybrid)
+    # Warm up the encoder so the first real query is not the slow one
+    searcher.warm_up()
+    print(f"Loaded {args.model} and {args.index} in {time.perf_counter() - started:.2f}s")
+
+    server = RagServer((args.host, args.port), searcher, verbose=args.verbose)
+    print(f"RAG server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+RAG Startup Benchmark
+Measures cold-start time of the RAG query path in fresh interpreter
+processes, split into imports, index load, encoder load and first query.
+
+Usage:
+    python rag_startup_bench.py [--runs 5] [--onnx path/to/model.onnx] [--json out.json]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from rag_query import INDEX_PATH, MODEL_NAME, ROOT
+
+DEFAULT_BUDGET_SECONDS = 1.0
+
+# Runs inside each child process; every phase is timed from interpreter start
+_CHILD = r'''
+import json, sys, time
+started = time.perf_counter()
+import rag_query
+from rag_encoders import load_encoder
+imported = time.perf_counter()
+index, meta = rag_query.load_index(sys.argv[1], mmap=sys.argv[3] == "1")
+index_loaded = time.perf_counter()
+encoder = load_encoder(sys.argv[2], onnx_path=sys.argv[4] or None)
+encoder_loaded = time.perf_counter()
+import numpy as np
+index.search(np.asarray(encoder.encode(["startup benchmark query"]), dtype="float32"), 5)
+done = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - started,
+    "index_load_s": index_loaded - imported,
+    "encoder_load_s": encoder_loaded - index_loaded,
+    "first_query_s": done - encoder_loaded,
+    "mmap": meta.get("mmap", False),
+}))
+'''
+
+
+def run_once(index_path: str, model_name: str, mmap: bool, onnx_path: Optional[str]) -> Dict[str, Any]:
+    """Time one cold start in a fresh interpreter"""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", _CHILD, index_path, model_name, "1" if mmap else "0", onnx_path or ""],
+        cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "child failed")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["wall_s"] = wall
+    return result
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Median of every timing field across runs, in seconds"""
+    fields = [key for key in runs[0] if key.endswith("_s")]
+    summary = {key: round(statistics.median(r[key] for r in runs), 4) for key in fields}
+    summary["mmap"] = runs[0]["mmap"]
+    summary["runs"] = len(runs)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark RAG cold-start time")
+    parser.add_argument("--index", default=INDEX_PATH)
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--onnx", metavar="MODEL_ONNX", help="Also benchmark this ONNX encoder")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help="Cold-start budget in seconds for the pass/fail line")
+    parser.add_argument("--json", dest="json_path", help="Write the results as JSON")
+    args = parser.parse_args(argv)
+
+    configs = [("sentence-transformers, mmap", True, None),
+               ("sentence-transformers, heap", False, None)]
+    if args.onnx:
+        configs += [("onnx, mmap", True, args.onnx), ("onnx, heap", False, args.onnx)]
+
+    report = {"index": args.index, "budget_s": args.budget, "configs": {}}
+    print(f"{'config':<30} {'wall':>7} {'import':>7} {'index':>7} {'encoder':>8} {'query':>7}")
+    for name, mmap, onnx_path in configs:
+        try:
+            runs = [run_once(args.index, args.model, mmap, onnx_path) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{name:<30} failed: {e}")
+            report["configs"][name] = {"error": str(e)}
+            continue
+        summary = summarize(runs)
+        summary["within_budget"] = summary["wall_s"] <= args.budget
+        report["configs"][name] = summary
+        print(f"{name:<30} {summary['wall_s']:>7.3f} {summary['import_s']:>7.3f} "
+              f"{summary['index_load_s']:>7.3f} {summary['encoder_load_s']:>8.3f} "
+              f"{summary['first_query_s']:>7.3f}  {'OK' if summary['within_budget'] else 'SLOW'}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to: {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,36 +1,641 @@
+"""
+LLM Port Scanner
+Finds LLM servers on one or more hosts: open ports are discovered first,
+then fingerprinted (Ollama, LM Studio, llama.cpp, vLLM, OpenAI-compatible)
+by llm_fingerprint over one pooled HTTP session.
+
+Targets are hostnames, addresses or CIDR ranges, all scanned at once under
+a global in-flight cap, a per-host cap and a global token-bucket connect
+rate; endpoints are printed as they are identified.
+
+On Linux, a local host's listening ports are read straight from
+/proc/net/tcp and /proc/net/tcp6 (state 0A) and only those are probed;
+remote hosts, or hosts without procfs, fall back to a connect scan.
+
+The connect phase is an asyncio sliding window: a semaphore keeps up to
+--concurrency connects in flight at all times and each one is bounded by
+--connect-timeout, so a slow port only holds its own slot instead of
+stalling a whole group. Timing is printed per phase.
+
+Ports are tried in priority order: well-known LLM ports first, then ports
+where endpoints were found in earlier runs (cached for --cache-ttl), then
+the rest. Open ports are fingerprinted as soon as they are found, and
+--first N stops the scan once N endpoints are known.
+
+Usage:
+    python scan_llm_ports.py [--host localhost] [--ports 1-65535] [--concurrency 1000]
+    python scan_llm_ports.py --discovery connect     # skip procfs, always connect-scan
+    python scan_llm_ports.py --json sellersco-worker/scripts/detected-llms.json
+    python scan_llm_ports.py --first 1               # startup scripts: any one endpoint, fast
+    python scan_llm_ports.py --host 192.168.1.0/24 --ports known --rate 500
+"""
+
+import argparse
+import asyncio
+import errno
+import ipaddress
+import json
+import os
 import socket
-import requests
-import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from llm_fingerprint import HTTP_TIMEOUT, detected_llms, fingerprint, new_session
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HOST = 'localhost'
+DEFAULT_PORTS = '1-65535'
+DEFAULT_CONCURRENCY = 1000
+DEFAULT_PER_HOST = 256
+DEFAULT_REMOTE_RATE = 2000.0
+MAX_HOSTS = 4096
+CONNECT_TIMEOUT = 1.0
+DISCOVERY_MODES = ("auto", "procfs", "connect")
+PROC_NET_TCP = ('/proc/net/tcp', '/proc/net/tcp6')
+TCP_LISTEN = '0A'
+# Ollama, vLLM, llama.cpp, LM Studio, text-generation-webui/KoboldCpp, Gradio,
+# GPT4All, Jan, LocalAI and other common inference server defaults
+WELL_KNOWN_PORTS = (11434, 8000, 8080, 1234, 5000, 5001, 7860, 4891, 1337, 8081, 8001, 3000,
+                    8888, 9000)
+# Ports fingerprinted at once; each runs its probes on llm_fingerprint's own pool
+PROBE_WORKERS = 8
+CACHE_PATH = os.getenv('LLM_SCAN_CACHE', os.path.join(ROOT, '.scan_cache', 'llm_ports.json'))
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+# Descriptors kept back for stdio, the HTTP phase and the interpreter itself
+FD_HEADROOM = 64
+
+
+def parse_ports(spec: str) -> List[int]:
+    """'1-1024,8080,11434' -> sorted unique port list; 'known' stands for WELL_KNOWN_PORTS"""
+    ports = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if part == 'known':
+            ports.update(WELL_KNOWN_PORTS)
+        elif '-' in part:
+            low, high = (int(p) for p in part.split('-', 1))
+            ports.update(range(low, high + 1))
+        else:
+            ports.add(int(part))
+    invalid = [p for p in ports if not 0 < p < 65536]
+    if invalid:
+        raise ValueError(f"Ports out of range: {invalid[:5]}")
+    return sorted(ports)
+
 
-def check_port(port):
+def max_concurrency(requested: int) -> int:
+    """
+    Cap in-flight connects by the open-file limit
+
+    Each connect holds a socket, so the soft RLIMIT_NOFILE is raised towards
+    the hard limit when it is too low, and the window shrinks to fit if that
+    is not enough.
+    """
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(1)
-        result = sock.connect_ex(('localhost', port))
+        import resource
+    except ImportError:
+        return requested
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = requested + FD_HEADROOM
+    if soft != resource.RLIM_INFINITY and soft < wanted:
+        target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    if soft == resource.RLIM_INFINITY:
+        return requested
+    return max(1, min(requested, soft - FD_HEADROOM))
+
+
+def resolve_host(host: str):
+    """(family, address) for host, resolved once so connects never hit the resolver"""
+    family, _, _, _, sockaddr = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)[0]
+    return family, sockaddr[0]
+
+
+def start_connect(family: int, address: str, port: int):
+    """
+    Begin a non-blocking connect to address:port
+
+    Returns (sock, None) while the connect is pending, otherwise
+    (None, open?). Loopback and most LAN refusals are answered by the
+    connect call itself, so those ports never touch the event loop.
+    """
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    err = sock.connect_ex((address, port))
+    if err in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+        return sock, None
+    sock.close()
+    return None, err == 0
+
+
+async def connect_scan(host: str, ports: Iterable[int], concurrency: int = DEFAULT_CONCURRENCY,
+                       timeout: float = CONNECT_TIMEOUT,
+                       on_open: Optional[Callable[[int], None]] = None,
+                       stop: Optional[asyncio.Event] = None,
+                       shared_window: Optional[asyncio.Semaphore] = None,
+                       limiter: Optional['TokenBucket'] = None,
+                       resolved: Optional[Tuple[int, str]] = None) -> List[int]:
+    """
+    Return the open ports among `ports`, keeping `concurrency` connects in flight
+
+    Ports are tried in the order given; a new connect starts as soon as a
+    slot frees up, never in batches. Pending connects are plain writer
+    callbacks plus a call_later timeout on the event loop, not tasks, so each
+    port costs a socket and two handles. on_open is called as each open port
+    is found; once `stop` is set no new connects start and pending ones are
+    abandoned. When several hosts are scanned at once, `concurrency` is the
+    per-host cap, shared_window the global one and limiter the global
+    connect rate. resolved is host's (family, address) if already known;
+    otherwise host is resolved in the default executor.
+    """
+    loop = asyncio.get_running_loop()
+    family, address = resolved or await loop.run_in_executor(None, resolve_host, host)
+    window = asyncio.Semaphore(concurrency)
+
+    def free_slot():
+        window.release()
+        if shared_window is not None:
+            shared_window.release()
+    open_ports: List[int] = []
+    pending: Dict[int, Tuple[socket.socket, Any]] = {}
+    drained = loop.create_future()
+
+    def found(port: int):
+        if stop is not None and stop.is_set():
+            return
+        open_ports.append(port)
+        if on_open is not None:
+            on_open(port)
+
+    def release(fd: int):
+        sock, timer = pending.pop(fd)
+        loop.remove_writer(fd)
+        timer.cancel()
         sock.close()
-        if result == 0:
-            # Check if it's an LLM endpoint
+        free_slot()
+        if not pending and not drained.done():
+            drained.set_result(None)
+
+    def on_writable(port: int, fd: int):
+        sock = pending[fd][0]
+        is_open = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+        release(fd)
+        if is_open:
+            found(port)
+
+    for port in ports:
+        await window.acquire()
+        if shared_window is not None:
+            await shared_window.acquire()
+        if limiter is not None:
+            await limiter.acquire()
+        if stop is not None and stop.is_set():
+            free_slot()
+            break
+        try:
+            sock, is_open = start_connect(family, address, port)
+        except OSError:
+            free_slot()
+            raise
+        if sock is None:
+            free_slot()
+            if is_open:
+                found(port)
+            continue
+        # Registering the raw fd skips the selector's socket repr() on every new key
+        fd = sock.fileno()
+        pending[fd] = (sock, loop.call_later(timeout, release, fd))
+        loop.add_writer(fd, on_writable, port, fd)
+
+    if pending and stop is not None:
+        stopped = asyncio.ensure_future(stop.wait())
+        await asyncio.wait({drained, stopped}, return_when=asyncio.FIRST_COMPLETED)
+        stopped.cancel()
+    elif pending:
+        await drained
+    for fd in list(pending):
+        release(fd)
+    return sorted(open_ports)
+
+
+def _proc_address(hex_address: str):
+    """
+    Decode a /proc/net/tcp{,6} address field
+
+    IPv4 is one little-endian 32-bit word; IPv6 is four of them.
+    """
+    raw = bytes.fromhex(hex_address)
+    raw = b''.join(raw[i:i + 4][::-1] for i in range(0, len(raw), 4))
+    return ipaddress.ip_address(raw)
+
+
+def listening_sockets(paths: Iterable[str] = PROC_NET_TCP) -> List[Tuple[Any, int]]:
+    """
+    (address, port) for every TCP socket in LISTEN state
+
+    Raises:
+        OSError: none of the procfs tables could be read
+    """
+    listeners = []
+    readable = False
+    for path in paths:
+        try:
+            with open(path, 'r') as f:
+                next(f, None)
+                lines = f.readlines()
+        except OSError:
+            continue
+        readable = True
+        for line in lines:
+            fields = line.split()
+            if len(fields) < 4 or fields[3] != TCP_LISTEN:
+                continue
+            hex_address, hex_port = fields[1].split(':')
+            listeners.append((_proc_address(hex_address), int(hex_port, 16)))
+    if not readable:
+        raise OSError(f"Cannot read {', '.join(paths)}")
+    return listeners
+
+
+def is_local_address(address: str) -> bool:
+    """True if address belongs to this machine (binding to it succeeds)"""
+    family = socket.AF_INET6 if ':' in address else socket.AF_INET
+    try:
+        with socket.socket(family, socket.SOCK_STREAM) as sock:
+            sock.bind((address, 0))
+        return True
+    except OSError:
+        return False
+
+
+def procfs_ports(address: str, ports: Iterable[int],
+                 listeners: Optional[List[Tuple[Any, int]]] = None) -> List[int]:
+    """
+    Ports among `ports` with a listener that accepts connections to address
+
+    A socket bound to the wildcard address (0.0.0.0 or ::) accepts on every
+    local address; :: listeners are included for IPv4 targets too since
+    dual-stack sockets cannot be told apart here, and the HTTP probe
+    weeds out any that are v6-only.
+    """
+    target = ipaddress.ip_address(address)
+    wanted: Set[int] = set(ports)
+    found = set()
+    for listen_address, port in (listeners if listeners is not None else listening_sockets()):
+        if port not in wanted:
+            continue
+        mapped = getattr(listen_address, 'ipv4_mapped', None)
+        if listen_address.is_unspecified or listen_address == target or mapped == target:
+            found.add(port)
+    return sorted(found)
+
+
+def choose_discovery(mode: str, address: str) -> str:
+    """Resolve 'auto' to procfs for local addresses on a machine with /proc/net/tcp"""
+    if mode != "auto":
+        return mode
+    if os.path.exists(PROC_NET_TCP[0]) and is_local_address(address):
+        return "procfs"
+    return "connect"
+
+
+class PortCache:
+    """
+    Ports where LLM endpoints were seen, per host, with a last-seen time
+
+    Stored as JSON {"hosts": {host: {port: last_seen}}}; entries older than
+    ttl are ignored and dropped on the next save.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = CACHE_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self.hosts: Dict[str, Dict[str, float]] = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.hosts = json.load(f).get("hosts", {})
+        except (OSError, ValueError):
+            self.hosts = {}
+
+    def ports(self, host: str) -> List[int]:
+        """Unexpired cached ports for host, most recently seen first"""
+        cutoff = time.time() - self.ttl
+        seen = self.hosts.get(host, {})
+        fresh = [(last_seen, int(port)) for port, last_seen in seen.items() if last_seen >= cutoff]
+        return [port for _, port in sorted(fresh, reverse=True)]
+
+    def record(self, host: str, ports: Iterable[int]):
+        now = time.time()
+        entry = self.hosts.setdefault(host, {})
+        for port in ports:
+            entry[str(port)] = now
+
+    def save(self):
+        """Drop expired entries and rewrite the file atomically"""
+        cutoff = time.time() - self.ttl
+        hosts = {host: {port: t for port, t in seen.items() if t >= cutoff}
+                 for host, seen in self.hosts.items()}
+        hosts = {host: seen for host, seen in hosts.items() if seen}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"hosts": hosts}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def priority_ports(ports: Iterable[int], cached: Iterable[int] = ()) -> List[int]:
+    """Well-known LLM ports, then cached ports, restricted to `ports`"""
+    wanted = ports if isinstance(ports, (set, frozenset)) else set(ports)
+    return list(dict.fromkeys(p for p in (*WELL_KNOWN_PORTS, *cached) if p in wanted))
+
+
+def order_ports(ports: Iterable[int], priority: List[int]) -> Iterator[int]:
+    """The priority ports, then the rest of `ports` in the order given"""
+    yield from priority
+    skip = set(priority)
+    yield from (port for port in ports if port not in skip)
+
+
+class TokenBucket:
+    """
+    Global connect-rate limit shared by every host's scan
+
+    Allows `rate` acquisitions per second on average and bursts of up to
+    `burst`. Only ever used from the event loop thread, so no lock.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate / 20)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def expand_targets(specs: Iterable[str], max_hosts: int = MAX_HOSTS) -> List[str]:
+    """
+    Hostnames, addresses and CIDR ranges (comma-separated or repeated) -> host list
+
+    Networks expand to their usable host addresses; duplicates are dropped
+    and order is kept.
+    """
+    hosts: List[str] = []
+    for spec in specs:
+        for part in spec.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            if '/' in part:
+                network = ipaddress.ip_network(part, strict=False)
+                if network.num_addresses > max_hosts:
+                    raise ValueError(f"{part} has {network.num_addresses} addresses "
+                                     f"(limit {max_hosts})")
+                hosts.extend(str(a) for a in (network.hosts() if network.num_addresses > 2
+                                              else network))
+            else:
+                hosts.append(part)
+    hosts = list(dict.fromkeys(hosts))
+    if len(hosts) > max_hosts:
+        raise ValueError(f"{len(hosts)} hosts given (limit {max_hosts})")
+    return hosts
+
+
+async def settle(tasks: Set[asyncio.Future], stop: asyncio.Event):
+    """Wait until every task in `tasks` is done or `stop` is set; cancel the rest then"""
+    if not tasks:
+        return
+    outstanding = asyncio.gather(*tasks)
+    stopped = asyncio.ensure_future(stop.wait())
+    done, _ = await asyncio.wait({outstanding, stopped}, return_when=asyncio.FIRST_COMPLETED)
+    stopped.cancel()
+    if outstanding not in done:
+        outstanding.cancel()
+        try:
+            await outstanding
+        except asyncio.CancelledError:
+            pass
+
+
+async def scan(hosts: Iterable[str] = (DEFAULT_HOST,), ports: Iterable[int] = range(1, 65536),
+               concurrency: int = DEFAULT_CONCURRENCY, connect_timeout: float = CONNECT_TIMEOUT,
+               http_timeout: float = HTTP_TIMEOUT, discovery: str = "auto",
+               first: Optional[int] = None, cache: Optional[PortCache] = None,
+               per_host: int = DEFAULT_PER_HOST, rate: Optional[float] = None,
+               on_endpoint: Optional[Callable[[Dict[str, Any]], None]] = None,
+               remote_rate: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Find each host's open ports (procfs or connect scan) and fingerprint them
+
+    All hosts are scanned at once: `concurrency` caps connects in flight
+    overall, `per_host` caps them per host (a single host gets the whole
+    window), and `rate` (connects per second) throttles the total. Without
+    `rate`, `remote_rate` applies if any host resolves to a non-local
+    address. Hosts that don't resolve are reported with an "error" and
+    skipped. Open ports are fingerprinted while discovery is still running
+    and on_endpoint is called as each endpoint is identified; with `first`,
+    everything stops once that many endpoints are known. Endpoints come
+    back grouped by host in target order, priority ports first.
+    """
+    started = time.perf_counter()
+    hosts = list(hosts)
+    ports = list(ports)
+    timings: Dict[str, float] = {}
+
+    loop = asyncio.get_running_loop()
+    session = new_session()
+    pool = ThreadPoolExecutor(max_workers=PROBE_WORKERS)
+    window = asyncio.Semaphore(concurrency) if len(hosts) > 1 else None
+    host_window = min(per_host, concurrency) if len(hosts) > 1 else concurrency
+    endpoints: List[Dict[str, Any]] = []
+    probes = set()
+    stop = asyncio.Event()
+    per_host_results: Dict[str, Dict[str, Any]] = {}
+
+    async def resolve(host: str) -> Optional[Tuple[int, str]]:
+        try:
+            return await loop.run_in_executor(None, resolve_host, host)
+        except (socket.gaierror, UnicodeError) as e:
+            per_host_results[host] = {"discovery": None, "open_ports": [],
+                                      "error": f"cannot resolve {host}: {e}", "discover_s": 0.0}
+            return None
+
+    resolved_hosts = dict(zip(hosts, await asyncio.gather(*(resolve(host) for host in hosts))))
+    if rate is None and remote_rate and any(
+            r is not None and not is_local_address(r[1]) for r in resolved_hosts.values()):
+        rate = remote_rate
+    limiter = TokenBucket(rate) if rate else None
+    ranks: Dict[str, Callable[[int], Tuple[int, int]]] = {}
+
+    async def probe(host: str, port: int):
+        found = await loop.run_in_executor(
+            pool, partial(fingerprint, host, [port], session=session, timeout=http_timeout))
+        if stop.is_set():
+            return
+        if found and "first_endpoint_s" not in timings:
+            timings["first_endpoint_s"] = time.perf_counter() - started
+        for endpoint in found:
+            endpoints.append(endpoint)
+            if on_endpoint is not None:
+                on_endpoint(endpoint)
+            if first and len(endpoints) >= first:
+                stop.set()
+                break
+
+    def on_open(host: str, port: int):
+        # Each port is fingerprinted on its own so a slow non-LLM service delays nobody
+        task = asyncio.ensure_future(probe(host, port))
+        probes.add(task)
+        task.add_done_callback(probes.discard)
+
+    async def scan_host(host: str):
+        priority = priority_ports(ports, cache.ports(host) if cache is not None else ())
+        first_rank = {port: pos for pos, port in enumerate(priority)}
+        ranks[host] = lambda port: (first_rank.get(port, len(priority)), port)
+        host_started = time.perf_counter()
+        resolved = resolved_hosts[host]
+        mode = choose_discovery(discovery, resolved[1])
+        opened = partial(on_open, host)
+        connect = partial(connect_scan, host, concurrency=host_window,
+                          timeout=connect_timeout, on_open=opened, stop=stop,
+                          shared_window=window, limiter=limiter, resolved=resolved)
+
+        open_ports = None
+        if mode == "procfs":
             try:
-                resp = requests.get(f'http://localhost:{port}/api/tags', timeout=2)
-                if resp.status_code == 200:
-                    print(f"LLM found on port {port}: {resp.json()}")
-            except:
-                pass
-    except:
-        pass
-
-threads = []
-for port in range(1, 65536):
-    t = threading.Thread(target=check_port, args=(port,))
-    threads.append(t)
-    t.start()
-    if len(threads) >= 100:  # Limit concurrent threads
-        for t in threads:
-            t.join()
-        threads = []
-
-for t in threads:
-    t.join()
-
-print("Port scan complete.")
\ No newline at end of file
+                open_ports = sorted(procfs_ports(resolved[1], ports), key=ranks[host])
+            except OSError:
+                if discovery == "procfs":
+                    raise
+                mode = "connect"
+        if open_ports is not None:
+            for port in open_ports:
+                opened(port)
+        else:
+            open_ports = await connect(priority)
+            if first:
+                # Usually the answer is on a well-known or cached port; settle those
+                # before the full sweep starts competing with the probes
+                await settle(probes, stop)
+            if not stop.is_set():
+                rest = order_ports(ports, priority)
+                for _ in priority:
+                    next(rest)
+                open_ports += await connect(rest)
+        per_host_results[host] = {"discovery": mode, "open_ports": sorted(open_ports),
+                                  "discover_s": time.perf_counter() - host_started}
+
+    try:
+        await asyncio.gather(*(scan_host(host) for host in hosts
+                               if resolved_hosts[host] is not None))
+        timings["discover_s"] = time.perf_counter() - started
+        await settle(probes, stop)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        session.close()
+    timings["total_s"] = time.perf_counter() - started
+
+    order = {host: pos for pos, host in enumerate(hosts)}
+    endpoints.sort(key=lambda e: (order[e["host"]], ranks[e["host"]](e["port"])))
+    if cache is not None and endpoints:
+        for host in hosts:
+            cache.record(host, (e["port"] for e in endpoints if e["host"] == host))
+        cache.save()
+    return {"hosts": per_host_results, "ports_scanned": len(ports) * len(hosts),
+            "open_ports": sum(len(r["open_ports"]) for r in per_host_results.values()),
+            "endpoints": endpoints, "timings": timings, "stopped_early": stop.is_set(),
+            "rate": rate or None}
+
+
+def describe(endpoint: Dict[str, Any]) -> str:
+    names = ', '.join(m["model"] for m in endpoint["models"]) or 'no models loaded'
+    return (f"{endpoint['server']} on {endpoint['host']}:{endpoint['port']} "
+            f"({endpoint['latency_ms']} ms): {names}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scan for LLM servers on local or LAN hosts")
+    parser.add_argument("--host", action="append", dest="hosts", metavar="TARGET",
+                        help="Host, address or CIDR range; repeat or comma-separate "
+                             "(default: localhost)")
+    parser.add_argument("--hosts-file", help="File of targets, one per line")
+    parser.add_argument("--ports", help="e.g. 1-65535, 8000-9000,11434 or 'known' "
+                                        "(default: 1-65535 for one host, known for several)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Connects kept in flight at once, across all hosts")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST,
+                        help="Connects kept in flight per host")
+    parser.add_argument("--rate", type=float,
+                        help="Global connects per second (default: unlimited for local hosts, "
+                             f"{DEFAULT_REMOTE_RATE:g} otherwise; 0 disables)")
+    parser.add_argument("--connect-timeout", type=float, default=CONNECT_TIMEOUT)
+    parser.add_argument("--http-timeout", type=float, default=HTTP_TIMEOUT)
+    parser.add_argument("--discovery", choices=DISCOVERY_MODES, default="auto",
+                        help="How to find open ports: procfs listeners (local hosts), "
+                             "connect scan, or auto (procfs when possible)")
+    parser.add_argument("--first", type=int, metavar="N",
+                        help="Stop as soon as N endpoints have been found")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Neither read nor update the cache of previously found ports")
+    parser.add_argument("--cache-ttl", type=float, default=CACHE_TTL_SECONDS,
+                        help="Seconds a previously found port stays prioritized")
+    parser.add_argument("--json", dest="json_path",
+                        help="Write endpoints in the scripts/detected-llms.json format")
+    args = parser.parse_args(argv)
+
+    specs = list(args.hosts or [])
+    if args.hosts_file:
+        with open(args.hosts_file, 'r', encoding='utf-8') as f:
+            specs += [line.split('#', 1)[0].strip() for line in f]
+    hosts = expand_targets(specs or [DEFAULT_HOST])
+    ports = parse_ports(args.ports or (DEFAULT_PORTS if len(hosts) == 1 else 'known'))
+    concurrency = max_concurrency(max(1, args.concurrency))
+    cache = None if args.no_cache else PortCache(ttl=args.cache_ttl)
+    result = asyncio.run(scan(hosts, ports, concurrency, args.connect_timeout,
+                              args.http_timeout, args.discovery, first=args.first, cache=cache,
+                              per_host=max(1, args.per_host), rate=args.rate,
+                              remote_rate=DEFAULT_REMOTE_RATE,
+                              on_endpoint=lambda e: print(describe(e), flush=True)))
+    rate = result["rate"]
+
+    timings = result["timings"]
+    stopped = f", stopped after first {args.first}" if result["stopped_early"] else ""
+    print(f"Scan complete: {len(hosts)} host(s), {result['ports_scanned']} ports, "
+          f"{result['open_ports']} open, {len(result['endpoints'])} LLM endpoint(s){stopped}")
+    for host_result in result["hosts"].values():
+        if host_result.get("error"):
+            print(f"  {host_result['error']}")
+    modes = sorted({r["discovery"] for r in result["hosts"].values() if r["discovery"]})
+    in_flight = (concurrency if len(hosts) == 1
+                 else f"{concurrency} total, {min(max(1, args.per_host), concurrency)}/host")
+    how = ', '.join(m if m == "procfs" else f"connect, {in_flight} in flight"
+                    + (f", {rate:g}/s" if rate else '') for m in modes)
+    first_found = timings.get("first_endpoint_s")
+    print(f"  discover {timings['discover_s']:.3f}s ({how}), "
+          f"first endpoint {f'{first_found:.3f}s' if first_found is not None else '-'}, "
+          f"total {timings['total_s']:.3f}s")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(detected_llms(result["endpoints"]), f, indent=2)
+        print(f"Endpoints saved to: {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""SEO analyzer micro-benchmark
+Compares the single-pass html_analyzer with the previous BeautifulSoup
+tree + find/find_all path on local pages, and checks both agree.
+
+Run: python evaluation/bench_seo.py [--pages owasp-range attack-patterns] [--repeat 50]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from html_analyzer import analyze_html, run_seo_checks
+
+PUBLIC_DIR = Path(__file__).resolve().parent.parent / "public"
+DEFAULT_PAGES = ["owasp-range", "attack-patterns", "solution-diagram-builder", "index"]
+ALL_CHECKS = {name: True for name in (
+    "has_title", "has_meta_description", "has_og_tags", "has_charset", "has_viewport",
+    "has_single_h1", "proper_heading_hierarchy", "all_images_have_alt",
+    "has_organization_schema", "has_website_schema", "mobile_friendly",
+)}
+
+
+def soup_seo_checks(html: str, seo_checks: Dict[str, Any]) -> Tuple[Dict[str, bool], Dict[str, Any]]:
+    """The BeautifulSoup implementation SEOValidator used before html_analyzer"""
+    soup = BeautifulSoup(html, 'html.parser')
+    checks: Dict[str, bool] = {}
+    extras: Dict[str, Any] = {}
+
+    if seo_checks.get("has_title"):
+        title = soup.find("title")
+        checks["has_title"] = title is not None and len(title.text) > 0
+    if seo_checks.get("has_meta_description"):
+        checks["has_meta_description"] = soup.find("meta", attrs={"name": "description"}) is not None
+    if seo_checks.get("has_og_tags"):
+        og_title = soup.find("meta", attrs={"property": "og:title"})
+        og_desc = soup.find("meta", attrs={"property": "og:description"})
+        og_image = soup.find("meta", attrs={"property": "og:image"})
+        checks["has_og_tags"] = (og_title and og_desc and og_image) is not None
+    if seo_checks.get("has_charset"):
+        checks["has_charset"] = soup.find("meta", attrs={"charset": True}) is not None
+    if seo_checks.get("has_viewport"):
+        checks["has_viewport"] = soup.find("meta", attrs={"name": "viewport"}) is not None
+    if seo_checks.get("has_single_h1"):
+        h1_tags = soup.find_all("h1")
+        checks["has_single_h1"] = len(h1_tags) == 1
+        extras["h1_count"] = len(h1_tags)
+    if seo_checks.get("proper_heading_hierarchy"):
+        h_tags = soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6"])
+        checks["proper_heading_hierarchy"] = len(h_tags) > 0 and h_tags[0].name == "h1"
+    if seo_checks.get("all_images_have_alt"):
+        images = soup.find_all("img")
+        images_with_alt = sum(1 for img in images if img.get("alt"))
+        checks["all_images_have_alt"] = len(images) == 0 or images_with_alt == len(images)
+        extras["image_alt_coverage"] = images_with_alt / len(images) if images else 1.0
+    if seo_checks.get("has_organization_schema"):
+        scripts = soup.find_all("script", attrs={"type": "application/ld+json"})
+        checks["has_organization_schema"] = any("Organization" in str(s) for s in scripts)
+    if seo_checks.get("has_website_schema"):
+        scripts = soup.find_all("script", attrs={"type": "application/ld+json"})
+        checks["has_website_schema"] = any("website" in str(s).lower() for s in scripts)
+    if seo_checks.get("mobile_friendly"):
+        viewport = soup.find("meta", attrs={"name": "viewport"})
+        checks["mobile_friendly"] = viewport is not None and "width=device-width" in str(viewport)
+    return checks, extras
+
+
+def streaming_seo_checks(html: str, seo_checks: Dict[str, Any]) -> Tuple[Dict[str, bool], Dict[str, Any]]:
+    return run_seo_checks(analyze_html(html), seo_checks)
+
+
+def time_ms(fn, html: str, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(html, ALL_CHECKS)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark SEO page analysis")
+    parser.add_argument("--pages", nargs="+", default=DEFAULT_PAGES,
+                        help="Page names under public/ (without .html)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    print(f"{'page':<28} {'KB':>6} {'soup ms':>9} {'stream ms':>10} {'speedup':>8}  same")
+    for name in args.pages:
+        html = (PUBLIC_DIR / f"{name}.html").read_text(encoding='utf-8')
+        same = soup_seo_checks(html, ALL_CHECKS) == streaming_seo_checks(html, ALL_CHECKS)
+        soup_ms = time_ms(soup_seo_checks, html, args.repeat)
+        stream_ms = time_ms(streaming_seo_checks, html, args.repeat)
+        print(f"{name:<28} {len(html.encode('utf-8')) / 1024:>6.1f} {soup_ms:>9.2f} "
+              f"{stream_ms:>10.2f} {soup_ms / stream_ms:>7.1f}x  {'yes' if same else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
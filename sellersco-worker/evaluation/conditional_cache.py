@@ -0,0 +1,194 @@
+"""
+Conditional Request Cache
+On-disk HTTP cache that lets unchanged pages skip re-analysis across runs
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Response headers replayed with a cached body
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class ConditionalCache:
+    """
+    Revalidates GET requests against what the previous run saw
+
+    For every URL the cache keeps the ETag / Last-Modified validators, the
+    status, a SHA-256 of the body (the body itself is stored once under
+    bodies/<sha256>) and the evaluator verdicts computed from that body.
+    Later runs send If-None-Match / If-Modified-Since; a 304 is answered with
+    the stored body, so evaluators see a normal response. Responses that
+    come back 304, or 200 with an identical body hash, are flagged
+    `unchanged` and their stored verdicts stay valid; any other body drops
+    them. Verdicts are also only valid for the evaluator code that computed
+    them: the index records a verdict_version, and loading it with a
+    different one drops every stored verdict (bodies and validators stay).
+
+    Wraps a requests-style transport and exposes the same request()/get()/
+    post() shape, so it slots in under ResponseCache.
+    """
+
+    def __init__(self, cache_dir: str, transport: Any = requests,
+                 verdict_version: Optional[str] = None):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Directory holding index.json and bodies/
+            transport: Object with a requests-style request(method, url, **kwargs)
+            verdict_version: Identifies the evaluator code; stored verdicts
+                from any other version are discarded
+        """
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.bodies_dir = os.path.join(cache_dir, "bodies")
+        self.transport = transport
+        self.verdict_version = verdict_version
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.not_modified = 0
+        self.unchanged = 0
+        self.reused_verdicts = 0
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            self.entries = index.get("urls", {})
+        except (OSError, ValueError, AttributeError):
+            index, self.entries = {}, {}
+        if index.get("verdict_version") != verdict_version:
+            for entry in self.entries.values():
+                entry["verdicts"] = {}
+
+    def _body_path(self, digest: str) -> str:
+        return os.path.join(self.bodies_dir, digest)
+
+    def _read_body(self, entry: Optional[Dict[str, Any]]) -> Optional[bytes]:
+        if not entry:
+            return None
+        try:
+            with open(self._body_path(entry["sha256"]), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_body(self, digest: str, body: bytes):
+        path = self._body_path(digest)
+        if os.path.exists(path):
+            return
+        os.makedirs(self.bodies_dir, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _replay(url: str, entry: Dict[str, Any], body: bytes,
+                not_modified: requests.Response) -> requests.Response:
+        """Response rebuilt from the cache, carrying the 304's request and timing"""
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response._content = body
+        # The body is already in memory: iter_content() must replay it, not read a socket
+        response._content_consumed = True
+        response.raw = None
+        response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        response.url = url
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        if hasattr(not_modified, "timing"):
+            response.timing = not_modified.timing
+        return response
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, conditionally when the URL has been seen before"""
+        if method.upper() != "GET" or kwargs.get("stream"):
+            return self.transport.request(method, url, **kwargs)
+
+        with self._lock:
+            entry = self.entries.get(url)
+        body = self._read_body(entry)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if body is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.transport.request("GET", url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and body is not None:
+            response = self._replay(url, entry, body, response)
+            response.unchanged = True
+            with self._lock:
+                self.not_modified += 1
+            return response
+
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        unchanged = (entry is not None and entry["sha256"] == digest
+                     and entry["status"] == response.status_code)
+        self._write_body(digest, content)
+        with self._lock:
+            self.entries[url] = {
+                "status": response.status_code,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "sha256": digest,
+                "headers": {k: response.headers[k] for k in KEPT_HEADERS if k in response.headers},
+                "verdicts": entry.get("verdicts", {}) if unchanged else {},
+            }
+            if unchanged:
+                self.unchanged += 1
+        response.unchanged = unchanged
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def verdict(self, url: str, key: str) -> Optional[Dict[str, Any]]:
+        """Stored evaluator result for this URL's current body, if any"""
+        with self._lock:
+            result = (self.entries.get(url) or {}).get("verdicts", {}).get(key)
+            if result is not None:
+                self.reused_verdicts += 1
+        return dict(result) if result is not None else None
+
+    def record_verdict(self, url: str, key: str, result: Dict[str, Any]):
+        """Remember an evaluator result computed from this URL's current body"""
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry is not None:
+                entry["verdicts"][key] = json.loads(json.dumps(result, default=str))
+
+    def save(self):
+        """Write the index atomically and drop bodies no URL refers to"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._lock:
+            payload = json.dumps({"verdict_version": self.verdict_version,
+                                  "urls": self.entries}, indent=2)
+            live = {entry["sha256"] for entry in self.entries.values()}
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_path, self.index_path)
+        if os.path.isdir(self.bodies_dir):
+            for name in os.listdir(self.bodies_dir):
+                if name not in live and not name.endswith(".tmp"):
+                    os.remove(self._body_path(name))
+
+    def stats(self) -> Dict[str, int]:
+        """Revalidation outcomes and reused verdicts for this run"""
+        with self._lock:
+            return {"not_modified": self.not_modified, "unchanged_bodies": self.unchanged,
+                    "reused_verdicts": self.reused_verdicts}
@@ -44,11 +44,20 @@ class EvaluationConfig:
     queries_jsonl_file: str = "test-data/evaluation-queries.jsonl"
     seo_framework_file: str = "test-data/seo-audit-framework.json"
     output_dir: str = "evaluation-results"
+    http_cache_dir: str = os.getenv("EVAL_HTTP_CACHE", ".eval_cache")
     
     # Evaluation settings
     timeout_seconds: int = 30
     max_retries: int = 3
-    batch_size: int = 10
+    retry_backoff_seconds: float = 0.5  # First retry waits up to this; doubles per retry
+    retry_backoff_max_seconds: float = 8.0
+    batch_size: int = 10  # Queries evaluated concurrently (and pooled connections per host)
+    # Revalidate pages against the last run and reuse verdicts for unchanged ones
+    incremental: bool = os.getenv("EVAL_INCREMENTAL", "1") != "0"
+    # Validate data freshness bodies as they stream in, buffering at most
+    # json_budget_bytes of any single JSON value (streamed bodies bypass the caches)
+    stream_json: bool = os.getenv("EVAL_STREAM_JSON", "0") == "1"
+    json_budget_bytes: int = int(os.getenv("EVAL_JSON_BUDGET_BYTES", str(1 << 20)))
     
     # Target scores (for pass/fail)
     min_seo_score: float = 85.0
@@ -3,11 +3,17 @@ Route Availability Evaluator
 Tests HTTP status codes and response validity for all routes
 """
 
+import sys
 import requests
+from pathlib import Path
 from typing import Dict, Any, Optional
 from bs4 import BeautifulSoup
 import json
 
+sys.path.insert(0, str(Path(__file__).parent))
+
+from keyword_matcher import KeywordMatcher
+
 class RouteAvailabilityEvaluator:
     """
     Evaluates route availability by checking HTTP status codes
@@ -16,16 +22,19 @@ class RouteAvailabilityEvaluator:
     """
     
     def __init__(self, base_url: str = "https://icy-flower-c586.jsellers.workers.dev", 
-                 timeout: int = 30):
+                 timeout: int = 30, http=None):
         """
         Initialize evaluator
         
         Args:
             base_url: Base URL of the worker
             timeout: Request timeout in seconds
+            http: requests-compatible client (e.g. a shared Transport or ResponseCache);
+                defaults to the requests module
         """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.http = http or requests
     
     def __call__(self, *, endpoint: str, method: str = "GET", 
                  expected_status: int = 200, **kwargs) -> Dict[str, Any]:
@@ -49,9 +58,9 @@ class RouteAvailabilityEvaluator:
                 url = f"{self.base_url}{endpoint}"
             
             if method.upper() == "GET":
-                response = requests.get(url, timeout=self.timeout, allow_redirects=True)
+                response = self.http.get(url, timeout=self.timeout, allow_redirects=True)
             elif method.upper() == "POST":
-                response = requests.post(url, timeout=self.timeout, json=kwargs.get("body", {}))
+                response = self.http.post(url, timeout=self.timeout, json=kwargs.get("body", {}))
             else:
                 return {
                     "status_match": False,
@@ -77,7 +86,8 @@ class RouteAvailabilityEvaluator:
                 "has_content": has_content,
                 "content_length": len(response.text),
                 "score": score,
-                "error": None
+                "error": None,
+                "timing": getattr(response, "timing", None)
             }
         
         except requests.Timeout:
@@ -106,10 +116,11 @@ class FeatureCompletenessEvaluator:
     """
     
     def __init__(self, base_url: str = "https://icy-flower-c586.jsellers.workers.dev",
-                 timeout: int = 30):
+                 timeout: int = 30, http=None):
         """Initialize evaluator"""
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.http = http or requests
     
     def __call__(self, *, endpoint: str, expected_contains: list = None, 
                  expected_status: int = 200, **kwargs) -> Dict[str, Any]:
@@ -134,21 +145,16 @@ class FeatureCompletenessEvaluator:
                 url = endpoint
             else:
                 url = f"{self.base_url}{endpoint}"
-            response = requests.get(url, timeout=self.timeout)
+            response = self.http.get(url, timeout=self.timeout)
             
             # Check status
             status_ok = response.status_code == expected_status
             
-            # Check for expected content
-            text = response.text.lower()
-            found_content = []
-            missing_content = []
-            
-            for expected_str in expected_contains:
-                if expected_str.lower() in text:
-                    found_content.append(expected_str)
-                else:
-                    missing_content.append(expected_str)
+            # Check for expected content (one matcher per keyword set, over the raw bytes)
+            present = KeywordMatcher.for_keywords(expected_contains).search_response(response)
+            found_content = [expected_str for expected_str in expected_contains if expected_str in present]
+            missing_content = [expected_str for expected_str in expected_contains
+                               if expected_str not in present]
             
             # Calculate score
             content_match_rate = len(found_content) / len(expected_contains) if expected_contains else 1.0
@@ -161,7 +167,8 @@ class FeatureCompletenessEvaluator:
                 "found_content_count": len(found_content),
                 "missing_content": missing_content,
                 "content_match_rate": content_match_rate,
-                "score": score
+                "score": score,
+                "timing": getattr(response, "timing", None)
             }
         
         except Exception as e:
@@ -0,0 +1,174 @@
+"""
+HTML Analyzer
+Single-pass, event-driven extraction of the page facts SEO checks need
+"""
+
+import codecs
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+LD_JSON = "application/ld+json"
+CHUNK_SIZE = 64 * 1024
+
+
+class SEOAnalyzer(HTMLParser):
+    """
+    Collects SEO facts while the page streams through html.parser
+
+    No tree is built: each start tag, end tag and text event updates a few
+    counters, so one pass yields everything SEOValidator checks. Matching
+    follows what the BeautifulSoup lookups did: first <title> element, exact
+    attribute values, first heading in document order, and JSON-LD scripts
+    compared by their markup.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title: Optional[str] = None
+        self.has_meta_description = False
+        self.og_properties = set()
+        self.has_charset = False
+        self.viewport_markup: Optional[str] = None
+        self.h1_count = 0
+        self.first_heading: Optional[str] = None
+        self.image_count = 0
+        self.images_with_alt = 0
+        self.ld_json: List[str] = []
+        self._title_parts: Optional[List[str]] = None
+        self._ld_json_parts: Optional[List[str]] = None
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        if tag == "meta":
+            attributes = dict(attrs)
+            name = attributes.get("name")
+            if name == "description":
+                self.has_meta_description = True
+            elif name == "viewport" and self.viewport_markup is None:
+                self.viewport_markup = self.get_starttag_text()
+            if attributes.get("property") in ("og:title", "og:description", "og:image"):
+                self.og_properties.add(attributes["property"])
+            if "charset" in attributes:
+                self.has_charset = True
+        elif tag in HEADINGS:
+            if self.first_heading is None:
+                self.first_heading = tag
+            if tag == "h1":
+                self.h1_count += 1
+        elif tag == "img":
+            self.image_count += 1
+            if dict(attrs).get("alt"):
+                self.images_with_alt += 1
+        elif tag == "title":
+            if self.title is None and self._title_parts is None:
+                self._title_parts = []
+        elif tag == "script":
+            if dict(attrs).get("type") == LD_JSON:
+                self._ld_json_parts = [self.get_starttag_text()]
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        # <meta ... />, <img ... />: no content to wait for
+        if tag in ("title", "script"):
+            return
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag: str):
+        if tag == "title" and self._title_parts is not None:
+            self.title = "".join(self._title_parts)
+            self._title_parts = None
+        elif tag == "script" and self._ld_json_parts is not None:
+            self._ld_json_parts.append("</script>")
+            self.ld_json.append("".join(self._ld_json_parts))
+            self._ld_json_parts = None
+
+    def handle_data(self, data: str):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+        if self._ld_json_parts is not None:
+            self._ld_json_parts.append(data)
+
+    def close(self):
+        super().close()
+        # Unclosed elements still count, as they would in a parsed tree
+        if self._title_parts is not None:
+            self.title = "".join(self._title_parts)
+            self._title_parts = None
+        if self._ld_json_parts is not None:
+            self.ld_json.append("".join(self._ld_json_parts))
+            self._ld_json_parts = None
+
+
+def analyze_html(html: str, chunk_size: int = CHUNK_SIZE) -> SEOAnalyzer:
+    """Feed a page through SEOAnalyzer in chunks and return the finished analyzer"""
+    analyzer = SEOAnalyzer()
+    for start in range(0, len(html), chunk_size):
+        analyzer.feed(html[start:start + chunk_size])
+    analyzer.close()
+    return analyzer
+
+
+def analyze_chunks(chunks: Iterable[bytes], encoding: Optional[str] = None) -> SEOAnalyzer:
+    """
+    Decode byte chunks incrementally and feed them through SEOAnalyzer
+
+    Decodes like requests' response.text (undecodable bytes are replaced,
+    an unknown encoding falls back to UTF-8), but chunk by chunk, so the
+    whole page is never held as one str.
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+    except LookupError:
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    analyzer = SEOAnalyzer()
+    for chunk in chunks:
+        analyzer.feed(decoder.decode(chunk))
+    analyzer.feed(decoder.decode(b"", final=True))
+    analyzer.close()
+    return analyzer
+
+
+def run_seo_checks(page: SEOAnalyzer,
+                   requested: Dict[str, Any]) -> Tuple[Dict[str, bool], Dict[str, Any]]:
+    """
+    Evaluate the requested seo_checks flags against analyzed page facts
+
+    Returns (checks, extras) where extras holds h1_count and
+    image_alt_coverage when those checks were requested.
+    """
+    checks: Dict[str, bool] = {}
+    extras: Dict[str, Any] = {}
+
+    if requested.get("has_title"):
+        checks["has_title"] = page.title is not None and len(page.title) > 0
+    if requested.get("has_meta_description"):
+        checks["has_meta_description"] = page.has_meta_description
+    if requested.get("has_og_tags"):
+        checks["has_og_tags"] = len(page.og_properties) == 3
+    if requested.get("has_charset"):
+        checks["has_charset"] = page.has_charset
+    if requested.get("has_viewport"):
+        checks["has_viewport"] = page.viewport_markup is not None
+
+    if requested.get("has_single_h1"):
+        checks["has_single_h1"] = page.h1_count == 1
+        extras["h1_count"] = page.h1_count
+    if requested.get("proper_heading_hierarchy"):
+        checks["proper_heading_hierarchy"] = page.first_heading == "h1"
+
+    if requested.get("all_images_have_alt"):
+        checks["all_images_have_alt"] = (page.image_count == 0
+                                         or page.images_with_alt == page.image_count)
+        extras["image_alt_coverage"] = (page.images_with_alt / page.image_count
+                                        if page.image_count else 1.0)
+
+    if requested.get("has_organization_schema"):
+        checks["has_organization_schema"] = any("Organization" in s for s in page.ld_json)
+    if requested.get("has_website_schema"):
+        # Case-insensitive: schema.org spells it WebSite
+        checks["has_website_schema"] = any("website" in s.lower() for s in page.ld_json)
+
+    if requested.get("mobile_friendly"):
+        checks["mobile_friendly"] = (page.viewport_markup is not None
+                                     and "width=device-width" in page.viewport_markup)
+
+    return checks, extras
@@ -0,0 +1,162 @@
+"""
+JSON Stream
+Incremental reader for large JSON payloads under a fixed memory budget
+"""
+
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+WHITESPACE = " \t\n\r"
+VALUE_START = '[{"-0123456789tfn'
+NUMBER_CHARS = "0123456789.eE+-"
+# A decode error this close to the end of the buffer may just be a value cut
+# off mid-literal or mid-escape by the chunk boundary
+INCOMPLETE_WINDOW = 16
+
+# Event kinds yielded by JSONStream.events()
+ITEM = "item"        # (ITEM, key, element): one element of a streamed array
+ARRAY = "array"      # (ARRAY, key, count): a streamed array has ended
+MEMBER = "member"    # (MEMBER, key, value): a non-array member of the top-level object
+VALUE = "value"      # (VALUE, None, value): a top-level scalar
+
+
+class JSONBudgetExceeded(ValueError):
+    """A single JSON value needed more buffered text than the budget allows"""
+
+
+class JSONStream:
+    """
+    Reads a top-level JSON array or object chunk by chunk
+
+    Elements of the top-level array, and of arrays that are direct members
+    of the top-level object, are decoded and yielded one at a time, so only
+    the element being decoded is held in memory. Everything else is decoded
+    whole. More input is only read while less than budget characters (bytes,
+    for ASCII JSON) are pending, so the buffer never holds more than budget
+    plus one chunk; a larger single value raises JSONBudgetExceeded. Malformed input raises
+    json.JSONDecodeError as soon as it is seen, so an HTML page is rejected
+    at its first byte.
+
+    kind is "list", "dict" or "scalar" once events() has started.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], budget: int = 1 << 20):
+        self._chunks = iter(chunks)
+        self.budget = budget
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="strict")
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self.kind: Optional[str] = None
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer; False at end of input"""
+        if self._eof:
+            return False
+        if len(self._buf) - self._pos > self.budget:
+            raise JSONBudgetExceeded(f"JSON value larger than the {self.budget}-byte budget")
+        if self._pos > len(self._buf) // 2:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._buf += self._decoder.decode(b"", final=True)
+            self._eof = True
+            return False
+        self._buf += self._decoder.decode(chunk)
+        return True
+
+    def _peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)"""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        c = self._peek()
+        if not c or c not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {chars!r}", self._buf, self._pos)
+        self._pos += 1
+        return c
+
+    def _value(self) -> Any:
+        """Decode one complete value starting at the next non-whitespace character"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buf, self._pos)
+                # A number at the end of the buffer ("1", "1.", "1.5e") may
+                # continue in the next chunk
+                if self._eof or not (isinstance(value, (int, float))
+                                     and self._number_may_continue(end)):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self._eof or not self._incomplete(e):
+                    raise
+            self._fill()
+
+    def _number_may_continue(self, end: int) -> bool:
+        """Whether only number characters follow end up to the end of the buffer"""
+        while end < len(self._buf):
+            if self._buf[end] not in NUMBER_CHARS:
+                return False
+            end += 1
+        return True
+
+    def _incomplete(self, error: json.JSONDecodeError) -> bool:
+        """Whether a decode error could be cured by reading more input"""
+        return (error.msg.startswith("Unterminated string")
+                or len(self._buf) - error.pos < INCOMPLETE_WINDOW)
+
+    def _array(self, key: Optional[str]) -> Iterator[Tuple[str, Optional[str], Any]]:
+        count = 0
+        if self._peek() == "]":
+            self._pos += 1
+        else:
+            while True:
+                yield ITEM, key, self._value()
+                count += 1
+                if self._expect(",]") == "]":
+                    break
+        yield ARRAY, key, count
+
+    def events(self) -> Iterator[Tuple[str, Optional[str], Any]]:
+        """Yield (kind, key, value) events; see the module-level event kinds"""
+        c = self._peek()
+        if c == "[":
+            self.kind = "list"
+            self._pos += 1
+            yield from self._array(None)
+        elif c == "{":
+            self.kind = "dict"
+            self._pos += 1
+            if self._peek() == "}":
+                self._pos += 1
+            else:
+                while True:
+                    key = self._value()
+                    if not isinstance(key, str):
+                        raise json.JSONDecodeError("Expecting property name", self._buf, self._pos)
+                    self._expect(":")
+                    if self._peek() == "[":
+                        self._pos += 1
+                        yield from self._array(key)
+                    else:
+                        yield MEMBER, key, self._value()
+                    if self._expect(",}") == "}":
+                        break
+        elif c and c in VALUE_START:
+            self.kind = "scalar"
+            yield VALUE, None, self._value()
+        else:
+            raise json.JSONDecodeError("Expecting value", self._buf, self._pos)
+        if self._peek():
+            raise json.JSONDecodeError("Extra data", self._buf, self._pos)
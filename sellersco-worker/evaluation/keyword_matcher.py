@@ -0,0 +1,171 @@
+"""
+Keyword Matcher
+Case-insensitive multi-keyword search over raw response bytes
+"""
+
+import codecs
+from functools import lru_cache
+from typing import Callable, Iterable, Optional, Set, Tuple
+
+# Byte-order marks of encodings where ASCII text is not stored as ASCII bytes
+_WIDE_BOMS = (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE, codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE)
+
+
+def ascii_compatible(encoding: Optional[str], content: bytes = b"") -> bool:
+    """Whether ASCII keywords can be matched directly against bytes in this encoding"""
+    if encoding is None:
+        return not content.startswith(_WIDE_BOMS)
+    try:
+        return codecs.encode("azAZ09<>", encoding) == b"azAZ09<>"
+    except LookupError:
+        return False
+
+
+class KeywordMatcher:
+    """
+    Finds which of a fixed set of keywords occur in a document, ignoring case
+
+    Built once per keyword set (see for_keywords). ASCII keywords are matched
+    against the raw bytes: one bytes.lower() pass (ASCII-only, no decode and
+    no Unicode case mapping) followed by C substring searches, longest
+    keyword first. A found keyword also marks every keyword contained in it
+    as found, so those are never searched, and the search stops as soon as
+    everything is found. Keywords with non-ASCII characters, or bodies in an
+    encoding that isn't ASCII-compatible, fall back to decoded, lowercased
+    text, which is what the evaluators did before.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(keywords))
+        needles = {}
+        for keyword in self.keywords:
+            needles.setdefault(keyword.lower(), []).append(keyword)
+        # Longest first, so the substring closure can skip shorter needles
+        self._needles = sorted(needles.items(), key=lambda item: len(item[0]), reverse=True)
+        self._contained = {
+            needle: [other for other, _ in self._needles if other != needle and other in needle]
+            for needle, _ in self._needles
+        }
+        self._ascii = all(needle.isascii() for needle, _ in self._needles)
+        self._encoded = {needle: needle.encode('ascii') for needle, _ in self._needles
+                         if needle.isascii()}
+
+    @classmethod
+    def for_keywords(cls, keywords: Iterable[str]) -> "KeywordMatcher":
+        return _matcher(tuple(keywords))
+
+    def _search(self, haystack, encode: bool) -> Set[str]:
+        found_needles: Set[str] = set()
+        for needle, _ in self._needles:
+            if needle in found_needles:
+                continue
+            if (self._encoded[needle] if encode else needle) in haystack:
+                found_needles.add(needle)
+                found_needles.update(self._contained[needle])
+                if len(found_needles) == len(self._needles):
+                    break
+        return {keyword for needle, keywords in self._needles if needle in found_needles
+                for keyword in keywords}
+
+    def search(self, content: bytes, encoding: Optional[str] = None,
+               decode: Optional[Callable[[], str]] = None) -> Set[str]:
+        """
+        Keywords found in a body
+
+        Args:
+            content: Raw body bytes
+            encoding: Body encoding (e.g. response.encoding), None if unknown
+            decode: Returns the decoded body; only called when the bytes
+                can't be matched directly (default: decode with encoding)
+        """
+        if not self._needles:
+            return set()
+        if self._ascii and ascii_compatible(encoding, content):
+            return self._search(content.lower(), encode=True)
+        text = decode() if decode else content.decode(encoding or 'utf-8', errors='replace')
+        return self._search(text.lower(), encode=False)
+
+    def search_response(self, response) -> Set[str]:
+        """Keywords found in a requests.Response body"""
+        return self.search(response.content, response.encoding, lambda: response.text)
+
+    def stream(self, encoding: Optional[str] = None) -> "KeywordStream":
+        """Incremental search over a body that arrives in chunks"""
+        return KeywordStream(self, encoding)
+
+
+class _ChunkWindow:
+    """
+    Lowercases chunks as they arrive and keeps just enough of the previous
+    one that matches spanning a chunk boundary are still seen
+    """
+
+    def __init__(self, longest: int, as_bytes: bool, encoding: Optional[str]):
+        self.overlap = max(longest - 1, 0)
+        self.as_bytes = as_bytes
+        self.tail = b"" if as_bytes else ""
+        self._decoder = None if as_bytes else codecs.getincrementaldecoder(
+            encoding or 'utf-8')(errors='replace')
+
+    def push(self, chunk: bytes):
+        """(previous tail, tail + lowered chunk) for this chunk"""
+        lowered = chunk.lower() if self.as_bytes else self._decoder.decode(chunk).lower()
+        tail = self.tail
+        window = tail + lowered
+        self.tail = window[-self.overlap:] if self.overlap else window[:0]
+        return tail, window
+
+
+class KeywordStream:
+    """KeywordMatcher fed one chunk at a time; found holds the keywords seen so far"""
+
+    def __init__(self, matcher: KeywordMatcher, encoding: Optional[str] = None):
+        self.matcher = matcher
+        self._as_bytes = matcher._ascii and ascii_compatible(encoding)
+        longest = max((len(needle) for needle, _ in matcher._needles), default=0)
+        self._window = _ChunkWindow(longest, self._as_bytes, encoding)
+        self._found_needles: Set[str] = set()
+
+    def feed(self, chunk: bytes):
+        if len(self._found_needles) == len(self.matcher._needles):
+            return
+        _, window = self._window.push(chunk)
+        for needle, _ in self.matcher._needles:
+            if needle in self._found_needles:
+                continue
+            if (self.matcher._encoded[needle] if self._as_bytes else needle) in window:
+                self._found_needles.add(needle)
+                self._found_needles.update(self.matcher._contained[needle])
+
+    @property
+    def found(self) -> Set[str]:
+        return {keyword for needle, keywords in self.matcher._needles
+                if needle in self._found_needles for keyword in keywords}
+
+
+class OccurrenceCounter:
+    """
+    Case-insensitive str.count() of a few ASCII needles over a chunked body
+
+    Counts match text.lower().count(needle) on the decoded body for
+    needles that can't overlap themselves (words such as "vendor").
+    """
+
+    def __init__(self, needles: Iterable[str]):
+        self.needles = tuple(needle.lower().encode('ascii') for needle in needles)
+        self.counts = {needle: 0 for needle in self.needles}
+        self._window = _ChunkWindow(max(map(len, self.needles), default=0), True, None)
+
+    def feed(self, chunk: bytes):
+        tail, window = self._window.push(chunk)
+        for needle in self.needles:
+            # Occurrences entirely inside the tail were counted with the last chunk
+            self.counts[needle] += window.count(needle) - tail.count(needle)
+
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+@lru_cache(maxsize=256)
+def _matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
@@ -0,0 +1,95 @@
+"""
+Response Cache
+Run-scoped HTTP response cache shared by all evaluators
+"""
+
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+
+class ResponseCache:
+    """
+    Fetches each distinct request once per run
+
+    Requests are keyed on method, URL and body. The first caller performs the
+    request; callers asking for the same key while it is in flight wait for
+    that response instead of sending their own, and later callers get the
+    stored response. Failures are cached too, so a timing-out endpoint costs
+    one timeout per run rather than one per evaluator.
+
+    Exposes get() and post() with the same call shape as the requests module,
+    so evaluators can use either interchangeably.
+    """
+
+    def __init__(self, transport: Any = requests):
+        """
+        Initialize cache
+
+        Args:
+            transport: Object with a requests-style request(method, url, **kwargs)
+        """
+        self.transport = transport
+        self._lock = threading.Lock()
+        self._responses: Dict[Tuple[str, str, Optional[str]], Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(method: str, url: str, body: Any = None) -> Tuple[str, str, Optional[str]]:
+        """Cache key; JSON bodies are normalized so key order doesn't matter"""
+        if body is not None and not isinstance(body, (str, bytes)):
+            body = json.dumps(body, sort_keys=True, default=str)
+        elif isinstance(body, bytes):
+            body = body.decode('utf-8', errors='replace')
+        return method.upper(), url, body
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send (or reuse) a request; raises what the transport raised"""
+        if kwargs.get("stream"):
+            # Streamed bodies are read once by their caller and can't be shared
+            return self.transport.request(method, url, **kwargs)
+
+        body = kwargs.get("json", kwargs.get("data"))
+        key = self.key(method, url, body)
+
+        with self._lock:
+            future = self._responses.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._responses[key] = future
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if owner:
+            try:
+                response = self.transport.request(method, url, **kwargs)
+                # Read the body now so waiting threads never touch the socket
+                response.content
+                future.set_result(response)
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def clear(self):
+        """Forget all responses (start of a new run)"""
+        with self._lock:
+            self._responses.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Network requests sent and requests answered from the cache"""
+        with self._lock:
+            return {"requests": self.misses, "cache_hits": self.hits}
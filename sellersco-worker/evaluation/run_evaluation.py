@@ -3,12 +3,16 @@ Evaluation Runner
 Orchestrates the evaluation framework using Azure AI Evaluation SDK
 """
 
+import hashlib
 import json
 import os
 import sys
 from pathlib import Path
-from typing import Dict, List, Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Any, Optional
 import pandas as pd
+import requests
 from datetime import datetime
 
 # Add parent directory to path for imports
@@ -17,6 +21,37 @@ sys.path.insert(0, str(Path(__file__).parent))
 from config import get_eval_config, get_model_config
 from evaluators import RouteAvailabilityEvaluator, FeatureCompletenessEvaluator
 from validators import SEOValidator, DataFreshnessValidator
+from response_cache import ResponseCache
+from conditional_cache import ConditionalCache
+from transport import Transport
+
+# Modules whose code decides a verdict; editing any of them invalidates
+# the verdicts stored by incremental runs
+VERDICT_SOURCES = ("run_evaluation.py", "evaluators.py", "validators.py", "html_analyzer.py",
+                   "keyword_matcher.py", "json_stream.py")
+
+
+def verdict_version() -> str:
+    """Hash of the evaluator sources, recorded with stored verdicts"""
+    digest = hashlib.sha256()
+    for name in VERDICT_SOURCES:
+        digest.update((Path(__file__).parent / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class CategoryRun:
+    """The queries of one test category and how to evaluate and score them"""
+    
+    category: str
+    banner: str
+    queries: List[Dict[str, Any]]
+    evaluate: Callable[[Dict[str, Any]], Dict[str, Any]]
+    is_pass: Callable[[Dict[str, Any]], bool]
+    label: Callable[[Dict[str, Any]], str] = lambda query: query["description"]
+    fail_label: str = "❌ FAIL"
+    # URL the evaluator fetches; set when its verdicts can be reused across runs
+    url: Optional[Callable[[Dict[str, Any]], str]] = None
 
 
 class EvaluationRunner:
@@ -26,6 +61,17 @@ class EvaluationRunner:
         """Initialize runner"""
         self.eval_config = get_eval_config()
         self.model_config = get_model_config()
+        self.transport = Transport(
+            pool_size=max(1, self.eval_config.batch_size),
+            max_retries=self.eval_config.max_retries,
+            backoff_base=self.eval_config.retry_backoff_seconds,
+            backoff_max=self.eval_config.retry_backoff_max_seconds
+        )
+        self.conditional = None
+        if self.eval_config.incremental:
+            self.conditional = ConditionalCache(self.eval_config.http_cache_dir, self.transport,
+                                                verdict_version=verdict_version())
+        self.http = ResponseCache(self.conditional or self.transport)
         self.results = {
             "metadata": {
                 "timestamp": datetime.now().isoformat(),
@@ -50,163 +96,186 @@ class EvaluationRunner:
     
     def run_route_tests(self, queries: List[Dict]) -> Dict[str, Any]:
         """Run route availability tests"""
-        print("\n🧪 Running Route Availability Tests...")
-        
-        route_queries = [q for q in queries if q.get("category") == "route_availability"]
-        evaluator = RouteAvailabilityEvaluator(base_url=self.eval_config.target_worker_url)
-        
-        results = []
-        passed = 0
-        
-        for query in route_queries:
-            print(f"  Testing {query['endpoint']}...", end=" ")
-            
-            result = evaluator(
+        return self._run_categories([self._route_category(queries)])[0]
+    
+    def run_feature_tests(self, queries: List[Dict]) -> Dict[str, Any]:
+        """Run feature completeness tests"""
+        return self._run_categories([self._feature_category(queries)])[0]
+    
+    def run_data_freshness_tests(self, queries: List[Dict]) -> Dict[str, Any]:
+        """Run data freshness tests"""
+        return self._run_categories([self._data_freshness_category(queries)])[0]
+    
+    def run_seo_tests(self, queries: List[Dict]) -> Dict[str, Any]:
+        """Run SEO validation tests"""
+        return self._run_categories([self._seo_category(queries)])[0]
+    
+    def _route_category(self, queries: List[Dict]) -> CategoryRun:
+        """Route availability queries and how to evaluate them"""
+        evaluator = RouteAvailabilityEvaluator(
+            base_url=self.eval_config.target_worker_url, http=self.http
+        )
+        return CategoryRun(
+            category="route_availability",
+            banner="\n🧪 Running Route Availability Tests...",
+            queries=[q for q in queries if q.get("category") == "route_availability"],
+            evaluate=lambda query: evaluator(
                 endpoint=query["endpoint"],
                 method=query.get("method", "GET"),
                 expected_status=query.get("expected_status", 200)
-            )
-            
-            result["query_id"] = query["id"]
-            result["endpoint"] = query["endpoint"]
-            result["description"] = query["description"]
-            
-            is_pass = result.get("status_match", False)
-            passed += int(is_pass)
-            
-            status_str = "✅ PASS" if is_pass else "❌ FAIL"
-            print(status_str)
-            
-            results.append(result)
-        
-        pass_rate = passed / len(route_queries) if route_queries else 0
-        
-        return {
-            "category": "route_availability",
-            "total": len(route_queries),
-            "passed": passed,
-            "pass_rate": pass_rate,
-            "results": results
-        }
+            ),
+            is_pass=lambda result: result.get("status_match", False),
+            label=lambda query: query["endpoint"]
+        )
     
-    def run_feature_tests(self, queries: List[Dict]) -> Dict[str, Any]:
-        """Run feature completeness tests"""
-        print("\n✨ Running Feature Completeness Tests...")
-        
-        feature_queries = [q for q in queries if q.get("category") == "feature_completeness"]
-        evaluator = FeatureCompletenessEvaluator(base_url=self.eval_config.target_worker_url)
-        
-        results = []
-        passed = 0
-        
-        for query in feature_queries:
-            print(f"  Testing {query['description']}...", end=" ")
-            
-            result = evaluator(
+    def _feature_category(self, queries: List[Dict]) -> CategoryRun:
+        """Feature completeness queries and how to evaluate them"""
+        evaluator = FeatureCompletenessEvaluator(
+            base_url=self.eval_config.target_worker_url, http=self.http
+        )
+        return CategoryRun(
+            category="feature_completeness",
+            banner="\n✨ Running Feature Completeness Tests...",
+            queries=[q for q in queries if q.get("category") == "feature_completeness"],
+            evaluate=lambda query: evaluator(
                 endpoint=query["endpoint"],
                 expected_contains=query.get("expected_contains", []),
                 expected_status=query.get("expected_status", 200)
-            )
-            
-            result["query_id"] = query["id"]
-            result["endpoint"] = query["endpoint"]
-            result["description"] = query["description"]
-            
-            is_pass = result.get("score", 0) >= 0.8
-            passed += int(is_pass)
-            
-            status_str = "✅ PASS" if is_pass else "❌ FAIL"
-            print(status_str)
-            
-            results.append(result)
-        
-        pass_rate = passed / len(feature_queries) if feature_queries else 0
-        
-        return {
-            "category": "feature_completeness",
-            "total": len(feature_queries),
-            "passed": passed,
-            "pass_rate": pass_rate,
-            "results": results
-        }
+            ),
+            is_pass=lambda result: result.get("score", 0) >= 0.8,
+            url=lambda query: self._url(query["endpoint"], allow_absolute=True)
+        )
     
-    def run_data_freshness_tests(self, queries: List[Dict]) -> Dict[str, Any]:
-        """Run data freshness tests"""
-        print("\n📊 Running Data Freshness Tests...")
-        
-        data_queries = [q for q in queries if q.get("category") == "data_freshness"]
-        evaluator = DataFreshnessValidator(base_url=self.eval_config.target_worker_url)
-        
-        results = []
-        passed = 0
-        
-        for query in data_queries:
-            print(f"  Testing {query['description']}...", end=" ")
-            
-            result = evaluator(
+    def _data_freshness_category(self, queries: List[Dict]) -> CategoryRun:
+        """Data freshness queries and how to evaluate them"""
+        evaluator = DataFreshnessValidator(
+            base_url=self.eval_config.target_worker_url, http=self.http,
+            stream_json=self.eval_config.stream_json,
+            json_budget_bytes=self.eval_config.json_budget_bytes
+        )
+        return CategoryRun(
+            category="data_freshness",
+            banner="\n📊 Running Data Freshness Tests...",
+            queries=[q for q in queries if q.get("category") == "data_freshness"],
+            evaluate=lambda query: evaluator(
                 endpoint=query["endpoint"],
                 expected_contains=query.get("expected_contains"),
                 min_vendor_count=query.get("min_vendor_count", 80),
                 validate_data=query.get("validate_data")
-            )
-            
-            result["query_id"] = query["id"]
-            result["endpoint"] = query["endpoint"]
-            result["description"] = query["description"]
-            
-            is_pass = result.get("score", 0) >= 0.8
-            passed += int(is_pass)
+            ),
+            is_pass=lambda result: result.get("score", 0) >= 0.8,
+            # Streamed bodies skip the conditional cache, so there is no verdict to reuse
+            url=None if self.eval_config.stream_json else lambda query: self._url(query["endpoint"])
+        )
+    
+    def _seo_category(self, queries: List[Dict]) -> CategoryRun:
+        """SEO validation queries and how to evaluate them"""
+        evaluator = SEOValidator(
+            base_url=self.eval_config.target_worker_url, http=self.http
+        )
+        return CategoryRun(
+            category="seo_validation",
+            banner="\n🔍 Running SEO Validation Tests...",
+            queries=[q for q in queries if q.get("category") == "seo_validation"],
+            evaluate=lambda query: evaluator(
+                endpoint=query["endpoint"],
+                seo_checks=query.get("seo_checks", {})
+            ),
+            is_pass=lambda result: result.get("score", 0) >= 0.7,
+            fail_label="⚠️  PARTIAL",
+            url=lambda query: self._url(query["endpoint"])
+        )
+    
+    def _url(self, endpoint: str, allow_absolute: bool = False) -> str:
+        """URL an evaluator requests for an endpoint (mirrors the evaluators' own rule)"""
+        if allow_absolute and str(endpoint).lower().startswith('http'):
+            return endpoint
+        return f"{self.eval_config.target_worker_url.rstrip('/')}{endpoint}"
+    
+    def _incremental(self, run: CategoryRun) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Wrap a category's evaluate so unchanged pages reuse last run's verdict
+        
+        The page is fetched (conditionally) first; on a 304 or an identical
+        body the stored verdict for this exact query is returned, otherwise
+        the evaluator runs on the already-fetched response and its verdict is
+        stored for next time.
+        """
+        def evaluate(query: Dict[str, Any]) -> Dict[str, Any]:
+            url = run.url(query)
+            key = f"{run.category}:{json.dumps(query, sort_keys=True)}"
+            try:
+                response = self.http.get(url, timeout=self.eval_config.timeout_seconds)
+            except requests.RequestException:
+                return run.evaluate(query)
             
-            status_str = "✅ PASS" if is_pass else "❌ FAIL"
-            print(status_str)
+            if getattr(response, "unchanged", False):
+                verdict = self.conditional.verdict(url, key)
+                if verdict is not None:
+                    verdict["timing"] = getattr(response, "timing", None)
+                    verdict["reused_verdict"] = True
+                    return verdict
             
-            results.append(result)
-        
-        pass_rate = passed / len(data_queries) if data_queries else 0
+            result = run.evaluate(query)
+            if not result.get("error"):
+                self.conditional.record_verdict(url, key, result)
+            return result
         
-        return {
-            "category": "data_freshness",
-            "total": len(data_queries),
-            "passed": passed,
-            "pass_rate": pass_rate,
-            "results": results
-        }
+        return evaluate
     
-    def run_seo_tests(self, queries: List[Dict]) -> Dict[str, Any]:
-        """Run SEO validation tests"""
-        print("\n🔍 Running SEO Validation Tests...")
-        
-        seo_queries = [q for q in queries if q.get("category") == "seo_validation"]
-        evaluator = SEOValidator(base_url=self.eval_config.target_worker_url)
+    def _run_categories(self, categories: List[CategoryRun]) -> List[Dict[str, Any]]:
+        """
+        Run the queries of all categories concurrently
+        
+        Every query is submitted up front to one thread pool of
+        eval_config.batch_size workers; results are then collected and
+        printed category by category in query order, so output and
+        aggregation are the same as a sequential run.
+        """
+        max_workers = max(1, self.eval_config.batch_size)
+        evaluators = [
+            self._incremental(run) if self.conditional and run.url else run.evaluate
+            for run in categories
+        ]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = [
+                [executor.submit(evaluate, query) for query in run.queries]
+                for run, evaluate in zip(categories, evaluators)
+            ]
+            return [self._collect(run, futures) for run, futures in zip(categories, pending)]
+    
+    def _collect(self, run: CategoryRun, futures: List[Future]) -> Dict[str, Any]:
+        """Wait for one category's results and aggregate them"""
+        print(run.banner)
         
         results = []
         passed = 0
         
-        for query in seo_queries:
-            print(f"  Testing {query['description']}...", end=" ")
+        for query, future in zip(run.queries, futures):
+            print(f"  Testing {run.label(query)}...", end=" ")
             
-            result = evaluator(
-                endpoint=query["endpoint"],
-                seo_checks=query.get("seo_checks", {})
-            )
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"error": str(e), "score": 0}
             
             result["query_id"] = query["id"]
             result["endpoint"] = query["endpoint"]
             result["description"] = query["description"]
             
-            is_pass = result.get("score", 0) >= 0.7
+            is_pass = bool(run.is_pass(result))
             passed += int(is_pass)
             
-            status_str = "✅ PASS" if is_pass else "⚠️  PARTIAL"
+            status_str = "✅ PASS" if is_pass else run.fail_label
             print(status_str)
             
             results.append(result)
         
-        pass_rate = passed / len(seo_queries) if seo_queries else 0
+        pass_rate = passed / len(run.queries) if run.queries else 0
         
         return {
-            "category": "seo_validation",
-            "total": len(seo_queries),
+            "category": run.category,
+            "total": len(run.queries),
             "passed": passed,
             "pass_rate": pass_rate,
             "results": results
@@ -226,24 +295,16 @@ class EvaluationRunner:
         
         print(f"\n📋 Loaded {len(queries)} test queries")
         
-        # Run all test categories
-        test_results = []
-        
-        # Route tests
-        route_results = self.run_route_tests(queries)
-        test_results.append(route_results)
-        
-        # Feature tests
-        feature_results = self.run_feature_tests(queries)
-        test_results.append(feature_results)
-        
-        # Data freshness tests
-        data_results = self.run_data_freshness_tests(queries)
-        test_results.append(data_results)
+        # Responses are shared by all categories, but only within this run
+        self.http.clear()
         
-        # SEO tests
-        seo_results = self.run_seo_tests(queries)
-        test_results.append(seo_results)
+        # Run all test categories; queries from every category share one pool
+        test_results = self._run_categories([
+            self._route_category(queries),
+            self._feature_category(queries),
+            self._data_freshness_category(queries),
+            self._seo_category(queries),
+        ])
         
         # Aggregate results
         total_passed = sum(r["passed"] for r in test_results)
@@ -255,6 +316,10 @@ class EvaluationRunner:
         self.results["metadata"]["passed_queries"] = total_passed
         self.results["metadata"]["failed_queries"] = total_tests - total_passed
         self.results["metadata"]["overall_pass_rate"] = overall_pass_rate
+        self.results["metadata"]["http"] = self.http.stats()
+        if self.conditional:
+            self.results["metadata"]["http"].update(self.conditional.stats())
+            self.conditional.save()
         
         for cat_result in test_results:
             self.results["by_category"][cat_result["category"]] = {
@@ -0,0 +1,23 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+
+@pytest.fixture
+def server(handler):
+    """
+    Base URL of a local HTTP/1.1 server answering with `handler`
+
+    Test modules supply the BaseHTTPRequestHandler subclass through a
+    `handler` fixture, or per test with @pytest.mark.parametrize("handler", ...).
+    Request logging is silenced.
+    """
+    quiet = type(handler.__name__, (handler,), {"protocol_version": "HTTP/1.1",
+                                                "log_message": lambda self, *args: None})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), quiet)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
@@ -0,0 +1,108 @@
+import hashlib
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from evaluation import run_evaluation
+from evaluation.conditional_cache import ConditionalCache
+from evaluation.run_evaluation import EvaluationRunner
+from evaluation.transport import Transport
+
+
+PAGE = b"<html><head><title>sellersco</title></head><body><h1>vendor</h1></body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    page = PAGE
+    full_responses = 0
+
+    def do_GET(self):
+        etag = '"%s"' % hashlib.md5(self.page).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        _Handler.full_responses += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(self.page)))
+        self.end_headers()
+        self.wfile.write(self.page)
+
+
+@pytest.fixture
+def handler():
+    _Handler.page = PAGE
+    _Handler.full_responses = 0
+    return _Handler
+
+
+def test_revalidation_replays_body_and_keeps_verdicts(server, tmp_path):
+    url = f"{server}/"
+    first = ConditionalCache(str(tmp_path), Transport(max_retries=0))
+    response = first.get(url, timeout=5)
+    assert response.unchanged is False
+    first.record_verdict(url, "seo", {"score": 1.0})
+    first.save()
+
+    second = ConditionalCache(str(tmp_path), Transport(max_retries=0))
+    response = second.get(url, timeout=5)
+    assert response.status_code == 200 and response.unchanged is True
+    # Streamed first: reading .content would mark the body consumed and hide a bad replay
+    assert b"".join(response.iter_content(16)) == PAGE
+    assert list(response.iter_lines()) == [PAGE]
+    assert "vendor" in response.text
+    assert second.verdict(url, "seo") == {"score": 1.0}
+    assert second.stats()["not_modified"] == 1
+    assert _Handler.full_responses == 1
+
+    _Handler.page = _Handler.page.replace(b"vendor", b"vendors")
+    response = second.get(url, timeout=5)
+    assert response.unchanged is False
+    assert second.verdict(url, "seo") is None
+
+
+def test_verdicts_from_other_evaluator_code_are_dropped(server, tmp_path):
+    url = f"{server}/"
+    first = ConditionalCache(str(tmp_path), Transport(max_retries=0), verdict_version="a")
+    first.get(url, timeout=5)
+    first.record_verdict(url, "seo", {"score": 1.0})
+    first.save()
+
+    same = ConditionalCache(str(tmp_path), Transport(max_retries=0), verdict_version="a")
+    assert same.get(url, timeout=5).unchanged is True
+    assert same.verdict(url, "seo") == {"score": 1.0}
+
+    other = ConditionalCache(str(tmp_path), Transport(max_retries=0), verdict_version="b")
+    response = other.get(url, timeout=5)
+    assert response.unchanged is True and "vendor" in response.text
+    assert other.verdict(url, "seo") is None
+
+
+def test_runner_reuses_verdicts_on_second_run(server, tmp_path, monkeypatch):
+    config = replace(run_evaluation.get_eval_config(), target_worker_url=server,
+                     http_cache_dir=str(tmp_path), incremental=True)
+    monkeypatch.setattr(run_evaluation, "get_eval_config", lambda: config)
+    queries = [
+        {"id": "seo", "category": "seo_validation", "description": "seo", "endpoint": "/",
+         "seo_checks": {"has_title": True, "has_single_h1": True}},
+        {"id": "feat", "category": "feature_completeness", "description": "feat",
+         "endpoint": "/", "expected_contains": ["vendor"]},
+    ]
+
+    runs = []
+    for _ in range(2):
+        runner = EvaluationRunner()
+        monkeypatch.setattr(runner, "load_test_queries", lambda: queries)
+        runs.append(runner.run_all_tests())
+
+    first, second = runs
+    assert first["metadata"]["http"]["requests"] == 1
+    assert second["metadata"]["http"]["reused_verdicts"] == 2
+    assert [r["score"] for r in second["detailed_results"]] == \
+        [r["score"] for r in first["detailed_results"]]
+    assert all(r.get("reused_verdict") for r in second["detailed_results"])
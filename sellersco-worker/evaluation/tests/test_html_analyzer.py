@@ -0,0 +1,52 @@
+import pytest
+
+from evaluation.bench_seo import ALL_CHECKS, PUBLIC_DIR, soup_seo_checks
+from evaluation.html_analyzer import analyze_chunks, analyze_html, run_seo_checks
+
+EDGE_CASES = [
+    # Partial OG set, alt-less image, heading before h1, WebSite schema
+    """<html><head><meta charset="utf-8"><title>Sellers &amp; Co</title>
+    <meta property="og:title" content="x"><meta property="og:image" content="y">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <script type="application/ld+json">{"@type": "WebSite"}</script></head>
+    <body><h2>first</h2><h1>one</h1><h1>two</h1><img src="a.png"><img src="b.png" alt="b"/>
+    </body></html>""",
+    # Self-closing meta tags, empty title, Organization schema, no headings or images
+    """<html><head><title></title><meta name="description" content="d"/>
+    <meta name="viewport" content="initial-scale=1"/>
+    <meta property="og:title" content="t"/><meta property="og:description" content="d"/>
+    <meta property="og:image" content="i"/>
+    <script type="application/ld+json">{"@type": "Organization"}</script></head></html>""",
+    # Unclosed title swallows the rest of the document
+    "<html><head><title>Unclosed<body><h1>x</h1>",
+]
+
+
+@pytest.mark.parametrize("html", EDGE_CASES)
+def test_matches_beautifulsoup_on_edge_cases(html):
+    assert run_seo_checks(analyze_html(html), ALL_CHECKS) == soup_seo_checks(html, ALL_CHECKS)
+
+
+def test_matches_beautifulsoup_on_site_pages():
+    pages = sorted(PUBLIC_DIR.glob("*.html"))
+    assert pages
+    for page in pages:
+        html = page.read_text(encoding="utf-8")
+        assert run_seo_checks(analyze_html(html), ALL_CHECKS) == \
+            soup_seo_checks(html, ALL_CHECKS), page.name
+
+
+def test_chunk_boundaries_do_not_change_results():
+    html = (PUBLIC_DIR / "owasp-range.html").read_text(encoding="utf-8")
+    expected = run_seo_checks(analyze_html(html), ALL_CHECKS)
+    assert run_seo_checks(analyze_html(html, chunk_size=7), ALL_CHECKS) == expected
+
+
+def test_byte_chunks_decode_across_boundaries():
+    html = EDGE_CASES[0].replace("Sellers &amp; Co", "Sellers – Zürich")
+    expected = analyze_html(html)
+    body = html.encode("utf-8")
+    # 3-byte chunks split the multi-byte characters
+    page = analyze_chunks((body[i:i + 3] for i in range(0, len(body), 3)), "utf-8")
+    assert page.title == expected.title == "Sellers – Zürich"
+    assert run_seo_checks(page, ALL_CHECKS) == run_seo_checks(expected, ALL_CHECKS)
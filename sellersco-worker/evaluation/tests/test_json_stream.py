@@ -0,0 +1,117 @@
+import json
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from evaluation.json_stream import JSONBudgetExceeded, JSONStream
+from evaluation.keyword_matcher import KeywordMatcher, OccurrenceCounter
+from evaluation.transport import Transport
+from evaluation.validators import DataFreshnessValidator
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+VENDORS = [{"name": f"Vendor {i}", "notes": "ünïcode " * (i % 3)} for i in range(60)]
+VENDORS[41]["name"] = "CrowdStrike Falcon"
+OTX = {"source": "AlienVault OTX", "updated": 1.5e9, "pulses": [{"id": i, "tags": ["threat"]} for i in range(7)]}
+
+PAGES = {
+    "/sales-portal/api/vendors": ("application/json", json.dumps(VENDORS).encode("utf-8")),
+    "/api/otx/pulses": ("application/json", json.dumps(OTX, indent=2).encode("utf-8")),
+    "/api/frameworks": ("application/json",
+                        json.dumps([{"name": n} for n in ("HIPAA", "PCI DSS 4.0", "GDPR", "NIS2", "DORA")]).encode()),
+    "/api/empty": ("application/json", b"[]"),
+    "/api/blob": ("application/json", json.dumps([{"blob": "x" * 200_000}]).encode()),
+    "/compliance": ("text/html; charset=utf-8",
+                    b"<html><body>" + b"<p>2025 GDPR vendor threat OTX</p>" * 3000 + b"</body></html>"),
+}
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 4096])
+def test_events_match_json_loads(size):
+    body = json.dumps(OTX).encode("utf-8")
+    stream = JSONStream(_chunks(body, size))
+    events = list(stream.events())
+    assert stream.kind == "dict"
+    assert ("member", "source", "AlienVault OTX") in events
+    assert [v for kind, key, v in events if kind == "item"] == OTX["pulses"]
+    assert ("array", "pulses", 7) in events
+
+    stream = JSONStream(_chunks(json.dumps(VENDORS).encode("utf-8"), size))
+    assert [v for kind, _, v in stream.events() if kind == "item"] == VENDORS
+    assert stream.kind == "list"
+
+
+def test_budget_bounds_a_single_value():
+    body = json.dumps([{"blob": "x" * 5000}]).encode()
+    with pytest.raises(JSONBudgetExceeded):
+        list(JSONStream(_chunks(body, 256), budget=1024).events())
+    # Many small items fit however long the array is, even in chunks above the budget
+    body = json.dumps([{"n": i} for i in range(5000)]).encode()
+    for size in (256, 8192):
+        assert sum(1 for kind, _, _ in JSONStream(_chunks(body, size), budget=1024).events()
+                   if kind == "item") == 5000
+
+
+@pytest.mark.parametrize("body", [b"<!doctype html><html>", b'[1, 2, oops, 4' + b" " * 100 + b"]",
+                                  b'{"a": 1} {"b": 2}', b'{"a" 1}'])
+def test_malformed_input_raises_decode_error(body):
+    with pytest.raises(json.JSONDecodeError):
+        list(JSONStream(_chunks(body, 4), budget=64).events())
+
+
+def test_chunked_matchers_agree_with_whole_body():
+    text = PAGES["/compliance"][1]
+    keywords = KeywordMatcher.for_keywords(("GDPR", "threat otx", "missing"))
+    stream = keywords.stream("utf-8")
+    counter = OccurrenceCounter(("vendor", "palo alto"))
+    for chunk in _chunks(text, 5):
+        stream.feed(chunk)
+        counter.feed(chunk)
+    assert stream.found == keywords.search(text, "utf-8") == {"GDPR", "threat otx"}
+    assert counter.total() == text.decode("utf-8").lower().count("vendor")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        content_type, body = PAGES[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def handler():
+    return _Handler
+
+
+@pytest.mark.parametrize("query", [
+    {"endpoint": "/sales-portal/api/vendors", "expected_contains": ["CrowdStrike", "Okta"],
+     "min_vendor_count": 50},
+    {"endpoint": "/api/otx/pulses", "validate_data": "otx_threats"},
+    {"endpoint": "/api/frameworks", "expected_contains": ["HIPAA"]},
+    {"endpoint": "/api/empty", "expected_contains": ["HIPAA"]},
+    {"endpoint": "/compliance", "expected_contains": ["2025", "GDPR", "SOC 3"],
+     "validate_data": "otx_threats"},
+])
+def test_streaming_matches_buffered_validation(server, query):
+    http = Transport(max_retries=0)
+    buffered = DataFreshnessValidator(server, timeout=5, http=http)(**query)
+    streamed = DataFreshnessValidator(server, timeout=5, http=http, stream_json=True,
+                                      json_budget_bytes=4096)(**query)
+    for result in (buffered, streamed):
+        result.pop("timing")
+    assert "error" not in streamed
+    assert streamed == buffered
+
+
+def test_oversized_value_is_an_error_result(server):
+    validator = DataFreshnessValidator(server, timeout=5, http=Transport(max_retries=0),
+                                       stream_json=True, json_budget_bytes=16)
+    result = validator(endpoint="/api/blob")
+    assert result["score"] == 0
+    assert "budget" in result["error"]
@@ -0,0 +1,39 @@
+import pytest
+
+from evaluation.keyword_matcher import KeywordMatcher, ascii_compatible
+
+KEYWORDS = ["CrowdStrike", "Palo Alto", "threat", "threat intel", "intel", "okta", "Zürich"]
+
+
+def _reference(text, keywords):
+    lowered = text.lower()
+    return {k for k in keywords if k.lower() in lowered}
+
+
+@pytest.mark.parametrize("text", [
+    "<p>CROWDSTRIKE and palo alto ship THREAT INTEL</p>",
+    '[{"name": "Okta"}, {"name": "Palo Alto Networks"}]',
+    "nothing relevant here",
+    "intel only, no th-reat",
+    "Offices in ZÜRICH and zurich",
+])
+def test_matches_lowercase_substring_semantics(text):
+    ascii_keywords = [k for k in KEYWORDS if k.isascii()]
+    ascii_matcher = KeywordMatcher(ascii_keywords)
+    assert ascii_matcher.search(text.encode("utf-8"), "utf-8") == _reference(text, ascii_keywords)
+    # A non-ASCII keyword switches the whole set to decoded-text matching
+    assert KeywordMatcher(KEYWORDS).search(text.encode("utf-8"), "utf-8") == \
+        _reference(text, KEYWORDS)
+
+
+def test_non_ascii_compatible_encodings_are_decoded():
+    text = "CrowdStrike threat"
+    body = text.encode("utf-16")
+    assert not ascii_compatible("utf-16")
+    assert not ascii_compatible(None, body)
+    assert KeywordMatcher(["crowdstrike", "okta"]).search(body, "utf-16") == {"crowdstrike"}
+
+
+def test_matchers_are_shared_per_keyword_set():
+    assert KeywordMatcher.for_keywords(["a", "b"]) is KeywordMatcher.for_keywords(("a", "b"))
+    assert KeywordMatcher.for_keywords([]).search(b"anything") == set()
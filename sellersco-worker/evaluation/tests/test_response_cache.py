@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from evaluation.evaluators import FeatureCompletenessEvaluator, RouteAvailabilityEvaluator
+from evaluation.response_cache import ResponseCache
+
+
+class _Transport:
+    """requests-style transport that counts calls and answers slowly"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self.lock:
+            self.calls.append((method, url, kwargs.get("json")))
+        time.sleep(0.05)
+        if self.fail:
+            raise requests.Timeout("slow")
+        response = requests.Response()
+        response.status_code = 200
+        response._content = f"{method} {url} sellersco vendor".encode()
+        return response
+
+
+def test_concurrent_identical_requests_are_coalesced():
+    transport = _Transport()
+    cache = ResponseCache(transport)
+    responses = []
+    threads = [threading.Thread(target=lambda: responses.append(cache.get("http://x/")))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(transport.calls) == 1
+    assert len({id(r) for r in responses}) == 1
+    assert cache.stats() == {"requests": 1, "cache_hits": 7}
+
+
+def test_key_covers_method_url_and_body():
+    transport = _Transport()
+    cache = ResponseCache(transport)
+    cache.get("http://x/a")
+    cache.get("http://x/b")
+    cache.post("http://x/a", json={"q": 1, "r": 2})
+    cache.post("http://x/a", json={"r": 2, "q": 1})
+    cache.post("http://x/a", json={"q": 2})
+
+    assert len(transport.calls) == 4
+    cache.clear()
+    cache.get("http://x/a")
+    assert len(transport.calls) == 5
+
+
+def test_failures_are_shared_and_evaluators_share_responses():
+    failing = ResponseCache(_Transport(fail=True))
+    with pytest.raises(requests.Timeout):
+        failing.get("http://x/")
+    result = RouteAvailabilityEvaluator(base_url="http://x", http=failing)(endpoint="/")
+    assert result["error"] == "Request timeout"
+    assert len(failing.transport.calls) == 1
+
+    transport = _Transport()
+    cache = ResponseCache(transport)
+    route = RouteAvailabilityEvaluator(base_url="http://x", http=cache)(endpoint="/")
+    feature = FeatureCompletenessEvaluator(base_url="http://x", http=cache)(
+        endpoint="/", expected_contains=["vendor"])
+    assert route["score"] == 1.0 and feature["score"] == 1.0
+    assert len(transport.calls) == 1
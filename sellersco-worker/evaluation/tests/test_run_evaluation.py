@@ -0,0 +1,60 @@
+import threading
+import time
+from dataclasses import replace
+
+from evaluation import run_evaluation
+from evaluation.run_evaluation import EvaluationRunner
+
+
+class _SlowEvaluator:
+    """Evaluator stand-in that records how many calls overlap"""
+
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def __init__(self, base_url=None, timeout=30, http=None, **kwargs):
+        pass
+
+    def __call__(self, *, endpoint, **kwargs):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        # Later queries finish first, so ordering comes from collection, not completion
+        time.sleep(0.05 if endpoint.endswith("0") else 0.01)
+        with cls.lock:
+            cls.in_flight -= 1
+        return {"status_match": True, "score": 1.0 if "ok" in endpoint else 0.0}
+
+
+def _queries():
+    categories = ["route_availability", "feature_completeness", "data_freshness", "seo_validation"]
+    return [
+        {"id": f"{category}-{i}", "category": category, "description": f"{category} {i}",
+         "endpoint": f"/{'ok' if i % 2 == 0 else 'bad'}/{i}"}
+        for category in categories for i in range(4)
+    ]
+
+
+def test_run_all_tests_is_concurrent_and_keeps_order(monkeypatch):
+    for name in ("RouteAvailabilityEvaluator", "FeatureCompletenessEvaluator",
+                 "DataFreshnessValidator", "SEOValidator"):
+        monkeypatch.setattr(run_evaluation, name, _SlowEvaluator)
+    _SlowEvaluator.peak = 0
+
+    runner = EvaluationRunner()
+    runner.eval_config = replace(runner.eval_config, batch_size=3)
+    runner.conditional = None
+    monkeypatch.setattr(runner, "load_test_queries", _queries)
+    results = runner.run_all_tests()
+
+    assert 1 < _SlowEvaluator.peak <= 3
+    assert [r["query_id"] for r in results["detailed_results"]] == [q["id"] for q in _queries()]
+    assert list(results["by_category"]) == ["route_availability", "feature_completeness",
+                                            "data_freshness", "seo_validation"]
+    # Route tests pass on status_match; the others on score
+    assert results["by_category"]["route_availability"]["passed"] == 4
+    assert results["by_category"]["seo_validation"]["passed"] == 2
+    assert results["metadata"]["total_queries"] == 16
+    assert results["metadata"]["passed_queries"] == 10
@@ -0,0 +1,66 @@
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from evaluation.transport import Transport
+
+
+class _Handler(BaseHTTPRequestHandler):
+    failures = {}
+
+    def _reply(self):
+        remaining = self.failures.get(self.path, 0)
+        if remaining:
+            self.failures[self.path] = remaining - 1
+            status, body = 503, b"busy"
+        else:
+            status, body = 200, b"ok"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply()
+
+
+@pytest.fixture
+def handler():
+    return _Handler
+
+
+def test_retries_with_backoff_then_succeeds(server):
+    _Handler.failures = {"/flaky": 2}
+    transport = Transport(max_retries=3, backoff_base=0.01, backoff_max=0.02)
+    response = transport.get(f"{server}/flaky", timeout=5)
+
+    assert response.status_code == 200
+    assert response.timing["attempts"] == 3
+    assert all(0 <= transport.backoff(n) <= 0.02 for n in range(10))
+
+
+def test_gives_up_after_max_retries_and_never_retries_post_on_status(server):
+    _Handler.failures = {"/down": 10, "/submit": 1}
+    transport = Transport(max_retries=1, backoff_base=0.01, backoff_max=0.01)
+
+    assert transport.get(f"{server}/down", timeout=5).timing["attempts"] == 2
+    response = transport.post(f"{server}/submit", json={"a": 1}, timeout=5)
+    assert response.status_code == 503
+    assert response.timing["attempts"] == 1
+
+
+def test_timing_and_connection_reuse(server):
+    _Handler.failures = {}
+    transport = Transport(max_retries=0)
+    first = transport.get(f"{server}/", timeout=5).timing
+    second = transport.get(f"{server}/", timeout=5).timing
+
+    assert set(first) >= {"dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "total_ms", "attempts"}
+    assert first["new_connection"] is True
+    assert second["new_connection"] is False
+    assert second["dns_ms"] == second["connect_ms"] == 0.0
+    transport.close()
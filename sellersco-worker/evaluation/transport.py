@@ -0,0 +1,191 @@
+"""
+HTTP Transport
+Pooled keep-alive session with retry/backoff and per-request timing
+"""
+
+import random
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NameResolutionError, NewConnectionError
+
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Timing of the request running on this thread; connections report into it
+_timing = threading.local()
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+class _TimedConnectionMixin:
+    """Splits connection setup into DNS, TCP connect and TLS handshake"""
+
+    def _new_conn(self):
+        timing = getattr(_timing, "current", None)
+        if timing is None:
+            return super()._new_conn()
+
+        started = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        resolved = time.perf_counter()
+
+        # Connect to the resolved addresses in order, as create_connection would
+        dns_host = self._dns_host
+        try:
+            for i, address in enumerate(addresses):
+                self._dns_host = address[4][0]
+                try:
+                    sock = super()._new_conn()
+                    break
+                except NewConnectionError:
+                    if i == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = dns_host
+
+        timing["new_connection"] = True
+        timing["dns_ms"] = _ms(resolved - started)
+        timing["connect_ms"] = _ms(time.perf_counter() - resolved)
+        return sock
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        timing = getattr(_timing, "current", None)
+        if timing is not None and isinstance(self, HTTPSConnection):
+            setup = timing.get("dns_ms", 0) + timing.get("connect_ms", 0)
+            timing["tls_ms"] = _ms(max(time.perf_counter() - started - setup / 1000, 0))
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """Adapter whose pools build timed connections"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("TimedHTTPConnectionPool", (HTTPConnectionPool,),
+                         {"ConnectionCls": _TimedHTTPConnection}),
+            "https": type("TimedHTTPSConnectionPool", (HTTPSConnectionPool,),
+                          {"ConnectionCls": _TimedHTTPSConnection}),
+        }
+
+
+class Transport:
+    """
+    Shared HTTP transport for evaluators
+
+    One keep-alive requests.Session with connection pools bounded to
+    pool_size per host, so checks against the worker reuse TCP/TLS
+    connections. Failed requests are retried up to max_retries times with
+    full-jitter exponential backoff: connection errors and timeouts, plus
+    429/502/503/504 responses for idempotent methods (Retry-After is honored
+    when it is shorter than backoff_max). Non-idempotent requests are only
+    retried when the connection was never established.
+
+    Every response gets a `timing` dict: new_connection, dns_ms, connect_ms
+    and tls_ms (0 when a pooled connection was reused), ttfb_ms, total_ms
+    and attempts.
+
+    Exposes request()/get()/post() with the same call shape as the requests
+    module, so it can be given to evaluators or wrapped by ResponseCache.
+    """
+
+    def __init__(self, pool_size: int = 10, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0):
+        """
+        Initialize transport
+
+        Args:
+            pool_size: Connections kept per host (and the pool's hard cap)
+            max_retries: Retries after the first attempt
+            backoff_base: Backoff ceiling for the first retry, in seconds
+            backoff_max: Largest backoff ceiling, in seconds
+        """
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        adapter = _TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                                    pool_block=True, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Seconds to wait before retry number attempt (0-based)"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit() and int(retry_after) <= self.backoff_max:
+            return float(retry_after)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retryable(self, method: str, error: Optional[Exception] = None,
+                   response: Optional[requests.Response] = None) -> bool:
+        if error is not None:
+            if method in IDEMPOTENT_METHODS:
+                return isinstance(error, (requests.ConnectionError, requests.Timeout))
+            return isinstance(error, requests.ConnectTimeout)
+        return method in IDEMPOTENT_METHODS and response.status_code in RETRY_STATUSES
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request with retries; raises the last error once retries run out"""
+        method = method.upper()
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            timing: Dict[str, Any] = {"new_connection": False,
+                                      "dns_ms": 0.0, "connect_ms": 0.0, "tls_ms": 0.0}
+            _timing.current = timing
+            try:
+                response = self.session.request(method, url, **kwargs)
+                error = None
+            except requests.RequestException as e:
+                response, error = None, e
+            finally:
+                _timing.current = None
+
+            if attempt >= self.max_retries or not self._retryable(method, error, response):
+                break
+            if response is not None:
+                response.close()
+            time.sleep(self.backoff(attempt, response))
+            attempt += 1
+
+        if error is not None:
+            raise error
+        setup = timing["dns_ms"] + timing["connect_ms"] + timing["tls_ms"]
+        timing.update({
+            # requests' elapsed runs from sending (incl. connection setup) to parsed headers
+            "ttfb_ms": _ms(max(response.elapsed.total_seconds() - setup / 1000, 0)),
+            "total_ms": _ms(time.perf_counter() - started),
+            "attempts": attempt + 1,
+        })
+        response.timing = timing
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
@@ -3,24 +3,39 @@ SEO Validator
 Analyzes HTML responses for SEO compliance
 """
 
+import json
+import sys
 import requests
-from bs4 import BeautifulSoup
+from pathlib import Path
 from typing import Dict, Any, List
 import re
 from urllib.parse import urljoin
 
+sys.path.insert(0, str(Path(__file__).parent))
+
+from html_analyzer import CHUNK_SIZE, analyze_chunks, run_seo_checks
+from json_stream import ARRAY, ITEM, MEMBER, VALUE, JSONStream
+from keyword_matcher import KeywordMatcher, OccurrenceCounter
+
+# Streamed bodies are read in chunks of this many bytes
+STREAM_CHUNK_BYTES = 64 * 1024
+FRAMEWORK_STANDARDS = ["HIPAA", "PCI", "GDPR", "CMMC", "NIS2", "DORA", "SEC"]
+VENDOR_MENTIONS = ("vendor", "crowdstrike", "palo alto")
+
 class SEOValidator:
     """
     Validates SEO implementation in HTML responses
     
     Checks: meta tags, schema, headings, images, responsiveness
+    (computed in one pass by html_analyzer, without building a DOM)
     """
     
     def __init__(self, base_url: str = "https://icy-flower-c586.jsellers.workers.dev",
-                 timeout: int = 30):
+                 timeout: int = 30, http=None):
         """Initialize validator"""
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.http = http or requests
     
     def __call__(self, *, endpoint: str, seo_checks: dict = None, **kwargs) -> Dict[str, Any]:
         """
@@ -39,81 +54,23 @@ class SEOValidator:
         
         try:
             url = f"{self.base_url}{endpoint}"
-            response = requests.get(url, timeout=self.timeout)
+            response = self.http.get(url, timeout=self.timeout)
             
             if response.status_code != 200:
                 return {"error": f"HTTP {response.status_code}", "score": 0}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
             results = {
                 "url": url,
                 "status": response.status_code,
-                "checks": {}
+                "checks": {},
+                "timing": getattr(response, "timing", None)
             }
             
-            # Check meta tags
-            if seo_checks.get("has_title"):
-                title = soup.find("title")
-                results["checks"]["has_title"] = title is not None and len(title.text) > 0
-            
-            if seo_checks.get("has_meta_description"):
-                meta_desc = soup.find("meta", attrs={"name": "description"})
-                results["checks"]["has_meta_description"] = meta_desc is not None
-            
-            if seo_checks.get("has_og_tags"):
-                og_title = soup.find("meta", attrs={"property": "og:title"})
-                og_desc = soup.find("meta", attrs={"property": "og:description"})
-                og_image = soup.find("meta", attrs={"property": "og:image"})
-                results["checks"]["has_og_tags"] = (og_title and og_desc and og_image) is not None
-            
-            if seo_checks.get("has_charset"):
-                charset = soup.find("meta", attrs={"charset": True})
-                results["checks"]["has_charset"] = charset is not None
-            
-            if seo_checks.get("has_viewport"):
-                viewport = soup.find("meta", attrs={"name": "viewport"})
-                results["checks"]["has_viewport"] = viewport is not None
-            
-            # Check heading structure
-            if seo_checks.get("has_single_h1"):
-                h1_tags = soup.find_all("h1")
-                results["checks"]["has_single_h1"] = len(h1_tags) == 1
-                results["h1_count"] = len(h1_tags)
-            
-            if seo_checks.get("proper_heading_hierarchy"):
-                h_tags = soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6"])
-                hierarchy_ok = len(h_tags) > 0
-                if hierarchy_ok:
-                    # Simple check: first should be H1
-                    first_h = h_tags[0].name if h_tags else None
-                    hierarchy_ok = first_h == "h1"
-                results["checks"]["proper_heading_hierarchy"] = hierarchy_ok
-            
-            # Check images
-            if seo_checks.get("all_images_have_alt"):
-                images = soup.find_all("img")
-                images_with_alt = sum(1 for img in images if img.get("alt"))
-                results["checks"]["all_images_have_alt"] = len(images) == 0 or images_with_alt == len(images)
-                results["image_alt_coverage"] = images_with_alt / len(images) if images else 1.0
-            
-            # Check structured data
-            if seo_checks.get("has_organization_schema"):
-                scripts = soup.find_all("script", attrs={"type": "application/ld+json"})
-                has_org_schema = any("Organization" in str(s) for s in scripts)
-                results["checks"]["has_organization_schema"] = has_org_schema
-            
-            if seo_checks.get("has_website_schema"):
-                scripts = soup.find_all("script", attrs={"type": "application/ld+json"})
-                # Case-insensitive check for Website/WebSite
-                has_website_schema = any("website" in str(s).lower() for s in scripts)
-                results["checks"]["has_website_schema"] = has_website_schema
-            
-            # Check responsiveness
-            if seo_checks.get("mobile_friendly"):
-                viewport = soup.find("meta", attrs={"name": "viewport"})
-                mobile_friendly = viewport is not None and "width=device-width" in str(viewport)
-                results["checks"]["mobile_friendly"] = mobile_friendly
+            # One streaming pass over the body bytes collects every fact the checks need
+            page = analyze_chunks(response.iter_content(chunk_size=CHUNK_SIZE),
+                                  response.encoding or response.apparent_encoding)
+            results["checks"], extras = run_seo_checks(page, seo_checks)
+            results.update(extras)
             
             # Calculate pass rate
             passed_checks = sum(1 for v in results["checks"].values() if v is True)
@@ -140,10 +97,23 @@ class DataFreshnessValidator:
     """
     
     def __init__(self, base_url: str = "https://icy-flower-c586.jsellers.workers.dev",
-                 timeout: int = 30):
-        """Initialize validator"""
+                 timeout: int = 30, http=None, stream_json: bool = False,
+                 json_budget_bytes: int = 1 << 20):
+        """
+        Initialize validator
+
+        Args:
+            base_url: Site to validate
+            timeout: Request timeout in seconds
+            http: requests-style client (default: the requests module)
+            stream_json: Validate bodies as they stream in instead of loading them whole
+            json_budget_bytes: Largest single JSON value buffered when streaming
+        """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.http = http or requests
+        self.stream_json = stream_json
+        self.json_budget_bytes = json_budget_bytes
     
     def __call__(self, *, endpoint: str, expected_contains: list = None,
                  min_vendor_count: int = 40, validate_data: str = None, **kwargs) -> Dict[str, Any]:
@@ -162,16 +132,20 @@ class DataFreshnessValidator:
         """
         try:
             url = f"{self.base_url}{endpoint}"
-            response = requests.get(url, timeout=self.timeout)
+            if self.stream_json:
+                return self._validate_stream(url, endpoint, expected_contains,
+                                             min_vendor_count, validate_data)
+            
+            response = self.http.get(url, timeout=self.timeout)
             
             if response.status_code != 200:
                 return {"error": f"HTTP {response.status_code}", "score": 0}
             
-            text = response.text.lower()
             results = {
                 "url": url,
                 "status": response.status_code,
-                "checks": {}
+                "checks": {},
+                "timing": getattr(response, "timing", None)
             }
             
             # Try to parse as JSON (for API endpoints)
@@ -188,10 +162,9 @@ class DataFreshnessValidator:
                 # Check for 2025 standards in regulations API
                 if "/api/frameworks" in endpoint and isinstance(data, list):
                     found_standards = []
-                    expected = ["HIPAA", "PCI", "GDPR", "CMMC", "NIS2", "DORA", "SEC"]
                     for item in data:
                         name = item.get("name", "").upper()
-                        for std in expected:
+                        for std in FRAMEWORK_STANDARDS:
                             if std in name and std not in found_standards:
                                 found_standards.append(std)
                     
@@ -208,11 +181,8 @@ class DataFreshnessValidator:
                     
                     # Check for expected keywords
                     if expected_contains:
-                        data_str = str(data).lower()
-                        found = []
-                        for keyword in expected_contains:
-                            if keyword.lower() in data_str:
-                                found.append(keyword)
+                        present = KeywordMatcher.for_keywords(expected_contains).search_response(response)
+                        found = [keyword for keyword in expected_contains if keyword in present]
                         results["checks"]["expected_keywords"] = len(found) >= len(expected_contains) // 2 if expected_contains else True
                         results["found_keywords"] = found
                 
@@ -231,28 +201,19 @@ class DataFreshnessValidator:
                 else:
                     results["checks"]["is_valid_json"] = isinstance(data, (list, dict))
                     
-                    # Check for expected keywords in JSON string representation
+                    # Check for expected keywords in the raw JSON body
                     if expected_contains:
-                        data_str = str(data).lower()
-                        found = []
-                        missing = []
-                        for keyword in expected_contains:
-                            if keyword.lower() in data_str:
-                                found.append(keyword)
-                            else:
-                                missing.append(keyword)
+                        present = KeywordMatcher.for_keywords(expected_contains).search_response(response)
+                        found = [keyword for keyword in expected_contains if keyword in present]
+                        missing = [keyword for keyword in expected_contains if keyword not in present]
                         results["checks"]["expected_keywords"] = len(missing) == 0
                         results["found_keywords"] = found
             
             else:
                 # HTML response handling
-                found = []
-                missing = []
-                for keyword in expected_contains:
-                    if keyword.lower() in text:
-                        found.append(keyword)
-                    else:
-                        missing.append(keyword)
+                present = KeywordMatcher.for_keywords(expected_contains).search_response(response)
+                found = [keyword for keyword in expected_contains if keyword in present]
+                missing = [keyword for keyword in expected_contains if keyword not in present]
                 
                 results["checks"]["expected_keywords"] = len(missing) == 0
                 results["found_keywords"] = found
@@ -261,26 +222,159 @@ class DataFreshnessValidator:
             # Check vendor count
             if endpoint == "/sales-portal/api/vendors" or "vendor" in endpoint:
                 # Count vendor mentions
+                text = response.text.lower()
                 vendor_count = text.count("vendor") + text.count("crowdstrike") + text.count("palo alto")
                 results["checks"]["min_vendor_count"] = vendor_count >= min_vendor_count
                 results["estimated_vendor_count"] = vendor_count
             
             # Check for OTX threat data
             if validate_data == "otx_threats":
-                has_threats = "threat" in text and "otx" in text.lower()
+                present = KeywordMatcher.for_keywords(("threat", "otx")).search_response(response)
+                has_threats = "threat" in present and "otx" in present
                 results["checks"]["has_otx_threats"] = has_threats
             
-            # Calculate score
-            passed = sum(1 for v in results["checks"].values() if v is True)
-            total = len(results["checks"])
-            score = passed / total if total > 0 else 1.0
-            
-            results["score"] = score
-            
-            return results
+            return self._scored(results)
         
         except Exception as e:
             return {
                 "error": str(e),
                 "score": 0
             }
+    
+    @staticmethod
+    def _scored(results: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the share of passed checks as the score"""
+        passed = sum(1 for v in results["checks"].values() if v is True)
+        total = len(results["checks"])
+        results["score"] = passed / total if total > 0 else 1.0
+        return results
+    
+    def _validate_stream(self, url: str, endpoint: str, expected_contains: list,
+                         min_vendor_count: int, validate_data: str) -> Dict[str, Any]:
+        """
+        The same checks as __call__, computed while the body streams in
+        
+        Each chunk goes to the keyword and mention matchers and to a
+        JSONStream, so arrays (vendors, frameworks, OTX pulses) are counted
+        and inspected one element at a time and the body is never held
+        whole. Memory stays within json_budget_bytes plus one chunk; a single
+        larger JSON value raises JSONBudgetExceeded. A body that turns out
+        not to be JSON is drained through the matchers and checked as HTML.
+        """
+        response = self.http.get(url, timeout=self.timeout, stream=True)
+        try:
+            if response.status_code != 200:
+                return {"error": f"HTTP {response.status_code}", "score": 0}
+            
+            results = {
+                "url": url,
+                "status": response.status_code,
+                "checks": {},
+                "timing": getattr(response, "timing", None)
+            }
+            
+            keywords = KeywordMatcher.for_keywords(expected_contains or ()).stream(response.encoding)
+            otx_words = KeywordMatcher.for_keywords(("threat", "otx")).stream(response.encoding)
+            mentions = OccurrenceCounter(VENDOR_MENTIONS)
+            
+            def chunks():
+                for chunk in response.iter_content(chunk_size=STREAM_CHUNK_BYTES):
+                    keywords.feed(chunk)
+                    otx_words.feed(chunk)
+                    mentions.feed(chunk)
+                    yield chunk
+            
+            body = chunks()
+            stream = JSONStream(body, self.json_budget_bytes)
+            frameworks = "/api/frameworks" in endpoint
+            vendors = "/api/vendors" in endpoint
+            is_json = True
+            has_data = False
+            item_count = 0
+            found_standards = []
+            has_crowdstrike = False
+            members = {}
+            pulse_count = None
+            try:
+                for kind, key, value in stream.events():
+                    if kind == ITEM:
+                        has_data = True
+                        if key is None:
+                            item_count += 1
+                            if frameworks:
+                                name = value.get("name", "").upper()
+                                for std in FRAMEWORK_STANDARDS:
+                                    if std in name and std not in found_standards:
+                                        found_standards.append(std)
+                            elif vendors and not has_crowdstrike:
+                                has_crowdstrike = "crowdstrike" in str(value).lower()
+                    elif kind == ARRAY:
+                        # An empty top-level array is falsy, a member makes the object truthy
+                        has_data = has_data or key is not None
+                        if key == "pulses":
+                            pulse_count = value
+                    elif kind == MEMBER:
+                        has_data = True
+                        # Only the members the OTX check reads are kept
+                        if key in ("source", "pulses"):
+                            members[key] = value
+                    elif kind == VALUE:
+                        has_data = bool(value)
+            except json.JSONDecodeError:
+                is_json = False
+            # The matchers still need whatever the JSON reader didn't consume
+            for _ in body:
+                pass
+            
+            if is_json and has_data:
+                if frameworks and stream.kind == "list":
+                    results["checks"]["has_2025_standards"] = len(found_standards) >= 5
+                    results["found_standards"] = found_standards
+                
+                elif vendors and stream.kind == "list":
+                    results["checks"]["min_vendor_count"] = item_count >= min_vendor_count
+                    results["checks"]["has_major_vendors"] = has_crowdstrike
+                    results["vendor_count"] = item_count
+                    
+                    if expected_contains:
+                        found = [keyword for keyword in expected_contains if keyword in keywords.found]
+                        results["checks"]["expected_keywords"] = len(found) >= len(expected_contains) // 2
+                        results["found_keywords"] = found
+                
+                elif "/api/otx" in endpoint:
+                    if stream.kind != "dict":
+                        raise ValueError(f"Expected a JSON object from {endpoint}")
+                    if pulse_count is None:
+                        pulse_count = len(members.get("pulses", []))
+                    results["checks"]["has_otx_threats"] = pulse_count > 0
+                    results["checks"]["has_otx_source"] = members.get("source") == "AlienVault OTX"
+                    results["pulse_count"] = pulse_count
+                
+                else:
+                    results["checks"]["is_valid_json"] = stream.kind in ("list", "dict")
+                    
+                    if expected_contains:
+                        found = [keyword for keyword in expected_contains if keyword in keywords.found]
+                        missing = [keyword for keyword in expected_contains if keyword not in keywords.found]
+                        results["checks"]["expected_keywords"] = len(missing) == 0
+                        results["found_keywords"] = found
+            
+            else:
+                found = [keyword for keyword in expected_contains if keyword in keywords.found]
+                missing = [keyword for keyword in expected_contains if keyword not in keywords.found]
+                
+                results["checks"]["expected_keywords"] = len(missing) == 0
+                results["found_keywords"] = found
+                results["missing_keywords"] = missing
+            
+            if endpoint == "/sales-portal/api/vendors" or "vendor" in endpoint:
+                vendor_count = mentions.total()
+                results["checks"]["min_vendor_count"] = vendor_count >= min_vendor_count
+                results["estimated_vendor_count"] = vendor_count
+            
+            if validate_data == "otx_threats":
+                results["checks"]["has_otx_threats"] = {"threat", "otx"} <= otx_words.found
+            
+            return self._scored(results)
+        finally:
+            response.close()
@@ -0,0 +1,28 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+
+@pytest.fixture
+def serve():
+    """
+    Start local HTTP/1.1 servers: serve(handler) -> port on 127.0.0.1
+
+    Each call starts another server; all are shut down after the test.
+    Request logging is silenced.
+    """
+    servers = []
+
+    def start(handler):
+        quiet = type(handler.__name__, (handler,), {"protocol_version": "HTTP/1.1",
+                                                    "log_message": lambda self, *args: None})
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), quiet)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        servers.append(httpd)
+        return httpd.server_address[1]
+
+    yield start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
@@ -0,0 +1,152 @@
+import json
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+import llm_bench
+from llm_fingerprint import new_session
+
+FIRST_TOKEN_DELAY = 0.05
+
+
+class _Streaming(BaseHTTPRequestHandler):
+    """Chunked streaming responses, like the real servers send"""
+
+    def start(self, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def finish_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+
+    def request_json(self):
+        return json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+
+class _Ollama(_Streaming):
+    # Five chunks streamed, but the server reports its own token count at the end
+    def do_POST(self):
+        body = self.request_json()
+        if self.path != "/api/generate" or body["model"] != "llama3.1:8b":
+            self.send_error(404)
+            return
+        self.start("application/x-ndjson")
+        time.sleep(FIRST_TOKEN_DELAY)
+        for word in ("An", " ETag", " is", " a", " hash"):
+            self.chunk(json.dumps({"model": body["model"], "response": word, "done": False})
+                       .encode() + b"\n")
+        self.chunk(json.dumps({"response": "", "done": True, "eval_count": 42}).encode() + b"\n")
+        self.finish_stream()
+
+
+class _OpenAI(_Streaming):
+    # No usage block, so tokens are the content chunks; 20 ms per token
+    def do_POST(self):
+        body = self.request_json()
+        if self.path != "/v1/chat/completions" or body["model"] != "qwen2.5-7b":
+            self.send_error(404)
+            return
+        self.start("text/event-stream")
+        self.chunk(b": keep-alive\n\n")
+        self.chunk(b'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n')
+        time.sleep(FIRST_TOKEN_DELAY)
+        for word in ("def", " fib", "(n", "):", " ...", "\n"):
+            self.chunk(b"data: " + json.dumps({"choices": [{"delta": {"content": word}}]}).encode()
+                       + b"\n\n")
+            time.sleep(0.02)
+        self.chunk(b"data: [DONE]\n\n")
+        self.finish_stream()
+
+
+def _endpoint(port, server, model):
+    base = f"http://127.0.0.1:{port}"
+    return {"host": "127.0.0.1", "port": port, "server": server, "latency_ms": 1.0,
+            "apiBase": base if server == "ollama" else f"{base}/v1",
+            "models": [{"model": model, "contextLength": 8192}]}
+
+
+@pytest.fixture
+def endpoints(serve):
+    return {"ollama": _endpoint(serve(_Ollama), "ollama", "llama3.1:8b"),
+            "vllm": _endpoint(serve(_OpenAI), "vllm", "qwen2.5-7b")}
+
+
+def test_stream_completion_times_and_counts(endpoints):
+    session = new_session()
+    try:
+        ollama = llm_bench.stream_completion(session, endpoints["ollama"], "llama3.1:8b", "hi")
+        openai = llm_bench.stream_completion(session, endpoints["vllm"], "qwen2.5-7b", "hi")
+        missing = llm_bench.stream_completion(session, endpoints["ollama"], "nope", "hi")
+    finally:
+        session.close()
+
+    assert ollama["tokens"] == 42
+    assert openai["tokens"] == 6
+    for result in (ollama, openai):
+        assert FIRST_TOKEN_DELAY * 1000 <= result["ttft_ms"] <= result["total_ms"]
+    # Decode rate starts at the first token: 5 more tokens over ~100 ms
+    assert 20 < openai["tokens_per_s"] < 60
+    assert missing == {"error": "HTTP 404"}
+
+
+def test_run_level_aggregates_concurrent_requests(endpoints):
+    session = new_session(4)
+    try:
+        level = llm_bench.run_level(session, endpoints["vllm"], "qwen2.5-7b", 3)
+        failed = llm_bench.run_level(session, endpoints["vllm"], "nope", 2)
+    finally:
+        session.close()
+    assert level["concurrency"] == 3 and level["ok"] == 3
+    assert level["mean_ttft_ms"] >= FIRST_TOKEN_DELAY * 1000
+    # Three 6-token streams of ~170 ms each run side by side; in turn they would take ~510 ms
+    assert 18 / 0.45 < level["aggregate_tokens_per_s"] < 18 / 0.12
+    assert failed == {"concurrency": 2, "ok": 0, "mean_ttft_ms": None,
+                      "aggregate_tokens_per_s": None}
+
+
+def test_rank_orders_by_decode_rate_then_ttft():
+    results = [{"model": "slow", "tokens_per_s": 10.0, "ttft_ms": 50.0},
+               {"model": "broken", "error": "HTTP 500"},
+               {"model": "fast-late", "tokens_per_s": 80.0, "ttft_ms": 400.0},
+               {"model": "fast-early", "tokens_per_s": 80.0, "ttft_ms": 90.0},
+               {"model": "one-token", "tokens_per_s": None, "ttft_ms": 30.0}]
+    ranked = llm_bench.rank(results)
+    assert [r["model"] for r in ranked] == ["fast-early", "fast-late", "slow", "broken",
+                                            "one-token"]
+    assert [r["rank"] for r in ranked] == [1, 2, 3, 4, 5]
+
+
+def test_ranked_models_keeps_unbenchmarked_after():
+    a = _endpoint(11434, "ollama", "llama3.1:8b")
+    a["models"].append({"model": "phi3", "contextLength": 4096})
+    b = _endpoint(8000, "vllm", "qwen2.5-7b")
+    ranked = [{"apiBase": b["apiBase"], "model": "qwen2.5-7b", "rank": 1},
+              {"apiBase": a["apiBase"], "model": "llama3.1:8b", "rank": 2},
+              {"apiBase": a["apiBase"], "model": "phi3", "rank": 3, "error": "no tokens"}]
+    assert [e["model"] for e in llm_bench.ranked_models(ranked, [a, b])] == \
+        ["qwen2.5-7b", "llama3.1:8b", "phi3"]
+
+
+def test_update_detected_puts_fastest_first(endpoints, tmp_path, capsys):
+    detected = tmp_path / "detected-llms.json"
+    report = tmp_path / "llm-bench.json"
+    # Slowest listed first, as a scan in port order might
+    detected.write_text(json.dumps({"models": [], "endpoints": [endpoints["vllm"],
+                                                                endpoints["ollama"]]}))
+
+    assert llm_bench.main(["--detected", str(detected), "--report", str(report),
+                           "--max-tokens", "8", "--concurrency", "1,2", "--update-detected"]) == 0
+    assert "Models reordered in:" in capsys.readouterr().out
+    models = [m["model"] for m in json.loads(detected.read_text())["models"]]
+    assert models == ["llama3.1:8b", "qwen2.5-7b"]
+    saved = json.loads(report.read_text())
+    assert [r["model"] for r in saved["results"]] == models
+    assert [s["concurrency"] for s in saved["results"][0]["scaling"]] == [1, 2]
+    assert len(json.loads(detected.read_text())["endpoints"]) == 2
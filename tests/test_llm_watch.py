@@ -0,0 +1,92 @@
+import asyncio
+import json
+from http.server import BaseHTTPRequestHandler
+
+import llm_watch
+from llm_watch import EndpointTable, load_state
+
+
+def _endpoint(port, server="ollama", models=("llama3.1:8b",), latency_ms=3.0):
+    return {"host": "127.0.0.1", "port": port, "server": server,
+            "apiBase": f"http://127.0.0.1:{port}", "latency_ms": latency_ms,
+            "models": [{"model": m, "contextLength": 8192} for m in models]}
+
+
+def test_table_events():
+    table = EndpointTable(down_after=2)
+    assert table.seen(_endpoint(11434))["event"] == "up"
+    # Latency alone is not a change
+    assert table.seen(_endpoint(11434, latency_ms=40.0)) is None
+    changed = table.seen(_endpoint(11434, models=("llama3.1:8b", "qwen2.5:7b")))
+    assert changed["event"] == "changed" and changed["models"] == ["llama3.1:8b", "qwen2.5:7b"]
+
+    key = ("127.0.0.1", 11434)
+    assert table.missed(key) is None
+    table.seen(_endpoint(11434, models=("llama3.1:8b", "qwen2.5:7b")))
+    # A success in between resets the count
+    assert table.missed(key) is None
+    assert table.missed(key)["event"] == "down"
+    assert table.snapshot() == [] and table.missed(key) is None
+
+    table.seen(_endpoint(8000, server="vllm"))
+    assert table.missed(("127.0.0.1", 8000), force=True)["event"] == "down"
+
+
+class _Ollama(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/api/tags":
+            self.send_error(404)
+            return
+        body = json.dumps({"models": [{"name": "llama3.1:8b", "details": {}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _watch(port, json_path, **kwargs):
+    events = []
+    asyncio.run(llm_watch.watch(["127.0.0.1"], [port], json_path=json_path, interval=0.05,
+                                http_timeout=1.0, iterations=3,
+                                emit=lambda new, endpoints: events.extend(new), **kwargs))
+    return events
+
+
+def test_publish_writes_only_on_change(serve, tmp_path, monkeypatch):
+    port = serve(_Ollama)
+    json_path = str(tmp_path / "detected-llms.json")
+    writes = []
+    write_atomic = llm_watch.write_atomic
+    monkeypatch.setattr(llm_watch, "write_atomic",
+                        lambda path, payload: (writes.append(path), write_atomic(path, payload)))
+
+    events = _watch(port, json_path)
+    assert [(e["event"], e["port"]) for e in events] == [("up", port)]
+    assert writes == [json_path]
+    assert load_state(json_path) is not None
+
+    # A file that already matches is left alone from the first round on
+    events = _watch(port, json_path)
+    assert [e["event"] for e in events] == ["up"]
+    assert writes == [json_path]
+
+
+def test_failed_sweep_is_retried(serve, tmp_path, monkeypatch, capsys):
+    port = serve(_Ollama)
+    scan = llm_watch.scan
+    calls = []
+
+    async def flaky_scan(*args, **kwargs):
+        calls.append(kwargs.get("discovery"))
+        if len(calls) == 2:
+            raise OSError("network is unreachable")
+        return await scan(*args, **kwargs)
+    # Treat the stub as a remote host so it gets sweeps rather than procfs diffs
+    monkeypatch.setattr(llm_watch, "choose_discovery", lambda mode, address: "connect")
+    monkeypatch.setattr(llm_watch, "scan", flaky_scan)
+
+    events = _watch(port, str(tmp_path / "detected-llms.json"), sweep_interval=0)
+    assert [e["event"] for e in events] == ["up"]
+    assert len(calls) >= 3
+    assert "network is unreachable" in capsys.readouterr().err
@@ -0,0 +1,83 @@
+import math
+
+import pytest
+
+from rag_bm25 import BM25Index, build_bm25, bm25_path, open_bm25, reciprocal_rank_fusion, tokenize
+from rag_docstore import DocStore, DocStoreWriter
+
+DOCS = {
+    0: "HIPAA applies to covered entities and their business associates.",
+    1: "NIS2 widens the scope of NIS to more sectors; NIS2 also adds fines.",
+    3: "PCI DSS 4.0 and HIPAA both require access logging.",
+    4: "Vector search ranks paraphrases well but misses exact acronyms.",
+}
+
+
+def _reference(query, k1=1.2, b=0.75):
+    """Textbook BM25 over DOCS"""
+    tokens = {doc_id: tokenize(text) for doc_id, text in DOCS.items()}
+    avgdl = sum(map(len, tokens.values())) / len(tokens)
+    scores = {}
+    for term in set(tokenize(query)):
+        df = sum(term in t for t in tokens.values())
+        idf = math.log(1 + (len(tokens) - df + 0.5) / (df + 0.5))
+        for doc_id, t in tokens.items():
+            tf = t.count(term)
+            if tf:
+                scores[doc_id] = scores.get(doc_id, 0.0) + \
+                    idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(t) / avgdl))
+    return scores
+
+
+@pytest.fixture
+def bm25(tmp_path):
+    index_path = str(tmp_path / "doc_index.faiss")
+    store_path = str(tmp_path / "doc_index.docs")
+    with DocStoreWriter(store_path) as writer:
+        for doc_id, text in DOCS.items():
+            writer.add(doc_id, f"{doc_id}.md", 0, len(text), text)
+    store = DocStore(store_path)
+    try:
+        assert build_bm25(store, bm25_path(index_path)) == len({t for text in DOCS.values()
+                                                                 for t in tokenize(text)})
+    finally:
+        store.close()
+    index = open_bm25(index_path)
+    yield index
+    index.close()
+
+
+def test_search_matches_reference_scores(bm25):
+    for query in ("HIPAA logging", "nis2 fines", "vector search acronyms", "HIPAA"):
+        expected = _reference(query)
+        hits = bm25.search(query, k=10)
+        assert [doc_id for doc_id, _ in hits] == sorted(expected, key=lambda d: (-expected[d], d))
+        for doc_id, score in hits:
+            assert score == pytest.approx(expected[doc_id], rel=1e-5)
+
+    expected = _reference("hipaa nis2 vector")
+    assert [doc_id for doc_id, _ in bm25.search("hipaa nis2 vector", k=2)] == \
+        sorted(expected, key=lambda d: (-expected[d], d))[:2]
+    assert bm25.search("cmmc", k=5) == [] and bm25.search("", k=5) == []
+    assert len(bm25.postings("zzz")[0]) == 0
+
+
+def test_missing_and_foreign_files(tmp_path):
+    assert open_bm25(str(tmp_path / "doc_index.faiss")) is None
+    path = tmp_path / "doc_index.bm25"
+    path.write_bytes(bytes(64))
+    with pytest.raises(ValueError):
+        BM25Index(str(path))
+
+
+def test_reciprocal_rank_fusion():
+    vector, keyword = [7, 3, 9, 1], [3, 5, 7]
+    fused = reciprocal_rank_fusion([vector, keyword], k=3, rrf_k=60)
+    assert [doc_id for doc_id, _ in fused] == [3, 7, 5]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+    assert fused[2][1] == pytest.approx(1 / 62)
+    # Equal scores fall back to id order; a single list keeps its order
+    assert reciprocal_rank_fusion([[4, 2], [2, 4]], k=5) == \
+        [(2, pytest.approx(1 / 61 + 1 / 62)), (4, pytest.approx(1 / 61 + 1 / 62))]
+    assert [d for d, _ in reciprocal_rank_fusion([[9, 8, 7]], k=5)] == [9, 8, 7]
+    assert reciprocal_rank_fusion([], k=5) == []
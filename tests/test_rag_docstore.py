@@ -0,0 +1,71 @@
+import pytest
+
+from rag_docstore import (DocStore, DocStoreWriter, attach_snippets, chunk_text, docstore_path,
+                          open_docstore)
+
+
+def test_round_trip_with_sparse_ids(tmp_path):
+    index_path = str(tmp_path / "doc_index.faiss")
+    assert docstore_path(index_path) == str(tmp_path / "doc_index.docs")
+    assert open_docstore(index_path) is None
+
+    with DocStoreWriter(docstore_path(index_path)) as writer:
+        writer.add(0, "docs/intro.md", 0, 12, "Hello, FAISS")
+        writer.add(5, "docs/ünïcode.md", 100, 220, "naïve    text\n\nover " + "words " * 60)
+    store = open_docstore(index_path)
+    try:
+        assert len(store) == 6
+        assert store.get(0) == {"id": 0, "source": "docs/intro.md", "start": 0, "end": 12,
+                                "text": "Hello, FAISS"}
+        assert store.get(5)["source"] == "docs/ünïcode.md"
+        assert [store.get(i) for i in (1, 4, 6, -1)] == [None] * 4
+
+        snippet = store.snippet(5, max_chars=40)
+        assert snippet["snippet"].startswith("naïve text over words") and len(snippet["snippet"]) == 40
+        assert snippet["snippet"].endswith("...") and "text" not in snippet
+
+        hits = attach_snippets([{"id": 0, "distance": 0.1}, {"id": 3, "distance": 0.2}], store)
+        assert hits == [{"id": 0, "distance": 0.1, "source": "docs/intro.md", "start": 0,
+                         "end": 12, "snippet": "Hello, FAISS"}, {"id": 3, "distance": 0.2}]
+    finally:
+        store.close()
+
+
+def test_abort_keeps_the_previous_store(tmp_path):
+    path = str(tmp_path / "doc_index.docs")
+    with DocStoreWriter(path) as writer:
+        writer.add(0, "a.md", 0, 1, "kept")
+    with pytest.raises(RuntimeError):
+        with DocStoreWriter(path) as writer:
+            writer.add(0, "b.md", 0, 1, "discarded")
+            raise RuntimeError("embedding failed")
+
+    store = DocStore(path)
+    try:
+        assert store.get(0)["text"] == "kept"
+    finally:
+        store.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["doc_index.docs"]
+
+    with DocStoreWriter(path):
+        pass
+    store = DocStore(path)
+    assert len(store) == 0 and store.get(0) is None
+    store.close()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "doc_index.docs"
+    path.write_bytes(b"not a docstore" + bytes(32))
+    with pytest.raises(ValueError):
+        DocStore(str(path))
+
+
+def test_chunk_offsets_point_into_the_text():
+    text = "# Title\n\n" + "\n\n".join(f"Paragraph {i}. " + "word " * 40 for i in range(30))
+    chunks = list(chunk_text(text, chunk_size=300, overlap=50))
+    assert len(chunks) > 5
+    for start, end, chunk in chunks:
+        assert text[start:end].strip() == chunk
+        assert end - start <= 300
+    assert chunks[-1][1] == len(text)
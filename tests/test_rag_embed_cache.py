@@ -0,0 +1,71 @@
+import numpy as np
+
+from rag_embed_cache import CachedEncoder, EmbeddingCache, cache_key
+
+
+def _vector(seed):
+    return np.full(8, seed, dtype='float32').tobytes()
+
+
+def test_memory_disk_and_miss_counters(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    cache = EmbeddingCache(path, memory_entries=2)
+    key = cache_key("model", "What is  BM25?")
+    assert key == cache_key("model", "what is bm25?") != cache_key("other-model", "what is bm25?")
+
+    assert cache.get(key) is None
+    cache.put(key, _vector(1))
+    assert cache.get(key) == _vector(1)
+    # Pushed out of the two-entry memory tier, still on disk
+    cache.put("b", _vector(2))
+    cache.put("c", _vector(3))
+    assert cache.get(key) == _vector(1)
+    stats = cache.stats()
+    assert (stats["hits_memory"], stats["hits_disk"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_rate"] == round(2 / 3, 4)
+    assert stats["memory_entries"] == 2 and stats["disk_bytes"] == 3 * 32
+    cache.close()
+
+    reopened = EmbeddingCache(path)
+    assert reopened.stats()["disk_bytes"] == 3 * 32
+    assert reopened.get("c") == _vector(3)
+    assert reopened.stats()["hits_disk"] == 1
+    reopened.close()
+
+
+def test_disk_budget_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"), memory_entries=1, max_bytes=100)
+    for n, key in enumerate("abc"):
+        cache.put(key, _vector(n))
+    # Replacing a key does not double count its bytes
+    cache.put("a", _vector(9))
+    assert cache.stats()["evictions"] == 0 and cache.stats()["disk_bytes"] == 96
+
+    cache.put("d", _vector(4))
+    stats = cache.stats()
+    assert stats["evictions"] == 2 and stats["disk_bytes"] <= 90
+    assert cache.get("b") is None
+    assert cache.get("d") == _vector(4)
+    cache.close()
+
+
+class _Model:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32):
+        self.encoded.append(list(texts))
+        return np.asarray([[len(t)] * 4 for t in texts], dtype='float32')
+
+
+def test_cached_encoder_only_encodes_misses():
+    model = _Model()
+    encoder = CachedEncoder(model, "stub", EmbeddingCache(None))
+    first = encoder.encode(["alpha", "beta", "Alpha"])
+    second = encoder.encode(["beta", "gamma"])
+    assert model.encoded == [["alpha", "beta"], ["gamma"]]
+    assert first.shape == (3, 4) and (first[0] == first[2]).all()
+    assert (second[0] == first[1]).all()
+    # "Alpha" rides along with "alpha" in the same batch without a second lookup
+    stats = encoder.cache.stats()
+    assert (stats["misses"], stats["hits_memory"]) == (3, 1)
@@ -0,0 +1,94 @@
+import hashlib
+import os
+
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+import rag_build_index
+import rag_incremental
+from rag_docstore import docstore_path, iter_chunks, open_docstore
+from rag_query import manifest_path
+
+DIM = 8
+
+
+class _Encoder:
+    """Deterministic stand-in for the sentence encoder: one vector per text hash"""
+
+    def encode(self, texts, batch_size=None):
+        return np.asarray([np.frombuffer(hashlib.sha256(t.encode()).digest()[:DIM], dtype='uint8')
+                           for t in texts], dtype='float32')
+
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag_incremental._LazyModel, "get", lambda self: _Encoder())
+    monkeypatch.setattr(rag_build_index, "_EMBED_MODEL", _Encoder())
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for name in ("a", "b", "c"):
+        (docs / f"{name}.md").write_text(f"# {name}\n\n" + f"{name} paragraph. " * 200)
+    return docs, str(tmp_path / "doc_index.faiss")
+
+
+def _texts(index_path):
+    """Every indexed chunk's text, looked up through the FAISS ids"""
+    index = faiss.read_index(index_path)
+    ids = faiss.vector_to_array(index.id_map) if hasattr(index, "id_map") else range(index.ntotal)
+    store = open_docstore(index_path)
+    try:
+        return sorted(store.get(int(doc_id))["text"] for doc_id in ids)
+    finally:
+        store.close()
+
+
+def test_full_rebuild_invalidates_manifest(corpus):
+    docs, index_path = corpus
+    rag_incremental.update_index(root=str(docs), index_path=index_path, batch_size=16)
+    assert os.path.exists(manifest_path(index_path))
+
+    (docs / "b.md").unlink()
+    rag_build_index.build_streaming(root=str(docs), index_path=index_path, batch_size=16)
+    assert not os.path.exists(manifest_path(index_path))
+
+    (docs / "d.md").write_text("# d\n\n" + "d paragraph. " * 200)
+    stats = rag_incremental.update_index(root=str(docs), index_path=index_path, batch_size=16)
+    assert stats["chunks_kept"] == 0 and stats["files_removed"] == 0
+    assert isinstance(faiss.read_index(index_path), faiss.IndexIDMap2)
+    assert _texts(index_path) == sorted(c["text"] for c in iter_chunks(str(docs)))
+
+    # And the manifest it wrote is trusted again on the next run
+    stats = rag_incremental.update_index(root=str(docs), index_path=index_path, batch_size=16)
+    assert stats["chunks_added"] == 0 and stats["files_unchanged"] == 3
+
+
+def test_manifest_for_a_different_index_is_ignored(corpus):
+    docs, index_path = corpus
+    rag_incremental.update_index(root=str(docs), index_path=index_path, batch_size=16)
+    expected = _texts(index_path)
+    # A plain index left under a manifest that still matches model and chunking
+    faiss.write_index(faiss.IndexFlatL2(DIM), index_path)
+
+    stats = rag_incremental.update_index(root=str(docs), index_path=index_path, batch_size=16)
+    assert stats["chunks_kept"] == 0
+    assert stats["ntotal"] == len(expected)
+    assert _texts(index_path) == expected
+
+
+def test_noop_refresh_leaves_sidecars_alone(corpus):
+    docs, index_path = corpus
+    rag_incremental.update_index(root=str(docs), index_path=index_path, batch_size=16)
+    paths = [index_path, docstore_path(index_path), manifest_path(index_path)]
+    before = [os.stat(p) for p in paths]
+
+    stats = rag_incremental.update_index(root=str(docs), index_path=index_path, batch_size=16)
+    assert stats["files_unchanged"] == 3 and stats["chunks_added"] == 0
+    assert [(s.st_ino, s.st_mtime_ns) for s in map(os.stat, paths)] == \
+        [(s.st_ino, s.st_mtime_ns) for s in before]
+    assert not os.path.exists(docstore_path(index_path) + ".tmp")
+    assert _texts(index_path) == sorted(c["text"] for c in iter_chunks(str(docs)))
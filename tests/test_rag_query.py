@@ -0,0 +1,49 @@
+import io
+import json
+
+from rag_query import parse_query_line, run_batch
+
+
+def test_parse_query_line():
+    assert parse_query_line("  how is the index built?\n", 3) == (3, "how is the index built?")
+    assert parse_query_line("   \n", 4) is None
+    assert parse_query_line('{"id": "q7", "question": "bm25 fusion"}', 1) == ("q7", "bm25 fusion")
+    # QUERY_FIELDS order decides, empty values are passed over
+    assert parse_query_line('{"text": "second", "query": "", "q": "first"}', 2) == (2, "first")
+    assert parse_query_line('{"title": "Docstore", "body": "sidecar"}', 5,
+                            fields=["title", "body"], id_field="title") == ("Docstore", "Docstore sidecar")
+    # Not an object, or not JSON at all: the line is the query
+    assert parse_query_line('["a", "b"]', 6) == (6, '["a", "b"]')
+    assert parse_query_line('{broken', 7) == (7, '{broken')
+
+
+class _Searcher:
+    def __init__(self, consumed):
+        self.consumed = consumed
+        self.batches = []
+
+    def search(self, queries, k=5, batch_size=64):
+        self.batches.append((list(queries), len(self.consumed)))
+        return [[{"id": n, "distance": float(n)} for n in range(k)] for _ in queries]
+
+
+def test_run_batch_writes_one_line_per_query():
+    lines = ['{"id": 1, "q": "alpha"}\n', '\n', 'beta\n', '{"id": "x", "query": "gamma"}\n',
+             'delta\n', 'epsilon\n']
+    consumed = []
+
+    def source():
+        for line in lines:
+            consumed.append(line)
+            yield line
+
+    searcher = _Searcher(consumed)
+    out = io.StringIO()
+    assert run_batch(searcher, source(), out, k=2, batch_size=2) == 5
+    # Each batch is searched as soon as it fills, before the next line is read
+    assert searcher.batches == [(["alpha", "beta"], 3), (["gamma", "delta"], 5), (["epsilon"], 6)]
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [(r["id"], r["query"]) for r in records] == \
+        [(1, "alpha"), (3, "beta"), ("x", "gamma"), (5, "delta"), (6, "epsilon")]
+    assert records[0]["results"] == [{"id": 0, "distance": 0.0}, {"id": 1, "distance": 1.0}]
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+import rag_encoders
+from rag_query import RagSearcher
+from rag_server import MAX_K, RagServer
+
+DIM = 8
+
+
+class _Encoder:
+    """Deterministic stand-in for the sentence encoder: one vector per text hash"""
+
+    def encode(self, texts, batch_size=None):
+        return np.asarray([np.frombuffer(hashlib.sha256(t.encode()).digest()[:DIM], dtype='uint8')
+                           for t in texts], dtype='float32')
+
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+
+class _Index:
+    ntotal = 3
+
+
+class _Searcher:
+    """Records search() calls and answers with one hit per query"""
+
+    model_name = "stub-model"
+    index_path = "stub.faiss"
+    index_meta = {"index_type": "flat"}
+    encoder_name = "stub-model"
+    index = _Index()
+    hybrid = False
+
+    def __init__(self, bm25=None):
+        self.bm25 = bm25
+        self.calls = []
+
+    def search(self, queries, k=5, hybrid=None):
+        self.calls.append((queries, k, hybrid))
+        return [[{"id": i, "distance": 0.5, "snippet": q}] for i, q in enumerate(queries)]
+
+    def cache_stats(self):
+        return {"hits_memory": 0, "misses": len(self.calls)}
+
+
+@pytest.fixture
+def rag_server():
+    searcher = _Searcher()
+    server = RagServer(("127.0.0.1", 0), searcher)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", searcher
+    server.shutdown()
+    server.server_close()
+
+
+def _call(url, body=None):
+    data = body if body is None or isinstance(body, bytes) else json.dumps(body).encode()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=5) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_get_search(rag_server):
+    base, searcher = rag_server
+    status, payload = _call(f"{base}/search?q=faiss+index&k=3")
+    assert status == 200
+    assert payload["results"] == [[{"id": 0, "distance": 0.5, "snippet": "faiss index"}]]
+    assert payload["k"] == 3 and payload["cache"] == {"hits_memory": 0, "misses": 1}
+
+    _call(f"{base}/search?q=x&k=100000&hybrid=0")
+    assert searcher.calls == [(["faiss index"], 3, None), (["x"], MAX_K, False)]
+    assert _call(f"{base}/search?q=x&k=many")[0] == 400
+    assert _call(f"{base}/search?q=x&hybrid=1")[0] == 400  # no BM25 index
+    assert _call(f"{base}/nope")[0] == 404
+
+    status, health = _call(f"{base}/health")
+    assert status == 200 and health["ntotal"] == 3 and health["bm25"] is False
+
+
+def test_post_search(rag_server):
+    base, searcher = rag_server
+    status, payload = _call(f"{base}/search", {"queries": ["a", "b"], "k": 2})
+    assert status == 200
+    assert [hits[0]["snippet"] for hits in payload["results"]] == ["a", "b"]
+    _call(f"{base}/search", {"q": "single"})
+    assert searcher.calls == [(["a", "b"], 2, None), (["single"], 5, None)]
+
+    assert _call(f"{base}/search", b"{not json")[0] == 400
+    assert _call(f"{base}/search", {"queries": []})[0] == 400
+    assert _call(f"{base}/search", {"queries": "a"})[0] == 400
+    assert len(searcher.calls) == 2
+
+
+def test_warm_up_leaves_cache_alone(tmp_path, monkeypatch):
+    pytest.importorskip("faiss")
+    import rag_build_index
+
+    monkeypatch.setattr(rag_build_index, "_EMBED_MODEL", _Encoder())
+    monkeypatch.setattr(rag_encoders, "load_encoder", lambda name, onnx_path=None: _Encoder())
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.md").write_text("# a\n\n" + "a paragraph. " * 200)
+    index_path = str(tmp_path / "doc_index.faiss")
+    rag_build_index.build_streaming(root=str(docs), index_path=index_path, batch_size=16)
+
+    searcher = RagSearcher(index_path=index_path, cache_path=str(tmp_path / "cache.sqlite"))
+    searcher.warm_up()
+    stats = searcher.cache_stats()
+    assert (stats["misses"], stats["memory_entries"], stats["disk_bytes"]) == (0, 0, 0)
+    searcher.search(["warmup"], k=1)
+    assert searcher.cache_stats()["misses"] == 1
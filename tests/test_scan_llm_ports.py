@@ -0,0 +1,232 @@
+import asyncio
+import json
+import socket
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+import scan_llm_ports
+from scan_llm_ports import (WELL_KNOWN_PORTS, PortCache, TokenBucket, connect_scan, expand_targets,
+                            listening_sockets, order_ports, priority_ports, procfs_ports)
+
+
+def test_expand_targets_cidr_duplicates_and_limit():
+    assert expand_targets(["10.0.0.0/30", "10.0.0.2,localhost", " localhost ", "10.0.0.1"]) == \
+        ["10.0.0.1", "10.0.0.2", "localhost"]
+    # /31 and /32 have no network/broadcast addresses to drop
+    assert expand_targets(["192.168.5.4/31"]) == ["192.168.5.4", "192.168.5.5"]
+    assert expand_targets(["192.168.5.9/32"]) == ["192.168.5.9"]
+    assert len(expand_targets(["10.1.0.0/24"], max_hosts=256)) == 254
+
+    with pytest.raises(ValueError):
+        expand_targets(["10.0.0.0/16"], max_hosts=1024)
+    with pytest.raises(ValueError):
+        expand_targets(["a,b,c"], max_hosts=2)
+
+
+def test_token_bucket_allows_burst_then_paces():
+    async def acquire(bucket, n):
+        started = time.monotonic()
+        for _ in range(n):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    # A full bucket is spent without waiting
+    assert asyncio.run(acquire(TokenBucket(1000.0, burst=50), 50)) < 0.02
+    # Past the burst, acquisitions come at `rate` per second
+    elapsed = asyncio.run(acquire(TokenBucket(100.0, burst=1), 11))
+    assert 0.09 <= elapsed < 0.5
+    assert TokenBucket(2000.0).capacity == 100
+
+
+def test_unresolvable_host_is_reported_not_fatal():
+    result = asyncio.run(scan_llm_ports.scan(["nonexistent.invalid"], [1], discovery="connect",
+                                             remote_rate=1000.0))
+    assert "cannot resolve" in result["hosts"]["nonexistent.invalid"]["error"]
+    assert result["endpoints"] == [] and result["rate"] is None
+
+
+@pytest.fixture
+def listener():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(8)
+    yield sock
+    sock.close()
+
+
+def _closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_connect_scan_open_and_closed(listener):
+    open_port, closed_port = listener.getsockname()[1], _closed_port()
+    seen = []
+    found = asyncio.run(connect_scan("127.0.0.1", [closed_port, open_port], concurrency=4,
+                                     timeout=1.0, on_open=seen.append))
+    assert found == seen == [open_port]
+
+
+def test_connect_scan_stop_starts_nothing(listener):
+    async def run():
+        stop = asyncio.Event()
+        stop.set()
+        window = asyncio.Semaphore(2)
+        found = await connect_scan("127.0.0.1", [listener.getsockname()[1]], stop=stop,
+                                   shared_window=window)
+        return found, window._value
+    assert asyncio.run(run()) == ([], 2)
+
+
+def test_connect_scan_stop_abandons_pending(listener):
+    # The first open port sets stop; the rest of the range is never tried
+    async def run():
+        stop = asyncio.Event()
+        started = time.monotonic()
+        found = await connect_scan("127.0.0.1", [listener.getsockname()[1]] + [_closed_port()] * 500,
+                                   concurrency=1, on_open=lambda port: stop.set(), stop=stop)
+        return found, time.monotonic() - started
+    found, elapsed = asyncio.run(run())
+    assert found == [listener.getsockname()[1]] and elapsed < 1.0
+
+
+def test_connect_scan_frees_slot_on_refusal_and_timeout():
+    # listen(0) queues one connection; SYNs to it after that go unanswered until the timeout
+    backlog = socket.socket()
+    backlog.bind(("127.0.0.1", 0))
+    backlog.listen(0)
+    stalled_port = backlog.getsockname()[1]
+    filler = socket.create_connection(("127.0.0.1", stalled_port))
+
+    async def run():
+        window = asyncio.Semaphore(1)
+        started = time.monotonic()
+        found = await asyncio.wait_for(
+            connect_scan("127.0.0.1", [_closed_port(), stalled_port, _closed_port()], concurrency=1,
+                         timeout=0.2, shared_window=window), timeout=5)
+        return found, window._value, time.monotonic() - started
+    try:
+        found, free, elapsed = asyncio.run(run())
+        assert (found, free) == ([], 1)
+        assert elapsed >= 0.2
+    finally:
+        filler.close()
+        backlog.close()
+
+
+PROC_TCP = """\
+  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode
+   0: 0100007F:2CAA 00000000:0000 0A 00000000:00000000 00:00000000 00000000  1000        0 41001 1
+   1: 00000000:1F90 00000000:0000 0A 00000000:00000000 00:00000000 00000000  1000        0 41002 1
+   2: 0A01A8C0:1F40 00000000:0000 0A 00000000:00000000 00:00000000 00000000  1000        0 41003 1
+   3: 0100007F:1388 0100007F:D431 01 00000000:00000000 00:00000000 00000000  1000        0 41004 1
+"""
+PROC_TCP6 = """\
+  sl  local_address                         remote_address                        st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode
+   0: 00000000000000000000000000000000:1EB4 00000000000000000000000000000000:0000 0A 00000000:00000000 00:00000000 00000000  1000        0 42001 1
+   1: 00000000000000000000000001000000:04D2 00000000000000000000000000000000:0000 0A 00000000:00000000 00:00000000 00000000  1000        0 42002 1
+   2: 0000000000000000FFFF00000100007F:0BB8 00000000000000000000000000000000:0000 0A 00000000:00000000 00:00000000 00000000  1000        0 42003 1
+"""
+
+
+@pytest.fixture
+def proc_tables(tmp_path):
+    paths = (tmp_path / "tcp", tmp_path / "tcp6")
+    for path, text in zip(paths, (PROC_TCP, PROC_TCP6)):
+        path.write_text(text)
+    return [str(p) for p in paths]
+
+
+def test_listening_sockets_decodes_ipv4_and_ipv6(proc_tables):
+    listeners = {(str(address), port) for address, port in listening_sockets(proc_tables)}
+    assert listeners == {("127.0.0.1", 11434), ("0.0.0.0", 8080), ("192.168.1.10", 8000),
+                         ("::", 7860), ("::1", 1234), ("::ffff:7f00:1", 3000)}
+    # Only one table readable is fine; neither is an error
+    assert len(listening_sockets([proc_tables[0], proc_tables[0] + ".missing"])) == 3
+    with pytest.raises(OSError):
+        listening_sockets([proc_tables[0] + ".missing"])
+
+
+def test_procfs_ports_matches_address_and_wildcards(proc_tables):
+    listeners = listening_sockets(proc_tables)
+    everything = range(1, 65536)
+    assert procfs_ports("127.0.0.1", everything, listeners) == [3000, 7860, 8080, 11434]
+    assert procfs_ports("192.168.1.10", everything, listeners) == [7860, 8000, 8080]
+    assert 1234 in procfs_ports("::1", everything, listeners)
+    assert 11434 not in procfs_ports("::1", everything, listeners)
+    assert procfs_ports("127.0.0.1", [8080, 9999], listeners) == [8080]
+
+
+def test_unreadable_procfs_falls_back_to_connect(listener, monkeypatch):
+    def unreadable(address, ports):
+        return procfs_ports(address, ports, listening_sockets(["/nonexistent/net/tcp"]))
+    monkeypatch.setattr(scan_llm_ports, "procfs_ports", unreadable)
+    monkeypatch.setattr(scan_llm_ports, "choose_discovery", lambda mode, address: "procfs")
+    port = listener.getsockname()[1]
+
+    result = asyncio.run(scan_llm_ports.scan(["127.0.0.1"], [port], http_timeout=0.2))
+    assert result["hosts"]["127.0.0.1"]["discovery"] == "connect"
+    assert result["hosts"]["127.0.0.1"]["open_ports"] == [port]
+    # An explicit procfs request has nothing to fall back to
+    with pytest.raises(OSError):
+        asyncio.run(scan_llm_ports.scan(["127.0.0.1"], [port], discovery="procfs"))
+
+
+def test_port_cache_expires_entries(tmp_path):
+    path = str(tmp_path / "cache" / "ports.json")
+    now = time.time()
+    cache = PortCache(path, ttl=60)
+    assert cache.ports("gpu-box") == []
+    cache.hosts = {"gpu-box": {"8000": now - 120, "9000": now - 30, "7000": now - 5},
+                   "old-box": {"11434": now - 600}}
+    assert cache.ports("gpu-box") == [7000, 9000]
+    cache.record("gpu-box", [8000])
+    assert cache.ports("gpu-box") == [8000, 7000, 9000]
+    cache.save()
+
+    with open(path) as f:
+        assert set(json.load(f)["hosts"]) == {"gpu-box"}
+    assert PortCache(path, ttl=60).ports("gpu-box") == [8000, 7000, 9000]
+    # Expiry applies on read too, whatever the file still holds
+    assert PortCache(path, ttl=0).ports("gpu-box") == []
+
+
+def test_priority_then_cached_then_rest():
+    priority = priority_ports(range(1, 65536), cached=[9999, 8080, 4242])
+    assert priority == [*WELL_KNOWN_PORTS, 9999, 4242]
+    assert priority_ports([4242, 8080, 5, 9999], cached=[9999]) == [8080, 9999]
+
+    ports = [5, 9999, 11434, 6, 8080, 7]
+    assert list(order_ports(ports, priority_ports(ports, cached=[9999]))) == \
+        [11434, 8080, 9999, 5, 6, 7]
+
+
+class _Ollama(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/api/tags":
+            self.send_error(404)
+            return
+        body = json.dumps({"models": [{"name": "llama3.1:8b", "details": {}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def test_first_stops_after_n_endpoints(serve, capsys):
+    ports = sorted(serve(_Ollama) for _ in range(4))
+    spec = ",".join(map(str, ports))
+
+    scan_llm_ports.main(["--host", "127.0.0.1", "--ports", spec, "--discovery", "connect",
+                         "--no-cache", "--first", "2"])
+    out = capsys.readouterr().out
+    assert out.count("ollama on 127.0.0.1:") == 2
+    assert "2 LLM endpoint(s), stopped after first 2" in out
+
+    scan_llm_ports.main(["--host", "127.0.0.1", "--ports", spec, "--discovery", "connect",
+                         "--no-cache"])
+    assert "4 LLM endpoint(s)\n" in capsys.readouterr().out